@@ -218,8 +218,6 @@ def main():
         component = FieldVariable('component', 'parameter', cfield,
                                   primary_var_name='(set-to-None)')
 
-        nls_options = {'eps_a' : 1e-16, 'i_max' : 1}
-
         suffix = tss.ts.suffix
         def poststep_fun(ts, vec):
             _poststep_fun(ts, vec)
@@ -227,8 +225,7 @@ def main():
             # Probe the solution.
             dvel_qp = ev('ev_diffusion_velocity.%d.Omega(m.diffusivity, T)'
                          % order, copy_materials=False, mode='qp')
-            project_by_component(dvel, dvel_qp, component, order,
-                                 nls_options=nls_options)
+            project_by_component(dvel, dvel_qp, component, order)
 
             all_results = []
             for ii, probe in enumerate(probes):
@@ -198,7 +198,7 @@ def main():
     load = nm.r_[load_c[::-1], load_t]
 
 
-    if plt is None:
+    if not plt.is_available():
         output('matplotlib cannot be imported, printing raw data!')
         output(displacements)
         output(load)
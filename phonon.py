@@ -53,7 +53,7 @@ def main():
         from sfepy.base.base import debug_on_error; debug_on_error()
 
     if options.plot:
-        if plt is None:
+        if not plt.is_available():
             output('matplotlib.pyplot cannot be imported, ignoring option -p!')
             options.plot = False
         elif options.analyze_dispersion == False:
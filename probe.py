@@ -18,6 +18,28 @@ Generation options
 ------------------
 -o, --auto-dir, --same-dir, -f, --only-names, -s
 
+Batch mode
+----------
+python probe.py --batch [batch options] <input file> <results file>
+
+Probe the data in the results file corresponding to the problem defined in the
+input file in all or selected time steps. The input file options must contain
+the 'gen_probes' key. The probe points are located only once, then the data of
+the time steps are read one by one and all the probes are evaluated. The
+results of all probes and steps are saved into a single compressed NumPy file
+(.npz), see :func:`sfepy.discrete.probes.write_steps_results()`.
+
+The probed data names are mapped to the problem variables by the optional
+'probe_variables' dict of the input file options. By default, the data
+with the names of the problem variables are probed. Only the data in the mesh
+vertices can be probed, the cell data are skipped. The vertex data are
+interpolated into the nodes of higher order fields, see
+:func:`sfepy.discrete.probes.get_dofs_from_output()`.
+
+Batch options
+-------------
+-o, --auto-dir, --same-dir, --only-names, --steps
+
 Postprocessing mode
 -------------------
 python probe.py [postprocessing options] <probe file> <figure file>
@@ -48,7 +70,9 @@ from sfepy.base.ioutils import edit_filename
 from sfepy.base.conf import ProblemConf, get_standard_keywords
 from sfepy.discrete import Problem
 from sfepy.discrete.fem import MeshIO
-from sfepy.discrete.probes import write_results, read_results
+from sfepy.discrete.probes import (write_results, read_results,
+                                   get_dofs_from_output, probe_steps,
+                                   write_steps_results)
 import six
 
 helps = {
@@ -68,6 +92,11 @@ helps = {
     'probe only named data',
     'step' :
     'probe the given time step',
+    'batch' :
+    'batch mode: probe all data in the given time steps at once',
+    'steps' :
+    'the time steps to probe in the batch mode, given as a comma separated'
+    ' list, or "all" [default: %(default)s]',
     'close_limit' :
     'maximum limit distance of a point from the closest element allowed'
     ' for extrapolation. [default: %(default)s]',
@@ -170,6 +199,90 @@ def generate_probes(filename_input, filename_results, options,
 
                 output('data ->', os.path.normpath(txt_filename))
 
+def generate_probes_steps(filename_input, filename_results, options,
+                          conf=None, problem=None, probes=None, labels=None):
+    """
+    Probe data of many time steps and save them into a single file.
+    """
+    if conf is None:
+        required, other = get_standard_keywords()
+        conf = ProblemConf.from_file(filename_input, required, other)
+
+    opts = conf.options
+
+    if options.auto_dir:
+        output_dir = opts.get_('output_dir', '.')
+        filename_results = os.path.join(output_dir, filename_results)
+
+    output('results in: %s' % filename_results)
+
+    io = MeshIO.any_from_filename(filename_results)
+    all_steps, all_times = io.read_times()[:2]
+    if options.steps == 'all':
+        steps = all_steps
+
+    else:
+        steps = [int(step) for step in options.steps.split(',')]
+    times = dict(zip(all_steps, all_times))
+
+    if problem is None:
+        problem = Problem.from_conf(conf,
+                                    init_equations=False, init_solvers=False)
+
+    if probes is None:
+        gen_probes = conf.get_function(conf.options.gen_probes)
+        probes, labels = gen_probes(problem)
+
+    var_names = opts.get('probe_variables')
+    if var_names is None:
+        var_names = dict((var.name, var.name)
+                         for var in six.itervalues(conf.variables))
+
+    if options.only_names is not None:
+        var_names = dict((key, val) for key, val in six.iteritems(var_names)
+                         if key in options.only_names)
+
+    data = io.read_data(steps[0])
+    var_names = dict((key, val) for key, val in six.iteritems(var_names)
+                     if key in data)
+    for key in sorted(var_names.keys()):
+        if data[key].mode != 'vertex':
+            output('skipping %s: only vertex data can be probed!' % key)
+            var_names.pop(key)
+    output('probing:', sorted(var_names.keys()))
+    if not var_names:
+        output('no data to probe!')
+        return
+
+    variables = problem.create_variables(list(set(var_names.values())))
+    variables = dict((key, variables[val])
+                     for key, val in six.iteritems(var_names))
+
+    def gen_step_data(data):
+        for step in steps:
+            if data is None:
+                data = io.read_data(step)
+            output('step:', step)
+
+            yield (step, times.get(step, step),
+                   get_dofs_from_output(data, variables))
+            data = None
+
+    for probe in probes:
+        probe.set_options(close_limit=options.close_limit)
+
+    results = probe_steps(probes, variables, gen_step_data(data))
+
+    if options.output_filename_trunk is None:
+        options.output_filename_trunk = problem.ofn_trunk
+
+    filename = options.output_filename_trunk + '_probes.npz'
+    if options.same_dir:
+        filename = os.path.join(os.path.dirname(filename_results), filename)
+
+    write_steps_results(filename, probes, results, labels=labels)
+    output('data ->', os.path.normpath(filename))
+
 def integrate_along_line(x, y, is_radial=False):
     """
     Integrate numerically (trapezoidal rule) a function :math:`y=y(x)`.
@@ -249,6 +362,12 @@ def main():
     parser.add_argument('-s', '--step', type=int, metavar='step',
                         action='store', dest='step',
                         default=0, help=helps['step'])
+    parser.add_argument('--batch',
+                        action='store_true', dest='batch',
+                        default=False, help=helps['batch'])
+    parser.add_argument('--steps', metavar='steps',
+                        action='store', dest='steps',
+                        default='all', help=helps['steps'])
     parser.add_argument('-c', '--close-limit', type=float, metavar='distance',
                         action='store', dest='close_limit',
                         default=0.1, help=helps['close_limit'])
@@ -275,6 +394,8 @@ def main():
 
     if options.postprocess:
         postprocess(filename_input, filename_results, options)
+    elif options.batch:
+        generate_probes_steps(filename_input, filename_results, options)
     else:
         generate_probes(filename_input, filename_results, options)
 
@@ -10,6 +10,7 @@ from argparse import RawDescriptionHelpFormatter, ArgumentParser
 import numpy as nm
 
 from sfepy.base.base import output
+from sfepy.base.mem_usage import get_peak_rss
 from sfepy.discrete.fem import Mesh, FEDomain
 from sfepy.discrete.common.extmods.cmesh import graph_components
 
@@ -18,6 +19,9 @@ helps = {
     'mesh file name',
     'detailed' :
     'show additional information (entity volume statistics)',
+    'memory' :
+    'show the peak resident set size (RSS) of the process before and after'
+    ' reading the mesh',
 }
 
 def main():
@@ -27,9 +31,19 @@ def main():
     parser.add_argument('-d', '--detailed',
                         action='store_true', dest='detailed',
                         default=False, help=helps['detailed'])
+    parser.add_argument('-m', '--memory',
+                        action='store_true', dest='memory',
+                        default=False, help=helps['memory'])
     options = parser.parse_args()
 
+    rss0 = get_peak_rss()
     mesh = Mesh.from_file(options.filename)
+    rss1 = get_peak_rss()
+    if options.memory and (rss0 is not None):
+        mb = 1024.0**2
+        output('peak RSS before/after reading: %.2f MB / %.2f MB'
+               ' (increase: %.2f MB)' % (rss0 / mb, rss1 / mb,
+                                         (rss1 - rss0) / mb))
 
     output(mesh.cmesh)
     output('element types:', mesh.descs)
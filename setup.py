@@ -60,6 +60,7 @@ def configuration(parent_package='', top_path=None):
         'probe.py',
         'run_tests.py',
         'simple.py',
+        'solver_server.py',
         'test_install.py',
     ]
 
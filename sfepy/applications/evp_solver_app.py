@@ -34,7 +34,7 @@ class EVPSolverApp(PDESolverApp):
 
     def __init__(self, conf, options, output_prefix, **kwargs):
         PDESolverApp.__init__(self, conf, options, output_prefix,
-                              init_equations=False)
+                              init_equations=False, **kwargs)
 
     def setup_options(self):
         PDESolverApp.setup_options(self)
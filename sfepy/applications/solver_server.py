@@ -0,0 +1,408 @@
+"""
+A server for running many short simulations in forked worker processes.
+
+The server process keeps the imported modules and the domains (meshes) read
+from files, so that each job only pays for its own problem setup and
+solution. The jobs are described by JSON objects sent one per line, either
+to the standard input of the server, or to a UNIX socket. The job results
+are written as JSON objects, one per line, to the standard output, or to the
+socket, in the order of job completion.
+
+A job description can have the following items:
+
+- 'conf' : str, the problem description file name (required);
+- 'id' : any, the job identification, returned with the result;
+- 'define_args' : dict or str, the arguments of the define() function of
+  the problem description file;
+- 'options' : dict, the overrides of the problem description options;
+- 'output_dir' : str, the directory, in which the job output directory is
+  created. By default, the output_dir option of the problem description is
+  used;
+- 'output_filename_trunk' : str, the base name of the output files. A
+  directory part of the name is ignored;
+- 'log' : str, the file to log the job messages to. By default the
+  messages are discarded.
+
+A job result has the following items:
+
+- 'id' : the job identification;
+- 'status' : 'ok' or 'error';
+- 'error' : the error message, for failed jobs only;
+- 'output_dir' : the job output directory;
+- 'output_filenames' : the list of output files created by the job;
+- 'time' : the wall-clock time of the job.
+
+A special job ``{"command" : "quit"}`` stops the server after the running
+jobs are finished, ``{"command" : "clear_cache"}`` drops the cached
+domains.
+
+Each job writes its output files into a new directory (``job_*``) created
+in the 'output_dir' of the job, so that the output files of different jobs
+never collide, even for the same problem description and output file name
+trunk. All files in the job output directory are returned as the job output
+files.
+
+The domains are cached per mesh file name, modification time and size, and
+the 'mesh_renumbering' option, that is applied to the cached meshes. Each job runs in a forked child process, so that changes of the cached
+domain by a job (e.g. new regions, moved coordinates) do not affect other
+jobs.
+"""
+from __future__ import absolute_import
+import os
+import os.path as op
+import sys
+import json
+import select
+import tempfile
+import socket
+import traceback
+from collections import deque, OrderedDict
+
+from sfepy.base.base import output, Struct, IndexedStruct, dict_to_struct
+from sfepy.base.conf import ProblemConf, get_standard_keywords
+from sfepy.base.timing import Timer
+
+def get_mesh_key(filename, renumbering=None):
+    """
+    Get the cache key of a mesh file: its absolute path, modification time,
+    size and the mesh renumbering order.
+    """
+    filename = op.abspath(filename)
+    stat = os.stat(filename)
+
+    return (filename, stat.st_mtime, stat.st_size, renumbering)
+
+class SolverServer(Struct):
+    """
+    Run simulation jobs in forked worker processes, reusing domains read from
+    mesh files between the jobs.
+
+    Parameters
+    ----------
+    n_workers : int
+        The maximum number of concurrently running jobs.
+    max_domains : int
+        The maximum number of cached domains. The least recently used ones
+        are evicted first.
+    """
+
+    def __init__(self, n_workers=1, max_domains=16):
+        Struct.__init__(self, n_workers=max(n_workers, 1),
+                        max_domains=max_domains, domains=OrderedDict(),
+                        stop=False)
+
+    def clear_cache(self):
+        """
+        Drop all cached domains.
+        """
+        self.domains = OrderedDict()
+
+    def load_conf(self, job):
+        """
+        Load the problem description of a job.
+        """
+        required, other = get_standard_keywords()
+        conf = ProblemConf.from_file(job['conf'], required, other,
+                                     define_args=job.get('define_args'))
+
+        options = job.get('options')
+        if options:
+            conf.options = (dict_to_struct(options, flag=(1,),
+                                           constructor=type(conf.options))
+                            + conf.options)
+
+        return conf
+
+    def get_domain(self, conf):
+        """
+        Get the domain of a problem description, either from the cache, or
+        read from the mesh file and cached. As in :func:`Problem.from_conf()
+        <sfepy.discrete.problem.Problem.from_conf()>`, the mesh is renumbered
+        according to the 'mesh_renumbering' option.
+
+        Returns
+        -------
+        domain : FEDomain instance or None
+            The domain, or None if the domain cannot be cached, e.g. the mesh
+            is not given by a file name.
+        """
+        from sfepy.discrete.fem import Mesh, FEDomain
+
+        filename_mesh = conf.get('filename_mesh')
+        if not isinstance(filename_mesh, str):
+            return None
+
+        if not conf.options.get('absolute_mesh_path', False):
+            filename_mesh = op.join(op.dirname(conf.funmod.__file__),
+                                    filename_mesh)
+
+        order = conf.options.get('mesh_renumbering')
+        key = get_mesh_key(filename_mesh, order)
+        domain = self.domains.pop(key, None)
+        if domain is None:
+            output('caching domain of %s...' % key[0])
+            mesh = Mesh.from_file(filename_mesh)
+            if order is not None:
+                mesh = mesh.create_renumbered(order)
+            domain = FEDomain(mesh.name, mesh)
+
+        self.domains[key] = domain
+        while len(self.domains) > self.max_domains:
+            self.domains.popitem(last=False)
+
+        return domain
+
+    def solve(self, conf, domain, job):
+        """
+        Solve the problem of a job - called in the worker process.
+
+        The output files are all the files in the new job output directory.
+        """
+        from sfepy.applications import PDESolverApp, EVPSolverApp
+
+        timer = Timer(start=True)
+
+        output_dir = job.get('output_dir',
+                             conf.options.get('output_dir', os.curdir))
+        if not op.exists(output_dir):
+            os.makedirs(output_dir)
+        output_dir = tempfile.mkdtemp(prefix='job_', dir=output_dir)
+        conf.options.output_dir = output_dir
+
+        trunk = job.get('output_filename_trunk')
+        if trunk is not None:
+            trunk = op.basename(trunk)
+
+        options = Struct(output_filename_trunk=trunk,
+                         save_ebc=False,
+                         save_ebc_nodes=False,
+                         save_regions=False,
+                         save_field_meshes=False,
+                         save_regions_as_groups=False,
+                         solve_not=False)
+
+        opts = conf.options
+        output_prefix = opts.get('output_prefix', 'sfepy:')
+        if opts.get('evps') is None:
+            app = PDESolverApp(conf, options, output_prefix, domain=domain)
+
+        else:
+            app = EVPSolverApp(conf, options, output_prefix, domain=domain)
+
+        if hasattr(opts, 'parametric_hook'): # Parametric study.
+            parametric_hook = conf.get_function(opts.parametric_hook)
+            app.parametrize(parametric_hook)
+
+        app(status=IndexedStruct())
+
+        filenames = []
+        for dirpath, dirnames, names in os.walk(output_dir):
+            filenames.extend(op.abspath(op.join(dirpath, name))
+                             for name in names)
+
+        return {'status' : 'ok',
+                'output_dir' : op.abspath(output_dir),
+                'output_filenames' : sorted(filenames),
+                'time' : timer.stop()}
+
+    def start_job(self, job):
+        """
+        Start a job in a forked worker process.
+
+        The problem description is loaded and the domain is obtained in the
+        server process, so that the domain stays cached for the next jobs.
+
+        Returns
+        -------
+        worker : Struct or dict
+            The worker information, or directly the result dict, if the job
+            failed before starting the worker.
+        """
+        timer = Timer(start=True)
+        try:
+            conf = self.load_conf(job)
+            domain = self.get_domain(conf)
+
+        except:
+            return {'id' : job.get('id'), 'status' : 'error',
+                    'error' : traceback.format_exc(), 'time' : timer.stop()}
+
+        rfd, wfd = os.pipe()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            # Worker process.
+            os.close(rfd)
+            code = 0
+            try:
+                log = open(job.get('log', os.devnull), 'w')
+                # Redirect both the Python and the C level standard output,
+                # sys.stdout need not be the original one.
+                os.dup2(log.fileno(), 1)
+                sys.stdout = log
+                output.set_output(filename=None, quiet=False)
+
+                result = self.solve(conf, domain, job)
+
+            except:
+                result = {'status' : 'error',
+                          'error' : traceback.format_exc()}
+                code = 1
+
+            result['id'] = job.get('id')
+            result['time'] = timer.stop()
+            with os.fdopen(wfd, 'w') as fd:
+                json.dump(result, fd)
+
+            sys.stdout.flush()
+            os._exit(code)
+
+        os.close(wfd)
+
+        return Struct(pid=pid, fd=rfd, job=job, timer=timer)
+
+    def finish_job(self, worker):
+        """
+        Collect the result of a finished worker process.
+        """
+        data = []
+        while 1:
+            chunk = os.read(worker.fd, 65536)
+            if not chunk: break
+            data.append(chunk)
+        os.close(worker.fd)
+        os.waitpid(worker.pid, 0)
+
+        try:
+            result = json.loads(b''.join(data).decode('utf-8'))
+
+        except ValueError:
+            result = {'id' : worker.job.get('id'), 'status' : 'error',
+                      'error' : 'worker process crashed!',
+                      'time' : worker.timer.stop()}
+
+        return result
+
+    def _process_command(self, job):
+        command = job.get('command')
+        if command == 'quit':
+            self.stop = True
+
+        elif command == 'clear_cache':
+            self.clear_cache()
+
+        else:
+            return {'id' : job.get('id'), 'status' : 'error',
+                    'error' : 'unknown command! (%s)' % command}
+
+        return {'id' : job.get('id'), 'status' : 'ok', 'command' : command}
+
+    def serve(self, in_fd, write_result):
+        """
+        Read job descriptions (JSON lines) from the file descriptor `in_fd`
+        until the end of file or the quit command, run them and pass the
+        results to `write_result()`.
+        """
+        running = {}
+        pending = deque()
+        buf = b''
+        eof = False
+        while 1:
+            while pending and (len(running) < self.n_workers):
+                worker = self.start_job(pending.popleft())
+                if isinstance(worker, dict):
+                    write_result(worker)
+
+                else:
+                    running[worker.fd] = worker
+
+            if (eof or self.stop) and not (pending or running):
+                break
+
+            fds = list(running.keys())
+            if not (eof or self.stop):
+                fds.append(in_fd)
+
+            ready = select.select(fds, [], [])[0]
+            for fd in ready:
+                if fd == in_fd:
+                    chunk = os.read(in_fd, 65536)
+                    if chunk:
+                        lines = (buf + chunk).split(b'\n')
+                        buf = lines.pop()
+
+                    else:
+                        lines, buf = [buf], b''
+                        eof = True
+
+                    for line in lines:
+                        line = line.strip()
+                        if not line: continue
+
+                        try:
+                            job = json.loads(line.decode('utf-8'))
+
+                        except ValueError:
+                            write_result({'id' : None, 'status' : 'error',
+                                          'error' : 'invalid job! (%s)'
+                                          % line.decode('utf-8')})
+                            continue
+
+                        if 'command' in job:
+                            write_result(self._process_command(job))
+
+                        elif not self.stop:
+                            pending.append(job)
+
+                else:
+                    write_result(self.finish_job(running.pop(fd)))
+
+    def serve_stdin(self):
+        """
+        Serve jobs from the standard input, write results to the standard
+        output. Anything else written to the standard output is redirected to
+        the standard error.
+        """
+        out = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+        sys.stdout.flush()
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+        def write_result(result):
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+
+        self.serve(sys.stdin.fileno(), write_result)
+
+    def serve_socket(self, path):
+        """
+        Serve jobs from connections to the UNIX socket `path`, one connection
+        at a time. The results are sent back over the same connection.
+        """
+        if op.exists(path):
+            os.remove(path)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(path)
+        sock.listen(1)
+        output('listening on %s' % path)
+
+        try:
+            while not self.stop:
+                conn, _ = sock.accept()
+
+                def write_result(result):
+                    conn.sendall((json.dumps(result) + '\n').encode('utf-8'))
+
+                try:
+                    self.serve(conn.fileno(), write_result)
+
+                except socket.error as exc:
+                    output('connection error: %s' % exc)
+
+                finally:
+                    conn.close()
+
+        finally:
+            sock.close()
+            os.remove(path)
@@ -197,6 +197,73 @@ def try_imports(imports, fail_msg=None):
 
     return locals()
 
+class LazyModule(object):
+    """
+    A proxy of a module that is imported on the first attribute access.
+
+    Used for optional or heavy dependencies, so that importing SfePy modules
+    does not import them unless they are really needed.
+
+    Parameters
+    ----------
+    name : str
+        The full module name.
+    on_load : callable, optional
+        If given, it is called with the imported module as the argument right
+        after the import.
+
+    Examples
+    --------
+    >>> pt = LazyModule('tables')
+    >>> if pt.is_available():
+    ...     fd = pt.open_file(filename, mode='r')
+    """
+
+    _module_attrs = ('__name__', '__file__', '__path__', '__version__',
+                     '__all__', '__spec__')
+
+    def __init__(self, name, on_load=None):
+        self.__dict__.update(_name=name, _on_load=on_load, _module=None)
+
+    def _load(self):
+        if self._module is None:
+            import importlib
+
+            module = importlib.import_module(self._name)
+            if self._on_load is not None:
+                self._on_load(module)
+
+            self.__dict__['_module'] = module
+
+        return self._module
+
+    def is_available(self):
+        """
+        Return True if the module can be imported.
+        """
+        try:
+            self._load()
+
+        except (ImportError, RuntimeError):
+            return False
+
+        return True
+
+    def __getattr__(self, name):
+        if (name.startswith('__') and (self._module is None)
+            and (name not in self._module_attrs)):
+            # Do not import the module on introspection, e.g. by issubclass().
+            raise AttributeError(name)
+
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __repr__(self):
+        status = 'imported' if self._module is not None else 'not imported'
+        return '<LazyModule %s (%s)>' % (self._name, status)
+
 def python_shell(frame=0):
     import code
     frame = sys._getframe(frame+1)
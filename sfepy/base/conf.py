@@ -243,7 +243,7 @@ def transform_functions(adict):
     d2 = {}
     for ii, (key, conf) in enumerate(six.iteritems(adict)):
         if isinstance(conf, tuple):
-            c2 = tuple_to_conf(key, conf, ['function'])
+            c2 = tuple_to_conf(key, conf, ['function', 'depends_on'])
             d2['function_%s__%d' % (c2.name, ii)] = c2
         else:
             c2 = transform_to_struct_1(conf)
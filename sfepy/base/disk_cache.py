@@ -0,0 +1,182 @@
+"""
+Persistent content-addressed cache of numpy arrays on disk.
+
+Each cache entry is a directory named by the entry key, that contains the
+entry arrays stored as ``.npy`` files. The arrays are loaded as memory-mapped
+files, so that only the data actually used are read from the disk.
+"""
+from __future__ import absolute_import
+import os
+import os.path as op
+import shutil
+import hashlib
+
+import numpy as nm
+
+from sfepy.base.base import output, Struct, basestr
+import six
+
+def get_hash(*items):
+    """
+    Get a hexadecimal SHA1 hash of the given items. The supported items are
+    numpy arrays, None, strings, numbers and (nested) lists and tuples of those.
+    """
+    sha = hashlib.sha1()
+
+    def _update(item):
+        if isinstance(item, nm.ndarray):
+            sha.update(('array%s%s' % (item.dtype.str, item.shape))
+                       .encode('utf-8'))
+            sha.update(nm.ascontiguousarray(item).data)
+
+        elif isinstance(item, (list, tuple)):
+            sha.update(('seq%d' % len(item)).encode('utf-8'))
+            for ii in item:
+                _update(ii)
+
+        elif (item is None) or isinstance(item, (basestr, bool, float)
+                                          + six.integer_types):
+            sha.update(('%s:%r' % (type(item).__name__, item))
+                       .encode('utf-8'))
+
+        else:
+            raise ValueError('unsupported item type! (%s)' % type(item))
+
+    for item in items:
+        _update(item)
+
+    return sha.hexdigest()
+
+class DiskCache(Struct):
+    """
+    Persistent cache of named numpy arrays, stored in a directory.
+
+    Parameters
+    ----------
+    dirname : str
+        The cache directory. It is created if it does not exist.
+    max_size : float, optional
+        The maximum size of the cache in MB. When exceeded, the least recently
+        used entries are removed. If None, the size is not limited.
+    """
+
+    def __init__(self, dirname, max_size=None):
+        dirname = op.abspath(dirname)
+        if not op.exists(dirname):
+            os.makedirs(dirname)
+
+        Struct.__init__(self, dirname=dirname, max_size=max_size)
+
+    def _get_entry_dir(self, key):
+        return op.join(self.dirname, key)
+
+    def get(self, key):
+        """
+        Get the arrays stored under the given `key`.
+
+        Returns
+        -------
+        data : dict or None
+            The memory-mapped arrays stored under `key`, or None, if there is
+            no such entry.
+        """
+        entry = self._get_entry_dir(key)
+        if not op.isdir(entry):
+            return None
+
+        try:
+            data = {}
+            for filename in os.listdir(entry):
+                name, ext = op.splitext(filename)
+                if ext != '.npy': continue
+
+                filename = op.join(entry, filename)
+                try:
+                    data[name] = nm.load(filename, mmap_mode='r')
+
+                except ValueError:
+                    # Empty arrays cannot be memory-mapped.
+                    data[name] = nm.load(filename)
+
+            # Mark as recently used.
+            os.utime(entry, None)
+
+        except (IOError, OSError, ValueError):
+            # Removed by another process or damaged.
+            return None
+
+        return data
+
+    def put(self, key, data):
+        """
+        Store the arrays of the `data` dict under the given `key`. The entry
+        is first written to a temporary directory that is then renamed, so
+        that concurrent readers never see partially written entries.
+        """
+        entry = self._get_entry_dir(key)
+        if op.isdir(entry):
+            return
+
+        tmp = '%s.tmp%d' % (entry, os.getpid())
+        if not op.exists(tmp):
+            os.makedirs(tmp)
+
+        for name, val in six.iteritems(data):
+            nm.save(op.join(tmp, name + '.npy'), nm.asarray(val))
+
+        try:
+            os.rename(tmp, entry)
+
+        except OSError:
+            # Stored meanwhile by another process.
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        self.evict()
+
+    def get_entries(self):
+        """
+        Get the list of (key, size in bytes, last use time) of all cache
+        entries, sorted from the least recently used.
+        """
+        entries = []
+        for key in os.listdir(self.dirname):
+            entry = self._get_entry_dir(key)
+            if ('.tmp' in key) or not op.isdir(entry): continue
+
+            try:
+                size = sum(op.getsize(op.join(entry, ii))
+                           for ii in os.listdir(entry))
+                entries.append((key, size, op.getmtime(entry)))
+
+            except OSError:
+                continue
+
+        entries.sort(key=lambda x: x[2])
+
+        return entries
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache size is within
+        `max_size`.
+        """
+        if self.max_size is None:
+            return
+
+        max_size = self.max_size * 1024**2
+
+        entries = self.get_entries()
+        size = sum(ii[1] for ii in entries)
+        for key, esize, _ in entries:
+            if size <= max_size: break
+
+            output('disk cache: removing %s' % key)
+            shutil.rmtree(self._get_entry_dir(key), ignore_errors=True)
+            size -= esize
+
+    def clear(self):
+        """
+        Remove all cache entries.
+        """
+        for key, _, _ in self.get_entries():
+            shutil.rmtree(self._get_entry_dir(key), ignore_errors=True)
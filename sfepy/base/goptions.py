@@ -27,6 +27,7 @@ def validate_bool(val):
 default_goptions = {
     'verbose' : [True, validate_bool],
     'check_term_finiteness' : [False, validate_bool],
+    'reuse_term_buffers' : [True, validate_bool],
 }
 
 class ValidatedDict(dict):
@@ -7,16 +7,14 @@ import os.path as op
 import fnmatch
 import shutil
 import glob
-from .base import output, ordered_iteritems, Struct, basestr
+from .base import output, ordered_iteritems, Struct, basestr, LazyModule
 import six
 import pickle
 import warnings
 import scipy.sparse as sp
 
-try:
-    import tables as pt
-except:
-    pt = None
+# PyTables is imported on the first use.
+pt = LazyModule('tables')
 
 class InDir(Struct):
     """
@@ -930,6 +928,39 @@ class HDF5ContextManager:
            self.file.close()
            self.file = None
 
+class HDF5ArrayReader(Struct):
+    """
+    Read a HDF5 array directly into a given output buffer.
+
+    If the buffer and the array data types differ, the data are read in
+    blocks of `chunk_size` rows and converted, so that a temporary copy of the
+    whole array is never made.
+    """
+
+    def __init__(self, node, chunk_size=1000000):
+        Struct.__init__(self, node=node, shape=node.shape, dtype=node.dtype,
+                        chunk_size=chunk_size)
+
+    def read(self, out=None):
+        if out is None:
+            return self.node.read()
+
+        if out.dtype == self.dtype:
+            self.node.read(out=out)
+
+        elif ((out.dtype.kind in 'iu') and (self.dtype.kind in 'iu')
+              and (out.dtype.itemsize == self.dtype.itemsize)):
+            # Non-negative integers have the same representation.
+            self.node.read(out=out.view(self.dtype))
+
+        else:
+            n_row = self.shape[0]
+            for ir in range(0, n_row, self.chunk_size):
+                ir2 = min(ir + self.chunk_size, n_row)
+                out[ir:ir2] = self.node.read(ir, ir2)
+
+        return out
+
 def get_or_create_hdf5_group(fd, path, from_group=None):
     if from_group is None:
        from_group = fd.root
@@ -160,3 +160,18 @@ def raise_if_too_large(size, factor=1.0):
         raise MemoryError('insufficent memory {} MB to allocate {} MB'
                           ' with safety factor {}'
                           .format(mem.total/mb, size/mb, factor))
+
+def get_peak_rss():
+    """
+    Get the peak resident set size of the current process in bytes, or None,
+    if it cannot be determined (the `resource` module is not available).
+    """
+    try:
+        import resource
+
+    except ImportError:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return rss if sys.platform == 'darwin' else rss * 1024
@@ -1,14 +1,11 @@
 from __future__ import print_function
 import numpy as nm
 
-try:
-    import matplotlib.pyplot as plt
-    import matplotlib as mpl
-except (ImportError, RuntimeError):
-    plt = mpl = None
-    #print 'matplotlib import failed!'
-
-from sfepy.base.base import output, pause
+from sfepy.base.base import output, pause, LazyModule
+
+# matplotlib is imported on the first use.
+plt = LazyModule('matplotlib.pyplot')
+mpl = LazyModule('matplotlib')
 
 def spy(mtx, eps=None, color='b', **kwargs):
     """
@@ -284,12 +284,13 @@ class EquationMap(Struct):
     def _init_empty(self, field):
         self.val_ebc = nm.empty((0,), dtype=field.dtype)
 
-        if field.get('unused_dofs') is None:
+        if ((field.get('unused_dofs') is None)
+            and (field.get('node_order') is None)):
             self.eqi = nm.arange(self.var_di.n_dof, dtype=nm.int32)
 
         else:
             self._mark_unused(field)
-            self.eqi = nm.compress(self.eq >= 0, self.eq)
+            self.eqi = self._get_active_dofs(field)
             self.eq[self.eqi] = nm.arange(self.eqi.shape[0], dtype=nm.int32)
 
         self.eq_ebc = nm.empty((0,), dtype=nm.int32)
@@ -308,6 +309,20 @@ class EquationMap(Struct):
                                                self.dof_names, self.dof_names)
             self.eq[unused] = -3
 
+    def _get_active_dofs(self, field):
+        """
+        Get the active DOFs in the order of equations, given by the field
+        nodes order, if set, see :func:`Field.set_dof_order()
+        <sfepy.discrete.common.fields.Field.set_dof_order>`.
+        """
+        node_order = field.get('node_order')
+        if node_order is None:
+            return nm.compress(self.eq >= 0, self.eq)
+
+        dof_order = expand_nodes_to_dofs(node_order, self.dpn).ravel()
+
+        return dof_order[self.eq[dof_order] >= 0]
+
     def map_equations(self, bcs, field, ts, functions, problem=None,
                       warn=False):
         """
@@ -509,7 +524,7 @@ class EquationMap(Struct):
 
         self._mark_unused(field)
 
-        self.eqi = nm.compress(self.eq >= 0, self.eq)
+        self.eqi = self._get_active_dofs(field)
         self.eq[self.eqi] = nm.arange(self.eqi.shape[0], dtype=nm.int32)
         self.eq[self.master] = self.eq[self.slave]
         self.n_eq = self.eqi.shape[0]
@@ -56,9 +56,16 @@ cdef _create_cconn(MeshConnectivity *pconn, num, n_incident, what):
 cdef class CMesh:
 
     @classmethod
-    def from_data(cls, coors, vertex_groups, conns, mat_ids, descs):
+    def from_data(cls, coors, vertex_groups, conns, mat_ids, descs,
+                  copy=True):
         """
         Fill CMesh data using Python data.
+
+        The items of `conns` can be either arrays, or objects with the `shape`
+        attribute and the `read(out=None)` method, e.g. HDF5 arrays, that are
+        used to read the connectivity directly into the CMesh buffers. If
+        `copy` is False, `coors` (a C-contiguous float64 array) are used
+        without copying.
         """
         cdef uint32 tdim
         cdef np.ndarray[float64, mode='c', ndim=2] _coors
@@ -81,7 +88,7 @@ cdef class CMesh:
         if (self.dim < 1) or (self.dim > 3):
             raise ValueError('CMesh geometry dimension must be 1, 2 or 3! (%d)'
                              % self.dim)
-        _coors = self.coors = coors.copy()
+        _coors = self.coors = coors.copy() if copy else coors
         mesh_set_coors(self.mesh, &_coors[0, 0], self.n_coor, self.dim, tdim)
 
         self.vertex_groups = vertex_groups
@@ -103,16 +110,24 @@ cdef class CMesh:
 
         self.cell_groups = mat_ids
 
-        indices = []
-        offsets = []
+        # Fill the connectivity buffers in place, without temporary copies.
+        cconn.offsets[0] = 0
         ict = 0
+        iin = 0
         for ig, conn in enumerate(conns):
             n_el, n_ep = conn.shape
 
-            off = np.empty(n_el, dtype=np.uint32)
-            off.fill(n_ep)
-            offsets.append(off)
-            indices.append(conn.ravel())
+            out = cconn.indices[iin:iin+n_el*n_ep].reshape((n_el, n_ep))
+            if isinstance(conn, np.ndarray):
+                out[...] = conn
+
+            else:
+                conn.read(out=out)
+
+            off = cconn.offsets[ict+1:ict+n_el+1]
+            off[:] = np.arange(1, n_el + 1, dtype=np.uint32)
+            off *= n_ep
+            off += iin
 
             if descs[ig] in self.key_to_index:
                 self.cell_types[ict:ict+n_el] = self.key_to_index[descs[ig]]
@@ -121,13 +136,7 @@ cdef class CMesh:
                 self.cell_types[ict:ict+n_el] = 5 # Higher order mesh.
 
             ict += n_el
-
-        indices = np.concatenate(indices)
-        offsets = np.concatenate(offsets)
-
-        cconn.indices[:] = indices
-        cconn.offsets[0] = 0
-        cconn.offsets[1:] = np.cumsum(offsets)
+            iin += n_el * n_ep
 
         self.conns = [None] * (self.mesh.topology.max_dim + 1)**2
         self.conns[ii] = cconn
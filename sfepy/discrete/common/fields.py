@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import numpy as nm
+import scipy.sparse as sps
 
 from sfepy.base.base import output, iter_dict_of_lists, Struct, basestr
 from sfepy.base.timing import Timer
@@ -178,9 +179,11 @@ class Field(Struct):
 
     def clear_mappings(self, clear_all=False):
         """
-        Clear current reference mappings.
+        Clear current reference mappings, and the projectors that depend on
+        them.
         """
         self.mappings = {}
+        self.projectors = {}
         if clear_all:
             if hasattr(self, 'mappings0'):
                 self.mappings0.clear()
@@ -241,7 +244,7 @@ class Field(Struct):
             out = self.mappings.get(key, None)
 
         if out is None:
-            out = self.create_mapping(region, integral, integration)
+            out = self.create_cached_mapping(region, integral, integration)
             self.mappings[key] = out
 
         if return_key:
@@ -249,6 +252,136 @@ class Field(Struct):
 
         return out
 
+    def set_mappings_cache(self, cache):
+        """
+        Set the persistent (disk) cache of reference mappings.
+
+        Parameters
+        ----------
+        cache : DiskCache instance or None
+            The cache. If None, the persistent caching is disabled.
+        """
+        self.mappings_cache = cache
+
+    def set_dof_order(self, order=None):
+        """
+        Set the order of the field nodes, and thus DOFs, in the numbering of
+        equations. The DOF (and output) data layout of the field is not
+        changed. The order is stored in `self.node_order`.
+
+        Parameters
+        ----------
+        order : None, 'rcm', 'hilbert' or 'morton'
+            The field nodes ordering: 'rcm' is the reverse Cuthill-McKee
+            ordering of the graph of the nodes connected by cells, 'hilbert'
+            and 'morton' order the node coordinates along a space-filling
+            curve. If None, the natural order is used.
+        """
+        if order is None:
+            self.node_order = None
+            return
+
+        if order == 'rcm':
+            from scipy.sparse.csgraph import reverse_cuthill_mckee
+            from sfepy.discrete.common.extmods.cmesh import create_mesh_graph
+
+            econn = self.get('econn')
+            if econn is None:
+                econn = self.get_econn('volume', self.region)
+            econn = nm.ascontiguousarray(econn, dtype=nm.int32)
+
+            nnz, prow, icol = create_mesh_graph(self.n_nod, self.n_nod, 1,
+                                                [econn], [econn])
+            graph = sps.csr_matrix((nm.ones(nnz, dtype=nm.int8), icol, prow),
+                                   (self.n_nod, self.n_nod))
+            node_order = reverse_cuthill_mckee(graph, symmetric_mode=True)
+
+        elif order in ('hilbert', 'morton'):
+            from sfepy.linalg.geometry import get_space_filling_order
+
+            node_order = get_space_filling_order(self.get_coor(), order)
+
+        else:
+            raise ValueError('unknown DOF order! (%s)' % order)
+
+        self.node_order = node_order.astype(nm.int32)
+
+    def get_mapping_cache_key(self, region, integral, integration):
+        """
+        Get the key of a reference mapping in the persistent mappings cache,
+        or None, if the mapping cannot be cached. This default implementation
+        returns None.
+        """
+        return None
+
+    def _restore_mapping_info(self, cmap, region, integral, integration):
+        """
+        Restore auxiliary data of a reference mapping loaded from the
+        persistent mappings cache.
+        """
+        pass
+
+    def create_cached_mapping(self, region, integral, integration):
+        """
+        Create a new reference mapping, using the persistent mappings cache,
+        if it is set by :func:`Field.set_mappings_cache()`.
+
+        Only the volume and surface mappings are cached. A cached mapping
+        is loaded from the memory-mapped cache files, instead of computing the
+        jacobians, base function derivatives, volumes and normals.
+        """
+        from sfepy.discrete.common.extmods.mappings import CMapping
+        from sfepy.discrete.common.mappings import Mapping
+
+        cache = self.get('mappings_cache', None)
+        key = None
+        if (cache is not None) and (integration in ('volume', 'surface')):
+            key = self.get_mapping_cache_key(region, integral, integration)
+
+        if key is None:
+            return self.create_mapping(region, integral, integration)
+
+        data = cache.get(key)
+        if data is None:
+            cmap, mapping = self.create_mapping(region, integral, integration)
+
+            data = {'bf' : cmap.bf, 'det' : cmap.det, 'volume' : cmap.volume}
+            if cmap.bfg is not None:
+                data['bfg'] = cmap.bfg
+
+            if cmap.normal is not None:
+                data['normal'] = cmap.normal
+
+            cache.put(key, data)
+
+            return cmap, mapping
+
+        bf = data['bf']
+        n_el, n_qp = data['det'].shape[:2]
+        mode = 'volume' if 'bfg' in data else 'surface'
+        if mode == 'volume':
+            dim = data['bfg'].shape[2]
+
+        else:
+            dim = data['normal'].shape[2]
+
+        cmap = CMapping(n_el, n_qp, dim, bf.shape[3], mode=mode,
+                        flag=bf.shape[0] > 1)
+        cmap.bf[:] = bf
+        cmap.det[:] = data['det']
+        cmap.volume[:] = data['volume']
+        if mode == 'volume':
+            cmap.bfg[:] = data['bfg']
+
+        else:
+            cmap.normal[:] = data['normal']
+
+        self._restore_mapping_info(cmap, region, integral, integration)
+
+        mapping = Mapping.from_args(region, 'v' if mode == 'volume' else 's')
+
+        return cmap, mapping
+
     def create_eval_mesh(self):
         """
         Create a mesh for evaluating the field. The default implementation
@@ -391,3 +524,83 @@ class Field(Struct):
 
         else:
             return vals
+
+    def create_interp_operator(self, coors, mode='val', strategy='general',
+                               close_limit=0.1, get_cells_fun=None,
+                               cache=None, verbose=False):
+        """
+        Create a sparse operator interpolating DOF values corresponding to the
+        field into the given coordinates using the field interpolation.
+
+        The operator can be applied repeatedly to different DOF values for
+        the price of a sparse matrix-vector product, instead of repeating the
+        reference coordinates search and the basis evaluation done by
+        :func:`Field.evaluate_at()`.
+
+        Parameters
+        ----------
+        coors : array, shape ``(n_coor, dim)``
+            The coordinates the source values should be interpolated into.
+        mode : {'val', 'grad'}, optional
+            The evaluation mode: the field value (default) or the field value
+            gradient.
+        strategy, close_limit, get_cells_fun, cache, verbose
+            See :func:`Field.evaluate_at()`.
+
+        Returns
+        -------
+        operator : InterpolationOperator instance
+            The interpolation operator, see
+            :class:`InterpolationOperator
+            <sfepy.discrete.common.global_interp.InterpolationOperator>`.
+        """
+        import scipy.sparse as sps
+        from sfepy.discrete.common.global_interp import (get_ref_coors,
+                                                         InterpolationOperator)
+        from sfepy.discrete.common.extmods.crefcoors import evaluate_in_rc
+
+        ref_coors, cells, status = get_ref_coors(self, coors,
+                                                 strategy=strategy,
+                                                 close_limit=close_limit,
+                                                 get_cells_fun=get_cells_fun,
+                                                 cache=cache,
+                                                 verbose=verbose)
+
+        timer = Timer(start=True)
+
+        if mode == 'val':
+            bdim = 1
+            cmode = 0
+
+        elif mode == 'grad':
+            bdim = coors.shape[1]
+            cmode = 1
+
+        else:
+            raise ValueError('unknown evaluation mode! (%s)' % mode)
+
+        econn = self.get_econn('volume', self.region)
+        n_ep = econn.shape[1]
+
+        # Interpolating the identity matrix through the local element
+        # connectivity yields the basis function values (gradients).
+        lconn = nm.tile(nm.arange(n_ep, dtype=nm.int32), (econn.shape[0], 1))
+        bfs = nm.zeros((coors.shape[0], n_ep, bdim), dtype=nm.float64)
+
+        ctx = self.create_basis_context()
+        evaluate_in_rc(bfs, ref_coors, cells, status,
+                       nm.eye(n_ep, dtype=nm.float64), lconn, cmode, ctx)
+
+        ii = nm.where(status <= 1)[0]
+        rows = ii[:, None, None] * bdim + nm.arange(bdim)[None, None, :]
+        rows = nm.broadcast_to(rows, (len(ii), n_ep, bdim))
+        cols = nm.broadcast_to(econn[cells[ii]][..., None],
+                               (len(ii), n_ep, bdim))
+        matrix = sps.csr_matrix((bfs[ii].ravel(),
+                                 (rows.ravel(), cols.ravel())),
+                                shape=(coors.shape[0] * bdim, self.n_nod))
+
+        output('interpolation operator: %f s' % timer.stop(), verbose=verbose)
+
+        return InterpolationOperator(self, mode, matrix,
+                                     ref_coors, cells, status)
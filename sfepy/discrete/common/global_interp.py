@@ -3,7 +3,7 @@ Global interpolation functions.
 """
 import numpy as nm
 
-from sfepy.base.base import assert_, output, get_default_attr
+from sfepy.base.base import assert_, output, get_default_attr, Struct
 from sfepy.base.timing import Timer
 from sfepy.discrete.fem.geometry_element import create_geometry_elements
 import sfepy.discrete.common.extmods.crefcoors as crc
@@ -119,7 +119,118 @@ def get_ref_coors_convex(field, coors, close_limit=0.1, cache=None,
 
     return ref_coors, cells, status
 
-def get_potential_cells(coors, cmesh, centroids=None, extrapolate=True):
+def _expand_ranges(starts, counts):
+    """
+    Concatenate the integer ranges ``starts[i]:starts[i]+counts[i]``.
+    """
+    # Avoid float results of mixed signed/unsigned (e.g. CMesh uint32)
+    # arithmetic.
+    starts = nm.asarray(starts, dtype=nm.intp)
+    counts = nm.asarray(counts, dtype=nm.intp)
+    ends = nm.cumsum(counts)
+    total = ends[-1] if len(ends) else 0
+
+    return nm.arange(total) + nm.repeat(starts - (ends - counts), counts)
+
+def create_cell_grid(cmesh, centroids=None, max_bins_per_cell=4,
+                     max_cell_bins=None):
+    """
+    Create a uniform grid of bins over the cell boxes of a cmesh, for a fast
+    location of points in cells.
+
+    The cell box is the cube centered at the cell centroid, with the half-size
+    given by the maximum infinity-norm distance of the cell vertices from the
+    centroid. Each bin stores the cells with boxes intersecting the bin. The
+    cells with boxes intersecting more than `max_cell_bins` bins, e.g. the
+    coarse cells of strongly graded meshes, are not stored in the bins, but
+    in a separate list of large cells, that are checked for all points.
+
+    Parameters
+    ----------
+    cmesh : CMesh instance
+        The cmesh defining the cells.
+    centroids : array, optional
+        The centroids of the cells.
+    max_bins_per_cell : int
+        The maximum number of bins per cell. The bin size is about the average
+        cell box size, unless the number of bins would exceed this limit.
+    max_cell_bins : int, optional
+        The maximum number of bins intersected by a box of a cell stored in
+        the bins. By default, it is ``4**dim``.
+
+    Returns
+    -------
+    grid : Struct instance
+        The grid data: the grid origin, bin size and shape, the cell boxes,
+        the cells in bins in the CSR format (`bin_cells`, `bin_offsets`) and
+        the large cells (`large_cells`).
+    """
+    if centroids is None:
+        centroids = cmesh.get_centroids(cmesh.tdim)
+
+    conn = cmesh.get_cell_conn()
+    cc = conn.indices.reshape(cmesh.n_el, -1)
+    cell_coors = cmesh.coors[cc]
+
+    rays = cell_coors - centroids[:, None]
+    radii = nm.linalg.norm(rays, ord=nm.inf, axis=2).max(axis=1)
+
+    box_min = centroids - radii[:, None]
+    box_max = centroids + radii[:, None]
+
+    origin = box_min.min(axis=0)
+    extent = box_max.max(axis=0) - origin
+    extent = nm.where(extent > 0.0, extent, 1.0)
+
+    dim = cmesh.dim
+    size = max(2.0 * radii.mean(), 1e-14 * extent.max())
+    shape = nm.maximum(nm.ceil(extent / size), 1)
+    n_max = max_bins_per_cell * max(cmesh.n_el, 1)
+    if nm.prod(shape) > n_max:
+        shape = nm.maximum(nm.floor(shape * (n_max / nm.prod(shape))
+                                    ** (1.0 / dim)), 1)
+    shape = shape.astype(nm.int64)
+    bin_size = extent / shape
+
+    i0 = nm.clip(((box_min - origin) / bin_size).astype(nm.int64),
+                 0, shape - 1)
+    i1 = nm.clip(((box_max - origin) / bin_size).astype(nm.int64),
+                 0, shape - 1)
+    nb = i1 - i0 + 1
+    counts = nm.prod(nb, axis=1)
+
+    # Limit the grid memory by keeping the large cells out of the bins.
+    if max_cell_bins is None:
+        max_cell_bins = 4**dim
+    large_cells = nm.where(counts > max_cell_bins)[0]
+    counts[large_cells] = 0
+
+    # Expand each cell into the bins its box intersects.
+    ics = nm.repeat(nm.arange(cmesh.n_el), counts)
+    ii = _expand_ranges(nm.zeros_like(counts), counts)
+    ib = nm.empty((len(ics), dim), dtype=nm.int64)
+    for ir in range(dim - 1, -1, -1):
+        nbi = nb[ics, ir]
+        ib[:, ir] = i0[ics, ir] + ii % nbi
+        ii //= nbi
+
+    bins = nm.ravel_multi_index(tuple(ib.T), tuple(shape))
+    ii = nm.argsort(bins, kind='stable')
+
+    n_bins = nm.prod(shape)
+    bin_offsets = nm.zeros(n_bins + 1, dtype=nm.int64)
+    nm.cumsum(nm.bincount(bins, minlength=n_bins), out=bin_offsets[1:])
+
+    grid = Struct(name='cell_grid', cmesh=cmesh, origin=origin,
+                  bin_size=bin_size, shape=shape,
+                  box_min=box_min, box_max=box_max,
+                  bin_cells=ics[ii], bin_offsets=bin_offsets,
+                  large_cells=large_cells)
+
+    return grid
+
+def get_potential_cells(coors, cmesh, centroids=None, extrapolate=True,
+                        grid=None, kdtree=None):
     """
     Get cells that potentially contain points with the given physical
     coordinates.
@@ -135,6 +246,12 @@ def get_potential_cells(coors, cmesh, centroids=None, extrapolate=True):
     extrapolate : bool
         If True, even the points that are surely outside of the
         cmesh are considered and assigned potential cells.
+    grid : Struct instance, optional
+        The cell grid created by :func:`create_cell_grid()` for `cmesh`. If
+        not given, it is created.
+    kdtree : cKDTree instance, optional
+        The k-d tree of the cmesh vertices, used for the extrapolation. If not
+        given, it is created when needed.
 
     Returns
     -------
@@ -144,50 +261,63 @@ def get_potential_cells(coors, cmesh, centroids=None, extrapolate=True):
         The offsets into `potential_cells` for each point: a point ``ip`` is
         potentially in cells ``potential_cells[offsets[ip]:offsets[ip+1]]``.
     """
-    from scipy.spatial import cKDTree as KDTree
-
-    if centroids is None:
-        centroids = cmesh.get_centroids(cmesh.tdim)
+    if grid is None:
+        grid = create_cell_grid(cmesh, centroids=centroids)
 
-    kdtree = KDTree(coors)
+    n_point = coors.shape[0]
 
-    conn = cmesh.get_cell_conn()
-    cc = conn.indices.reshape(cmesh.n_el, -1)
-    cell_coors = cmesh.coors[cc]
+    # Find the grid bins of the points.
+    ib = nm.floor((coors - grid.origin) / grid.bin_size).astype(nm.int64)
+    ii = nm.where(nm.all((ib >= 0) & (ib <= grid.shape), axis=1))[0]
+    ib = nm.minimum(ib[ii], grid.shape - 1)
+    bins = nm.ravel_multi_index(tuple(ib.T), tuple(grid.shape))
 
-    rays = cell_coors - centroids[:, None]
-    radii = nm.linalg.norm(rays, ord=nm.inf, axis=2).max(axis=1)
+    # Check the point inclusion in the boxes of the bin cells.
+    starts = grid.bin_offsets[bins]
+    counts = grid.bin_offsets[bins + 1] - starts
+    ips = nm.repeat(ii, counts)
+    ics = grid.bin_cells[_expand_ranges(starts, counts)]
 
-    potential_cells = [[]] * coors.shape[0]
-    for ic, centroid in enumerate(centroids):
-        ips = kdtree.query_ball_point(centroid, radii[ic], p=nm.inf)
-        if len(ips):
-            for ip in ips:
-                if not len(potential_cells[ip]):
-                    potential_cells[ip] = []
+    n_large = len(grid.large_cells)
+    if n_large:
+        ips = nm.concatenate((ips, nm.repeat(ii, n_large)))
+        ics = nm.concatenate((ics, nm.tile(grid.large_cells, len(ii))))
 
-                potential_cells[ip].append(ic)
+    pcoors = coors[ips]
+    iin = nm.all((pcoors >= grid.box_min[ics])
+                 & (pcoors <= grid.box_max[ics]), axis=1)
+    ips = ips[iin]
+    ics = ics[iin]
 
-    lens = nm.array([0] + [len(ii) for ii in potential_cells], dtype=nm.int32)
+    lens = nm.bincount(ips, minlength=n_point)
 
     if extrapolate:
         # Deal with the points outside of the field domain - insert elements
         # incident to the closest mesh vertex.
-        iin = nm.where(lens[1:] == 0)[0]
-        if len(iin):
-            kdtree = KDTree(cmesh.coors)
-            ics = kdtree.query(coors[iin])[1]
+        iout = nm.where(lens == 0)[0]
+        if len(iout):
+            if kdtree is None:
+                from scipy.spatial import cKDTree as KDTree
+                kdtree = KDTree(cmesh.coors)
+
+            ivs = kdtree.query(coors[iout])[1]
             cmesh.setup_connectivity(0, cmesh.tdim)
             conn = cmesh.get_conn(0, cmesh.tdim)
 
             oo = conn.offsets
-            for ii, ip in enumerate(iin):
-                ik = ics[ii]
-                potential_cells[ip] = conn.indices[oo[ik]:oo[ik+1]]
-                lens[ip+1] = len(potential_cells[ip])
+            counts = oo[ivs + 1] - oo[ivs]
+            ecs = conn.indices[_expand_ranges(oo[ivs], counts)]
 
-    offsets = nm.cumsum(lens, dtype=nm.int32)
-    potential_cells = nm.concatenate(potential_cells).astype(nm.int32)
+            ips = nm.concatenate((ips, nm.repeat(iout, counts)))
+            ics = nm.concatenate((ics, ecs))
+            lens[iout] = counts
+
+    # The cells of each point are kept in the increasing order.
+    ii = nm.lexsort((ics, ips))
+    potential_cells = ics[ii].astype(nm.int32)
+
+    offsets = nm.zeros(n_point + 1, dtype=nm.int32)
+    nm.cumsum(lens, out=offsets[1:])
 
     return potential_cells, offsets
 
@@ -263,8 +393,21 @@ def get_ref_coors_general(field, coors, close_limit=0.1, get_cells_fun=None,
             centroids = cache.centroids
 
         timer.start()
-        potential_cells, offsets = get(coors, cmesh, centroids=centroids,
-                                       extrapolate=extrapolate)
+        if get_cells_fun is None:
+            grid = get_default_attr(cache, 'cell_grid', None)
+            if (grid is None) or (grid.cmesh is not cmesh):
+                grid = create_cell_grid(cmesh, centroids=centroids)
+                if cache is not None:
+                    cache.cell_grid = grid
+
+            kdtree = get_default_attr(cache, 'kdtree', None)
+            potential_cells, offsets = get(coors, cmesh, centroids=centroids,
+                                           extrapolate=extrapolate,
+                                           grid=grid, kdtree=kdtree)
+
+        else:
+            potential_cells, offsets = get(coors, cmesh, centroids=centroids,
+                                           extrapolate=extrapolate)
         output('potential cells: %f s' % timer.stop(), verbose=verbose)
 
         coors = nm.ascontiguousarray(coors)
@@ -357,3 +500,62 @@ def get_ref_coors(field, coors, strategy='general', close_limit=0.1,
 
     else:
         raise ValueError('unsupported strategy! (%s)' % strategy)
+
+class InterpolationOperator(Struct):
+    """
+    Sparse linear operator interpolating field DOF values or gradients into
+    fixed physical coordinates.
+
+    The operator matrix has the shape ``(n_coor * bdim, n_nod)``, where
+    `bdim` is 1 for the 'val' mode and the space dimension for the 'grad'
+    mode. Its application to DOF values is a single sparse matrix-vector
+    product, so the operator should be reused whenever the values in the
+    same coordinates are needed repeatedly, for example in every time step.
+
+    Use :func:`Field.create_interp_operator()
+    <sfepy.discrete.common.fields.Field.create_interp_operator()>` to create
+    instances.
+    """
+
+    def __init__(self, field, mode, matrix, ref_coors, cells, status):
+        Struct.__init__(self, name='interp_operator_%s' % field.name,
+                        field=field, mode=mode, matrix=matrix,
+                        ref_coors=ref_coors, cells=cells, status=status)
+        self.n_coor = ref_coors.shape[0]
+        self.bdim = matrix.shape[0] // max(self.n_coor, 1)
+
+    def __call__(self, source_vals, set_nan=True):
+        """
+        Interpolate the source DOF values.
+
+        Parameters
+        ----------
+        source_vals : array, shape ``(n_nod, n_components)``
+            The source DOF values corresponding to the field.
+        set_nan : bool
+            If True, the values where the status is greater than one are set
+            to ``numpy.nan``.
+
+        Returns
+        -------
+        vals : array
+            The interpolated values with shape ``(n_coor, n_components)`` or
+            gradients with shape ``(n_coor, n_components, dim)`` according to
+            the operator mode.
+        """
+        source_vals = source_vals.reshape((self.matrix.shape[1], -1))
+        n_c = source_vals.shape[1]
+
+        vals = self.matrix.dot(source_vals)
+        if self.mode == 'val':
+            vals = vals.reshape((self.n_coor, n_c))
+
+        else:
+            vals = vals.reshape((self.n_coor, self.bdim, n_c))
+            vals = nm.ascontiguousarray(vals.transpose((0, 2, 1)))
+
+        if set_nan:
+            ii = nm.where(self.status > 1)[0]
+            vals[ii] = nm.nan
+
+        return vals
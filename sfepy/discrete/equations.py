@@ -851,7 +851,8 @@ class Equation(Struct):
                     val, iels, status = term.evaluate(mode=mode,
                                                       term_mode=term_mode,
                                                       standalone=False,
-                                                      ret_status=True)
+                                                      ret_status=True,
+                                                      use_workspace=True)
                     term.assemble_to(asm_obj, val, iels, mode=dw_mode)
 
                 out = asm_obj
@@ -867,7 +868,8 @@ class Equation(Struct):
                                                           term_mode=term_mode,
                                                           diff_var=svar.name,
                                                           standalone=False,
-                                                          ret_status=True)
+                                                          ret_status=True,
+                                                          use_workspace=True)
                         extra = term.assemble_to(asm_obj, val, iels,
                                                  mode=dw_mode, diff_var=svar)
                         if extra is not None: extras.append(extra)
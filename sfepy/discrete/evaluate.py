@@ -2,6 +2,8 @@ from __future__ import absolute_import
 from copy import copy
 
 import numpy as nm
+import numpy.linalg as nla
+from scipy.sparse.linalg import LinearOperator
 
 from sfepy.base.base import output, get_default, OneTypeList, Struct, basestr
 from sfepy.discrete import Equations, Variables, Region, Integral, Integrals
@@ -31,6 +33,145 @@ def apply_ebc_to_matrix(mtx, ebc_rows, epbc_rows=None):
         mtx[master, master] = 1.0
         mtx[master, slave] = -1.0
 
+class MatrixFreeOperator(LinearOperator):
+    """
+    The tangent matrix of problem equations as a linear operator, whose action
+    is evaluated on the fly by the term kernels in the residual mode, so that
+    the matrix is never assembled.
+
+    Only the terms with unknown state variables are evaluated. The action on a
+    reduced vector :math:`x` with the corresponding full vector :math:`\\tilde
+    x` with zero E(P)BC values is
+
+    - :math:`R(\\tilde x) - R(0)` in the 'linear' mode, which is exact for
+      residuals :math:`R` affine in the unknowns, i.e. for linear problems;
+    - :math:`(R(u_0 + h \\tilde x) - R(u_0)) / h` in the 'nonlinear' mode,
+      i.e. the finite difference approximation of the tangent matrix action in
+      the state :math:`u_0`, with :math:`h = \\sqrt{\\epsilon} (1 + |u_0|) /
+      |\\tilde x|`. The relative accuracy of the action is about
+      :math:`\\sqrt{\\epsilon}`, so that the linear solver tolerances should
+      not be smaller.
+
+    The diagonal, for example for the Jacobi preconditioning, is assembled
+    from the element matrices of one term at a time, see
+    :func:`MatrixFreeOperator.diagonal()`.
+
+    Parameters
+    ----------
+    equations : Equations instance
+        The equations with the active DOFs only.
+    vec : array
+        The full state vector :math:`u_0`.
+    mode : 'linear' or 'nonlinear'
+        The evaluation mode.
+    """
+
+    def __init__(self, equations, vec, mode='linear'):
+        if mode not in ('linear', 'nonlinear'):
+            raise ValueError('unknown matrix-free mode! (%s)' % mode)
+
+        self.equations = equations
+        self.vec = vec
+        self.mode = mode
+        self.terms = [term for eq in equations for term in eq.terms
+                      if len(term.get_state_variables(unknown_only=True))]
+
+        n_dof = equations.variables.adi.ptr[-1]
+        LinearOperator.__init__(self, equations.variables.dtype,
+                                (n_dof, n_dof))
+
+        if mode == 'linear':
+            self.vec0 = nm.zeros_like(vec)
+            self.h0 = 1.0
+
+        else:
+            self.vec0 = vec
+            self.h0 = nm.sqrt(nm.finfo(nm.float64).eps) * (1.0
+                                                          + nla.norm(vec))
+
+        self.res0 = self.eval_residual(self.vec0)
+        self.diag = None
+
+    def eval_residual(self, vec):
+        """
+        Evaluate the residual of the terms with unknowns in the full state
+        `vec`. The variables are then reset to the state given in the
+        constructor.
+        """
+        equations = self.equations
+        equations.set_variables_from_state(vec)
+
+        out = equations.create_stripped_state_vector()
+        for term in self.terms:
+            val, iels, status = term.evaluate(mode='weak', standalone=False,
+                                              ret_status=True,
+                                              use_workspace=True)
+            term.assemble_to(out, val, iels, mode='vector')
+
+        equations.set_variables_from_state(self.vec)
+
+        return out
+
+    def _matvec(self, x):
+        x = nm.asarray(x).ravel()
+        vec = self.equations.make_full_vec(x, force_value=0.0)
+
+        norm = nla.norm(vec)
+        if norm == 0.0:
+            return nm.zeros(self.shape[0], dtype=self.dtype)
+
+        h = 1.0 if self.mode == 'linear' else self.h0 / norm
+
+        out = (self.eval_residual(self.vec0 + h * vec) - self.res0) / h
+
+        return out
+
+    def diagonal(self):
+        """
+        Get the diagonal of the operator matrix.
+
+        The element matrices of a single term are evaluated at a time, so that
+        the memory needed for their storage is released before evaluating the
+        next term. The diagonal is computed on the first call only.
+        """
+        if self.diag is not None:
+            return self.diag.copy()
+
+        diag = nm.zeros(self.shape[0], dtype=self.dtype)
+        for term in self.terms:
+            vvar = term.get_virtual_variable()
+            dc_type = term.get_dof_conn_type()
+            for svar in term.get_state_variables(unknown_only=True):
+                val, iels, status = term.evaluate(mode='weak',
+                                                  diff_var=svar.name,
+                                                  standalone=False,
+                                                  ret_status=True)
+                sign = term.get_matrix_sign(svar)
+
+                if isinstance(val, tuple):
+                    vals, rows, cols, rvar, cvar = val
+                    if rvar.eq_map is not None:
+                        rows = rvar.eq_map.eq[rows]
+                        cols = cvar.eq_map.eq[cols]
+
+                    ii = (rows == cols) & (rows >= 0)
+                    nm.add.at(diag, rows[ii], sign * vals[ii])
+
+                else:
+                    rdc = vvar.get_dof_conn(dc_type)[iels]
+                    is_trace = term.arg_traces[svar.name]
+                    trace_region = term.arg_trace_regions[svar.name]
+                    cdc = svar.get_dof_conn(dc_type, is_trace,
+                                            trace_region)[iels]
+
+                    ie, ir, ic = nm.nonzero((rdc[:, :, None] == cdc[:, None, :])
+                                            & (rdc[:, :, None] >= 0))
+                    nm.add.at(diag, rdc[ie, ir], sign * val[ie, 0, ir, ic])
+
+        self.diag = diag
+
+        return diag.copy()
+
 ##
 # 02.10.2007, c
 class Evaluator(Struct):
@@ -86,6 +227,10 @@ class Evaluator(Struct):
         return vec_r
 
     def eval_tangent_matrix(self, vec, mtx=None, is_full=False):
+        mode = self.problem.conf.options.get('matrix_free')
+        if mode is not None:
+            return self.eval_tangent_operator(vec, mode=mode, is_full=is_full)
+
         if isinstance(vec, basestr) and vec == 'linear':
             return get_default(mtx, self.problem.mtx_a)
 
@@ -117,6 +262,25 @@ class Evaluator(Struct):
 
         return mtx
 
+    def eval_tangent_operator(self, vec, mode='linear', is_full=False):
+        """
+        Return the tangent matrix as :class:`MatrixFreeOperator` instance.
+        """
+        pb = self.problem
+        if ((not pb.active_only) or pb.equations.variables.has_lcbc
+            or (self.matrix_hook is not None)):
+            raise ValueError('matrix-free mode requires active DOFs only,'
+                             ' no LCBCs and no matrix hook!')
+
+        if isinstance(vec, basestr) and vec == 'linear':
+            vec = pb.equations.variables.create_state_vector()
+            mode = 'linear'
+
+        elif not is_full:
+            vec = self.make_full_vec(vec)
+
+        return MatrixFreeOperator(pb.equations, vec, mode=mode)
+
     def make_full_vec(self, vec):
         return self.problem.equations.make_full_vec(vec)
 
@@ -1099,6 +1099,51 @@ class FEField(Field):
 
         return out
 
+    def get_mapping_cache_key(self, region, integral, integration):
+        """
+        Get the key of a reference mapping in the persistent mappings cache.
+        The key is a hash of the mesh, the field approximation, the region
+        entities and the integral.
+        """
+        from sfepy.base.disk_cache import get_hash
+
+        domain = self.domain
+        if integration == 'volume':
+            entities = region.get_cells(true_cells_only=True)
+
+        else:
+            entities = region.facets
+
+        if integral.mode == 'custom':
+            qps = (nm.asarray(integral.coors), nm.asarray(integral.weights))
+
+        else:
+            qps = None
+
+        key = get_hash('fe', self.family_name, self.poly_space.name,
+                       self.approx_order, self.force_bubble, self.is_surface,
+                       self.ori, self.basis_transform,
+                       domain.get_mesh_coors(actual=True), domain.get_conn(),
+                       entities, integration, integral.order, qps)
+        return key
+
+    def _restore_mapping_info(self, cmap, region, integral, integration):
+        if integration == 'volume':
+            qp = self.get_qp('v', integral)
+
+        elif not self.is_surface:
+            esd = self.surface_data[region.name]
+            self.create_bqp(region.name, integral)
+            qp = self.qp_coors[(integral.order, esd.bkey)]
+
+        else:
+            sd = self.domain.surface_groups[region.name]
+            qp = self.get_qp(sd.face_type, integral)
+
+        cmap.integral = integral
+        cmap.qp = qp
+        cmap.ps = self.poly_space
+
 class VolumeField(FEField):
     """
     Finite element field base class over volume elements (element dimension
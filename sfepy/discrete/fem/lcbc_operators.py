@@ -12,6 +12,7 @@ from sfepy.discrete.common.dof_info import DofInfo, expand_nodes_to_equations
 from sfepy.discrete.fem.utils import (compute_nodal_normals,
                                       compute_nodal_edge_dirs)
 from sfepy.discrete.conditions import get_condition_value, Function
+from sfepy.linalg import get_rigid_body_modes
 import six
 from six.moves import range
 
@@ -110,29 +111,8 @@ class RigidOperator(MRLCBCOperator):
         coors = self.field.get_coor(self.mdofs)
         n_nod, dim = coors.shape
 
-        mtx_e = nm.tile(nm.eye(dim, dtype=nm.float64), (n_nod, 1))
-
-        if dim == 2:
-            mtx_r = nm.empty((dim * n_nod, 1), dtype=nm.float64)
-            mtx_r[0::dim,0] = -coors[:,1]
-            mtx_r[1::dim,0] = coors[:,0]
-            n_rigid_dof = 3
-
-        elif dim == 3:
-            mtx_r = nm.zeros((dim * n_nod, dim), dtype=nm.float64)
-            mtx_r[0::dim,1] = coors[:,2]
-            mtx_r[0::dim,2] = -coors[:,1]
-            mtx_r[1::dim,0] = -coors[:,2]
-            mtx_r[1::dim,2] = coors[:,0]
-            mtx_r[2::dim,0] = coors[:,1]
-            mtx_r[2::dim,1] = -coors[:,0]
-            n_rigid_dof = 6
-
-        else:
-            msg = 'dimension in [2, 3]: %d' % dim
-            raise ValueError(msg)
-
-        self.mtx = nm.hstack((mtx_r, mtx_e))
+        self.mtx = get_rigid_body_modes(coors)
+        n_rigid_dof = self.mtx.shape[1]
 
         # Strip unconstrained dofs.
         aux = dim * nm.arange(n_nod)
@@ -51,6 +51,11 @@ def create_output(eval_dofs, eval_coors, n_el, ps, min_level=0, max_level=2,
     `eval_dofs()` corresponding to a higher order approximation with a relative
     precision given by `eps`. The DOFs are evaluated in physical coordinates
     returned by `eval_coors()`.
+
+    The sub-elements of all elements finished at a refinement level are
+    created at once. The DOF values in the reference coordinates of a level
+    are evaluated only once, and reused for the output of the elements
+    finished at the next level.
     """
 
     def _get_msd(iels, rx, ree):
@@ -69,7 +74,7 @@ def create_output(eval_dofs, eval_coors, n_el, ps, min_level=0, max_level=2,
 
         msd /= n_components
 
-        return msd, rng
+        return msd, rng, rvals
 
     rx0 = ps.geometry.coors
 
@@ -79,11 +84,11 @@ def create_output(eval_dofs, eval_coors, n_el, ps, min_level=0, max_level=2,
     factor = rc.shape[0] / rc0.shape[0]
 
     iels = nm.arange(n_el)
-    msd, rng = _get_msd(iels, rx, ree)
+    msd, rng, rvals = _get_msd(iels, rx, ree)
     eps_r = rng * eps
     flag = msd > eps_r
 
-    iels0 = flag0 = None
+    iels0 = flag0 = rvals0 = None
 
     coors = []
     conns = []
@@ -112,22 +117,16 @@ def create_output(eval_dofs, eval_coors, n_el, ps, min_level=0, max_level=2,
 
             # Each (sub-)element has own coordinates - no shared vertices.
             xes = eval_coors(iels[uie], rx0)
-            des = eval_dofs(iels[uie], rx0)
-
-            # Vectorize (how??) or use cython?
-            cc = []
-            vd = []
-            for ii, iie in enumerate(iies):
-                ce = rc0[ir[ii]]
-
-                xe = xes[iie]
-                cc.append(xe[ce])
+            if rvals0 is None:
+                des = eval_dofs(iels[uie], rx0)
 
-                de = des[iie]
-                vd.append(de[ce])
+            else:
+                des = rvals0[uie]
 
-            cc = nm.vstack(cc)
-            vd = nm.vstack(vd)
+            # Vertices of sub-elements ir of elements ie.
+            ces = rc0[ir]
+            cc = xes[iies[:, None], ces].reshape((-1, xes.shape[2]))
+            vd = des[iies[:, None], ces].reshape((-1, des.shape[2]))
 
             nc = cc.shape[0]
             np = rc0.shape[1]
@@ -149,12 +148,13 @@ def create_output(eval_dofs, eval_coors, n_el, ps, min_level=0, max_level=2,
         if level < max_level:
             eflag = flag.sum(axis=1, dtype=nm.bool)
             iels = iels[eflag]
+            rvals0 = rvals[eflag]
 
             rc0 = rc
             rx0 = rx
             rx, rc, ree = refine_reference(ps.geometry, level + 2)
 
-            msd, rng = _get_msd(iels, rx, ree)
+            msd, rng, rvals = _get_msd(iels, rx, ree)
             eps_r = rng * eps
             flag = msd > eps_r
 
@@ -7,7 +7,6 @@ from sfepy.base.base import Struct, invert_dict, get_default, output,\
 from sfepy.base.timing import Timer
 from .meshio import MeshIO
 import six
-from scipy.spatial import cKDTree
 
 eps = 1e-9
 
@@ -20,6 +19,8 @@ def find_map(x1, x2, allow_double=False, join=True):
     Find a mapping between common coordinates in x1 and x2, such that
     x1[cmap[:,0]] == x2[cmap[:,1]]
     """
+    from scipy.spatial import cKDTree
+
     kdtree = cKDTree(nm.vstack([x1, x2]))
     cmap = kdtree.query_pairs(eps, output_type='ndarray')
 
@@ -314,6 +315,67 @@ class Mesh(Struct):
         cmesh = self.cmesh.create_new()
         return Mesh(name=name, cmesh=cmesh)
 
+    def create_renumbered(self, order='hilbert', name=None, ret_perms=False):
+        """
+        Create a copy of the mesh with vertices and cells renumbered along a
+        space-filling curve, to improve the memory access locality in the
+        assembling and to reduce the fill-in of sparse direct solvers that do
+        not reorder the matrix themselves.
+
+        Parameters
+        ----------
+        order : 'hilbert' or 'morton'
+            The space-filling curve kind, see
+            :func:`get_space_filling_order()
+            <sfepy.linalg.geometry.get_space_filling_order>`. The cells are
+            ordered by their centroids.
+        name : str, optional
+            The name of the new mesh.
+        ret_perms : bool
+            If True, return also the vertex and cell permutations.
+
+        Returns
+        -------
+        mesh : Mesh instance
+            The renumbered mesh.
+        vperm : array, optional
+            The vertex permutation, `mesh.coors == self.coors[vperm]`.
+        cperms : list of arrays, optional
+            The cell permutations of the cell groups of each element type in
+            `self.descs`.
+        """
+        from sfepy.linalg.geometry import get_space_filling_order
+
+        name = get_default(name, self.name)
+
+        coors, ngroups, conns, mat_ids, descs = self._get_io_data()
+
+        vperm = get_space_filling_order(coors, order)
+        remap = nm.empty_like(vperm)
+        remap[vperm] = nm.arange(len(vperm))
+
+        cperms = []
+        new_conns = []
+        new_mat_ids = []
+        for ig, conn in enumerate(conns):
+            centroids = coors[conn].mean(axis=1)
+            cperm = get_space_filling_order(centroids, order)
+            cperms.append(cperm)
+            new_conns.append(remap[conn[cperm]])
+            new_mat_ids.append(mat_ids[ig][cperm])
+
+        nodal_bcs = {key : nm.sort(remap[val])
+                     for key, val in six.iteritems(self.nodal_bcs)}
+
+        mesh = Mesh.from_data(name, coors[vperm], ngroups[vperm], new_conns,
+                              new_mat_ids, descs, nodal_bcs=nodal_bcs)
+
+        if ret_perms:
+            return mesh, vperm, cperms
+
+        else:
+            return mesh
+
     def __add__(self, other):
         """
         Merge the two meshes, assuming they have the same kind of the single
@@ -345,7 +407,7 @@ class Mesh(Struct):
         self.dims = [int(ii[0]) for ii in self.descs]
 
     def _set_io_data(self, coors, ngroups, conns, mat_ids, descs,
-                     nodal_bcs=None):
+                     nodal_bcs=None, copy=True):
         """
         Set mesh data.
 
@@ -364,9 +426,18 @@ class Mesh(Struct):
         nodal_bcs : dict of arrays, optional
             The nodes defining regions for boundary conditions referred
             to by the dict keys in problem description files.
+        copy : bool
+            If False, the arrays owned by the caller, e.g. a mesh reader, can
+            be used by the mesh directly. The connectivities can be also given
+            as objects reading the data directly into the mesh buffers, see
+            :func:`CMesh.from_data()
+            <sfepy.discrete.common.extmods.cmesh.CMesh.from_data>`.
         """
         ac = nm.ascontiguousarray
-        coors = ac(coors, dtype=nm.float64)
+        _coors = ac(coors, dtype=nm.float64)
+        # A converted array is already a copy.
+        copy_coors = copy and nm.may_share_memory(_coors, coors)
+        coors = _coors
 
         if ngroups is None:
             ngroups = nm.zeros((coors.shape[0],), dtype=nm.int32)
@@ -375,10 +446,19 @@ class Mesh(Struct):
         self.nodal_bcs = get_default(nodal_bcs, {})
 
         from sfepy.discrete.common.extmods.cmesh import CMesh
-        self.cmesh = CMesh.from_data(coors, ac(ngroups),
-                                     [ac(conn, dtype=nm.int32)
-                                      for conn in conns],
-                                     ac(nm.concatenate(mat_ids)), descs)
+        conns = [conn if hasattr(conn, 'read') else nm.asarray(conn)
+                 for conn in conns]
+        if len(mat_ids) > 1:
+            mat_ids = nm.concatenate(mat_ids)
+
+        elif copy:
+            mat_ids = nm.array(mat_ids[0])
+
+        else:
+            mat_ids = nm.asarray(mat_ids[0])
+
+        self.cmesh = CMesh.from_data(coors, ac(ngroups), conns, ac(mat_ids),
+                                     descs, copy=copy_coors)
 
     def _get_io_data(self, cell_dim_only=None):
         """
@@ -8,21 +8,17 @@ import numpy as nm
 from sfepy.base.base import (complex_types, dict_from_keys_init,
                              assert_, is_derived_class, ordered_iteritems,
                              insert_static_method, output, get_default,
-                             get_default_attr, Struct, basestr)
+                             get_default_attr, Struct, basestr, LazyModule)
 from sfepy.base.ioutils import (skip_read_line, look_ahead_line, read_token,
                                 read_array, pt, enc, dec,
                                 edit_filename,
                                 read_from_hdf5, write_to_hdf5,
-                                HDF5ContextManager, get_or_create_hdf5_group)
+                                HDF5ContextManager, HDF5ArrayReader,
+                                get_or_create_hdf5_group)
 
 import os.path as op
 import six
 from six.moves import range
-import meshio as meshiolib
-try:
-    from meshio import CellBlock as meshio_Cells  # for meshio >= 4.0.3
-except:
-    from meshio import Cells as meshio_Cells  # for 4.0.3 > meshio > 4.0.0
 
 _supported_formats = {
     # format name: IO class, suffix, modes[, variants]
@@ -88,7 +84,59 @@ def update_supported_formats(formats):
 
     return out
 
-supported_formats = update_supported_formats(_supported_formats)
+class _LazySupportedFormats(dict):
+    """
+    The dictionary of supported formats, that is filled on the first access
+    by :func:`update_supported_formats()`, so that meshio is not imported
+    unless needed.
+    """
+
+    def __init__(self, formats):
+        dict.__init__(self)
+        self._formats = formats
+
+    def _fill(self):
+        if self._formats is not None:
+            dict.update(self, update_supported_formats(self._formats))
+            self._formats = None
+
+    def __getitem__(self, key):
+        self._fill()
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key):
+        self._fill()
+        return dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._fill()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._fill()
+        return dict.__len__(self)
+
+    def __repr__(self):
+        self._fill()
+        return dict.__repr__(self)
+
+    def get(self, key, default=None):
+        self._fill()
+        return dict.get(self, key, default)
+
+    def keys(self):
+        self._fill()
+        return dict.keys(self)
+
+    def values(self):
+        self._fill()
+        return dict.values(self)
+
+    def items(self):
+        self._fill()
+        return dict.items(self)
+
+supported_formats = _LazySupportedFormats(_supported_formats)
 del _supported_formats
 
 
@@ -289,8 +337,19 @@ def _decorate_all(module, decorator):
         if isinstance(obj, types.FunctionType):
             setattr(module, name, decorator(obj))
 
-_decorate_all(meshiolib, _suppress_meshio_warnings)
-del _decorate_all, _suppress_meshio_warnings
+def _init_meshio(module):
+    _decorate_all(module, _suppress_meshio_warnings)
+
+# meshio is imported on the first use.
+meshiolib = LazyModule('meshio', on_load=_init_meshio)
+
+def meshio_Cells(*args, **kwargs):
+    try:
+        cells = meshiolib.CellBlock  # for meshio >= 4.0.3
+    except AttributeError:
+        cells = meshiolib.Cells  # for 4.0.3 > meshio > 4.0.0
+
+    return cells(*args, **kwargs)
 
 
 class MeshioLibIO(MeshIO):
@@ -757,6 +816,12 @@ class HDF5MeshIO(MeshIO):
         -------
         sfepy.dicrete.fem.Mesh
             readed mesh
+
+        Notes
+        -----
+        The connectivity arrays are read directly into the mesh buffers and
+        the coordinates are used without copying, to minimize the peak memory
+        usage.
         """
         with HDF5ContextManager(filename, mode='r') as fd:
             if group is None:
@@ -781,7 +846,7 @@ class HDF5MeshIO(MeshIO):
             for ig in range(n_gr):
                 gr_name = 'group%d' % ig
                 conn_group = group._f_get_child(gr_name)
-                conns.append(conn_group.conn.read())
+                conns.append(HDF5ArrayReader(conn_group.conn))
                 mat_ids.append(conn_group.mat_id.read())
                 descs.append(dec(conn_group.desc.read()))
 
@@ -799,7 +864,7 @@ class HDF5MeshIO(MeshIO):
                     nodal_bcs[key] = nods
 
             mesh._set_io_data(coors, ngroups, conns, mat_ids, descs,
-                              nodal_bcs=nodal_bcs)
+                              nodal_bcs=nodal_bcs, copy=False)
 
             if set_shape_info:
                 mesh._set_shape_info()
@@ -1037,7 +1102,7 @@ class HDF5MeshIO(MeshIO):
 
         from time import asctime
 
-        if pt is None:
+        if not pt.is_available():
             raise ValueError('pytables not imported!')
 
         step = get_default_attr(ts, 'step', 0)
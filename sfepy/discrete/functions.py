@@ -13,7 +13,8 @@ class Functions(Container):
             fun = Function(name = fc.name,
                            function = fc.function,
                            is_constant = False,
-                           extra_args = {})
+                           extra_args = {},
+                           depends_on = fc.get('depends_on', None))
             objs.append(fun)
 
         obj = Functions(objs)
@@ -22,15 +23,26 @@ class Functions(Container):
 
 
 class Function(Struct):
-    """Base class for user-defined functions."""
+    """
+    Base class for user-defined functions.
+
+    The optional `depends_on` declares the dependencies of a material
+    function, see :class:`Material <sfepy.discrete.materials.Material>`. If
+    not given, the `depends_on` attribute of `function` is used, if present.
+    """
 
-    def __init__(self, name, function, is_constant=False, extra_args=None):
+    def __init__(self, name, function, is_constant=False, extra_args=None,
+                 depends_on=None):
         Struct.__init__(self, name = name, function = function,
                         is_constant = is_constant)
         if extra_args is None:
             extra_args = {}
         self.extra_args = extra_args
 
+        if depends_on is None:
+            depends_on = getattr(function, 'depends_on', None)
+        self.depends_on = depends_on
+
     def __call__(self, *args, **kwargs):
         _kwargs = dict(kwargs)
         _kwargs.update(self.extra_args)
@@ -4,6 +4,8 @@ cimport cython
 import numpy as np
 cimport numpy as np
 
+from sfepy.discrete.iga.iga import get_unique_extraction_operators
+
 from sfepy.discrete.common.extmods.types cimport int32, uint32, float64
 
 from sfepy.discrete.common.extmods._fmfield cimport (FMField,
@@ -107,6 +109,18 @@ cdef extern from 'nurbs.h':
                                FMField *cs,
                                int32 *conn, int32 n_el, int32 n_ep,
                                int32 has_bernstein, int32 is_dx)
+    cdef int32 _eval_basis_tp_batch \
+         'eval_basis_tp_batch'(FMField *bfs, FMField *bfgs, FMField *dets,
+                               FMField *coors, FMField *vals,
+                               FMField *variable,
+                               FMField *R, FMField *dR_dx, FMField *dR_dxi,
+                               FMField *dx_dxi, FMField *dxi_dx,
+                               FMField *Ns, FMField *dNs_dxi,
+                               int32 **ics, uint32 *n_els,
+                               uint32 *cells, uint32 n_cell, uint32 n_qp,
+                               FMField *control_points, FMField *weights,
+                               int32 *degrees, int32 dim,
+                               int32 *conn, int32 n_ep) nogil
 
 cdef class CNURBSContext:
 
@@ -270,6 +284,158 @@ def eval_bernstein_basis(np.ndarray funs not None,
     ret = _eval_bernstein_basis(_funs, _ders, x, degree)
     return ret
 
+def get_extracted_bases(np.ndarray[float64, mode='c', ndim=2] qps not None,
+                        np.ndarray[int32, mode='c', ndim=1] degrees not None,
+                        cs not None):
+    """
+    Evaluate the 1D B-spline bases and their derivatives in the given
+    quadrature points for the unique element extraction operators in each
+    parametric dimension.
+
+    Parameters
+    ----------
+    qps : array
+        The quadrature points coordinates with components in [0, 1] reference
+        element domain.
+    degrees : array
+        The basis degrees in each parametric dimension.
+    cs : list of lists of 2D arrays
+        The element extraction operators in each parametric dimension.
+
+    Returns
+    -------
+    Ns : list of arrays
+        The 1D B-spline bases N = C B for the unique operators C in each
+        parametric dimension, with shapes (n_uc, n_qp, 1, n_efun).
+    dNs : list of arrays
+        The 1D B-spline bases derivatives dN/dxi = C dB/dxi, with the shapes of
+        `Ns`.
+    ics : list of arrays
+        The indices of the unique operators of all elements in each parametric
+        dimension.
+    """
+    cdef uint32 ii, iqp, n_qp
+    cdef np.ndarray[float64, mode='c', ndim=2] B, dB_dxi
+
+    ucs, ics = get_unique_extraction_operators(cs)
+
+    n_qp = qps.shape[0]
+    Ns = []
+    dNs = []
+    for ii in range(len(ucs)):
+        B = np.empty((n_qp, degrees[ii] + 1), dtype=np.float64)
+        dB_dxi = np.empty((n_qp, degrees[ii] + 1), dtype=np.float64)
+        for iqp in range(n_qp):
+            eval_bernstein_basis(B[iqp], dB_dxi[iqp], qps[iqp, ii],
+                                 degrees[ii])
+
+        Ns.append(np.einsum('cij,qj->cqi', ucs[ii], B)[:, :, None, :].copy())
+        dNs.append(np.einsum('cij,qj->cqi',
+                             ucs[ii], dB_dxi)[:, :, None, :].copy())
+
+    return Ns, dNs, ics
+
+cdef int _eval_in_qp(np.ndarray bfs, np.ndarray bfgs, np.ndarray dets,
+                     np.ndarray coors, np.ndarray vals, np.ndarray variable,
+                     np.ndarray[float64, mode='c', ndim=2] qps,
+                     np.ndarray[float64, mode='c', ndim=2] control_points,
+                     np.ndarray[float64, mode='c', ndim=1] weights,
+                     np.ndarray[int32, mode='c', ndim=1] degrees,
+                     cs,
+                     np.ndarray[int32, mode='c', ndim=2] conn,
+                     np.ndarray[uint32, mode='c', ndim=1] cells) except -1:
+    """
+    Common part of eval_mapping_data_in_qp() and eval_variable_in_qp(): the
+    1D bases are evaluated for the unique extraction operators only, the
+    loop over cells and quadrature points runs without the GIL.
+    """
+    cdef uint32 ii, n_cell, n_qp
+    cdef int32 n_el, n_ep, dim, aux, ret
+    cdef uint32 n_els[3]
+    cdef int32 *_ics[3]
+    cdef uint32 *_cells
+    cdef (int32 *) _degrees, _conn
+    cdef FMField _Ns[3]
+    cdef FMField _dNs[3]
+    cdef FMField[1] _bfs, _bfgs, _dets, _coors, _vals, _variable
+    cdef FMField[1] _R, _dR_dx, _dR_dxi, _dx_dxi, _dxi_dx
+    cdef FMField[1] _control_points, _weights
+    cdef (FMField *) pbfs, pbfgs, pcoors, pvals, pvariable, pweights
+
+    dim = control_points.shape[1]
+    if not (1 <= dim <= 3) or (len(cs) != dim) or (len(degrees) != dim):
+        raise ValueError('inconsistent dimensions! (%d, %d, %d)'
+                         % (dim, len(cs), len(degrees)))
+
+    n_cell = len(cells)
+    n_qp = qps.shape[0]
+    if (n_cell == 0) or (n_qp == 0):
+        return 0
+
+    Ns, dNs, ics = get_extracted_bases(qps, degrees, cs)
+    for ii in range(<uint32>dim):
+        array2fmfield4(_Ns + ii, Ns[ii])
+        array2fmfield4(_dNs + ii, dNs[ii])
+        array2pint1(_ics + ii, &aux, ics[ii])
+        n_els[ii] = aux
+
+    array2pint1(&_degrees, &aux, degrees)
+    array2pint2(&_conn, &n_el, &n_ep, conn)
+    array2puint1(&_cells, &n_cell, cells)
+
+    # Setup C temporary arrays.
+    R = np.empty((n_ep,), dtype=np.float64)
+    dR_dx = np.empty((1, 1, dim, n_ep), dtype=np.float64)
+    dR_dxi = np.empty((1, 1, dim, n_ep), dtype=np.float64)
+    dx_dxi = np.empty((1, 1, dim, dim), dtype=np.float64)
+    dxi_dx = np.empty((1, 1, dim, dim), dtype=np.float64)
+
+    # Assign to C structures.
+    array2fmfield1(_R, R)
+    array2fmfield4(_dR_dx, dR_dx)
+    array2fmfield4(_dR_dxi, dR_dxi)
+    array2fmfield4(_dx_dxi, dx_dxi)
+    array2fmfield4(_dxi_dx, dxi_dx)
+    array2fmfield2(_control_points, control_points)
+    array2fmfield1(_weights, weights)
+
+    fmf_pretend_nc(_dets, 1, 1, 1, dets.size,
+                   <float64 *> np.PyArray_DATA(dets))
+
+    pbfs = pbfgs = NULL
+    if bfs is not None:
+        fmf_pretend_nc(_bfs, 1, 1, 1, bfs.size,
+                       <float64 *> np.PyArray_DATA(bfs))
+        fmf_pretend_nc(_bfgs, 1, 1, 1, bfgs.size,
+                       <float64 *> np.PyArray_DATA(bfgs))
+        pbfs = _bfs
+        pbfgs = _bfgs
+
+    pcoors = pvals = pvariable = NULL
+    if vals is not None:
+        fmf_pretend_nc(_coors, 1, 1, coors.shape[0], coors.shape[1],
+                       <float64 *> np.PyArray_DATA(coors))
+        fmf_pretend_nc(_vals, 1, 1, vals.shape[0], vals.shape[1],
+                       <float64 *> np.PyArray_DATA(vals))
+        fmf_pretend_nc(_variable, 1, 1, variable.shape[0], variable.shape[1],
+                       <float64 *> np.PyArray_DATA(variable))
+        pcoors = _coors
+        pvals = _vals
+        pvariable = _variable
+
+    pweights = _weights if is_nurbs(weights) else NULL
+
+    with nogil:
+        ret = _eval_basis_tp_batch(pbfs, pbfgs, _dets,
+                                   pcoors, pvals, pvariable,
+                                   _R, _dR_dx, _dR_dxi, _dx_dxi, _dxi_dx,
+                                   _Ns, _dNs, _ics, n_els,
+                                   _cells, n_cell, n_qp,
+                                   _control_points, pweights,
+                                   _degrees, dim, _conn, n_ep)
+
+    return ret
+
 def eval_mapping_data_in_qp(np.ndarray[float64, mode='c', ndim=2] qps not None,
                             np.ndarray[float64, mode='c', ndim=2]
                             control_points not None,
@@ -315,16 +481,7 @@ def eval_mapping_data_in_qp(np.ndarray[float64, mode='c', ndim=2] qps not None,
         The Jacobians of the mapping to the unit reference element in the
         physical quadrature points of all elements.
     """
-    cdef uint32 ii, ie, n_qp, n_efun, nf
-    cdef int32 n_el, n_ep, dim, aux
-    cdef uint32 *_cells
-    cdef (int32 *) _degrees, _conn
-    cdef FMField[1] _bf, _bfg, _det
-    cdef FMField[1] _bfg_dxi, _dx_dxi, _dxi_dx
-    cdef FMField[1] _qp, _control_points, _weights
-    cdef FMField _cs[3]
-    cdef FMField[3] _B, _dB_dxi, _N, _dN_dxi
-    cdef np.ndarray[float64, mode='c', ndim=4] bfs, bfgs, dets
+    cdef uint32 n_el, n_qp, n_efun, dim
 
     if cells is None:
         cells = np.arange(conn.shape[0], dtype=np.uint32)
@@ -334,8 +491,7 @@ def eval_mapping_data_in_qp(np.ndarray[float64, mode='c', ndim=2] qps not None,
     n_el = len(cells)
     n_qp = qps.shape[0]
     dim = control_points.shape[1]
-    n_efuns = degrees + 1
-    n_efun = np.prod(n_efuns)
+    n_efun = np.prod(degrees + 1)
 
     # Output Jacobians.
     dets = np.empty((n_el, n_qp, 1, 1), dtype=np.float64)
@@ -346,119 +502,8 @@ def eval_mapping_data_in_qp(np.ndarray[float64, mode='c', ndim=2] qps not None,
     # Output gradients of shape functions.
     bfgs = np.empty((n_el, n_qp, dim, n_efun), dtype=np.float64)
 
-    # Setup C termporary arrays.
-    bfg_dxi = np.empty((1, 1, dim, n_efun), dtype=np.float64)
-    dx_dxi = np.empty((1, 1, dim, dim), dtype=np.float64)
-    dxi_dx = np.empty((1, 1, dim, dim), dtype=np.float64)
-
-    for ii in range(0, <uint32>dim):
-        fmf_alloc(_B + ii, n_qp, 1, n_efuns[ii], 1)
-        fmf_alloc(_dB_dxi + ii, n_qp, 1, n_efuns[ii], 1)
-        fmf_alloc(_N + ii, 1, 1, n_efuns[ii], 1)
-        fmf_alloc(_dN_dxi + ii, 1, 1, n_efuns[ii], 1)
-
-    # Assign to C structures.
-    array2fmfield4(_bfg_dxi, bfg_dxi)
-    array2fmfield4(_dx_dxi, dx_dxi)
-    array2fmfield4(_dxi_dx, dxi_dx)
-    array2fmfield2(_control_points, control_points)
-    array2fmfield1(_weights, weights)
-    for ii in range(<uint32>dim):
-        array2fmfield4(_cs + ii, cs[ii])
-
-    array2pint1(&_degrees, &dim, degrees)
-    array2pint2(&_conn, &aux, &n_ep, conn)
-
-    _bf.offset = _bfg.offset = _det.offset = _qp.offset = -1
-    _bf.nAlloc = _bfg.nAlloc = _det.nAlloc = _qp.nAlloc = -1
-    _bf.nCell = _bfg.nCell = _det.nCell = _qp.nCell = 1
-    _bf.nLev = _bfg.nLev = _det.nLev = _qp.nLev = 1
-    _bf.nRow = _det.nRow = _qp.nRow = 1
-    _bfg.nRow = dim
-    _bf.nCol = _bfg.nCol = n_efun
-    _det.nCol = 1
-    _qp.nCol = dim
-
-    _bf.val = _bf.val0 = &bfs[0, 0, 0, 0]
-    _bfg.val = _bfg.val0 = &bfgs[0, 0, 0, 0]
-    _det.val = _det.val0 = &dets[0, 0, 0, 0]
-    _qp.val = _qp.val0 = &qps[0, 0]
-
-    # Pre-compute 1D Bernstein basis B, dB/dxi.
-    for iqp in range(0, n_qp):
-        for ii in range(0, <uint32>dim):
-            nf = n_efuns[ii]
-            _eval_bernstein_basis(_B + ii, _dB_dxi + ii,
-                                  _qp.val[ii], _degrees[ii])
-            (_B + ii).val += nf
-            (_dB_dxi + ii).val += nf
-        _qp.val += dim
-
-    if is_nurbs(weights):
-        # Loop over elements.
-        _cells = &cells[0]
-        for iseq in range(0, n_el):
-            ie = _cells[iseq]
-
-            _qp.val = _qp.val0
-            for ii in range(0, <uint32>dim):
-                (_B + ii).val = (_B + ii).val0
-                (_dB_dxi + ii).val = (_dB_dxi + ii).val0
-
-            # Loop over quadrature points.
-            for iqp in range(0, n_qp):
-                _eval_nurbs_basis_tp(_bf, _bfg, _det,
-                                     _bfg_dxi,
-                                     _dx_dxi, _dxi_dx,
-                                     _B, _dB_dxi, _N, _dN_dxi,
-                                     _qp, ie,
-                                     _control_points, _weights,
-                                     _degrees, dim, _cs, _conn, n_el, n_ep,
-                                     1, 1)
-                _bf.val += n_efun
-                _bfg.val += dim * n_efun
-                _det.val += 1
-                _qp.val += dim
-                for ii in range(0, <uint32>dim):
-                    nf = n_efuns[ii]
-                    (_B + ii).val += nf
-                    (_dB_dxi + ii).val += nf
-
-    else:
-        # Loop over elements.
-        _cells = &cells[0]
-        for iseq in range(0, n_el):
-            ie = _cells[iseq]
-
-            _qp.val = _qp.val0
-            for ii in range(0, <uint32>dim):
-                (_B + ii).val = (_B + ii).val0
-                (_dB_dxi + ii).val = (_dB_dxi + ii).val0
-
-            # Loop over quadrature points.
-            for iqp in range(0, n_qp):
-                _eval_bspline_basis_tp(_bf, _bfg, _det,
-                                       _bfg_dxi,
-                                       _dx_dxi, _dxi_dx,
-                                       _B, _dB_dxi, _N, _dN_dxi,
-                                       _qp, ie,
-                                       _control_points,
-                                       _degrees, dim, _cs, _conn, n_el, n_ep,
-                                       1, 1)
-                _bf.val += n_efun
-                _bfg.val += dim * n_efun
-                _det.val += 1
-                _qp.val += dim
-                for ii in range(0, <uint32>dim):
-                    nf = n_efuns[ii]
-                    (_B + ii).val += nf
-                    (_dB_dxi + ii).val += nf
-
-    for ii in range(0, <uint32>dim):
-        fmf_free(_B + ii)
-        fmf_free(_dB_dxi + ii)
-        fmf_free(_N + ii)
-        fmf_free(_dN_dxi + ii)
+    _eval_in_qp(bfs, bfgs, dets, None, None, None,
+                qps, control_points, weights, degrees, cs, conn, cells)
 
     return bfs, bfgs, dets
 
@@ -507,17 +552,7 @@ def eval_variable_in_qp(np.ndarray[float64, mode='c', ndim=2] variable not None,
         The Jacobians of the mapping to the unit reference element in the
         physical quadrature points.
     """
-    cdef uint32 ii, ie, n_qp, n_efun, nf, nc, ir, ic
-    cdef int32 n_el, n_ep, dim, aux
-    cdef uint32 *_cells
-    cdef (int32 *) _degrees, _conn, ec
-    cdef float64 val
-    cdef FMField[1] _bf, _bfg, _det, _vals, _coors
-    cdef FMField[1] _bfg_dxi, _dx_dxi, _dxi_dx
-    cdef FMField[1] _qp, _variable, _control_points, _weights
-    cdef FMField _cs[3]
-    cdef FMField[3] _B, _dB_dxi, _N, _dN_dxi
-    cdef np.ndarray[float64, mode='c', ndim=2] coors, vals, dets
+    cdef uint32 n_el, n_qp, nc, dim
 
     if cells is None:
         cells = np.arange(conn.shape[0], dtype=np.uint32)
@@ -525,8 +560,6 @@ def eval_variable_in_qp(np.ndarray[float64, mode='c', ndim=2] variable not None,
     n_el = len(cells)
     n_qp = qps.shape[0]
     dim = control_points.shape[1]
-    n_efuns = degrees + 1
-    n_efun = np.prod(n_efuns)
     nc = variable.shape[1]
 
     # Output values of the variable.
@@ -538,156 +571,8 @@ def eval_variable_in_qp(np.ndarray[float64, mode='c', ndim=2] variable not None,
     # Output Jacobians.
     dets = np.empty((n_el * n_qp, 1), dtype=np.float64)
 
-    # Setup C termporary arrays.
-    bf = np.empty((n_efun,), dtype=np.float64)
-    bfg = np.empty((dim, n_efun), dtype=np.float64)
-    bfg_dxi = np.empty((1, 1, dim, n_efun), dtype=np.float64)
-    dx_dxi = np.empty((1, 1, dim, dim), dtype=np.float64)
-    dxi_dx = np.empty((1, 1, dim, dim), dtype=np.float64)
-
-    for ii in range(0, <uint32>dim):
-        fmf_alloc(_B + ii, n_qp, 1, n_efuns[ii], 1)
-        fmf_alloc(_dB_dxi + ii, n_qp, 1, n_efuns[ii], 1)
-        fmf_alloc(_N + ii, 1, 1, n_efuns[ii], 1)
-        fmf_alloc(_dN_dxi + ii, 1, 1, n_efuns[ii], 1)
-
-    # Assign to C structures.
-    array2fmfield1(_bf, bf)
-    array2fmfield2(_bfg, bfg)
-    array2fmfield4(_bfg_dxi, bfg_dxi)
-    array2fmfield4(_dx_dxi, dx_dxi)
-    array2fmfield4(_dxi_dx, dxi_dx)
-    array2fmfield2(_variable, variable)
-    array2fmfield2(_control_points, control_points)
-    array2fmfield1(_weights, weights)
-    for ii in range(<uint32>dim):
-        array2fmfield4(_cs + ii, cs[ii])
-
-    array2pint1(&_degrees, &dim, degrees)
-    array2pint2(&_conn, &aux, &n_ep, conn)
-
-    _vals.offset = _coors.offset = _det.offset = _qp.offset = -1
-    _vals.nAlloc = _coors.nAlloc = _det.nAlloc = _qp.nAlloc = -1
-    _vals.nCell = _coors.nCell = _det.nCell = _qp.nCell = 1
-    _vals.nLev = _coors.nLev = _det.nLev = _qp.nLev = 1
-    _vals.nRow = _coors.nRow = _det.nRow = _qp.nRow = 1
-    _vals.nCol = nc
-    _coors.nCol = dim
-    _det.nCol = 1
-    _qp.nCol = dim
-
-    _vals.val = _vals.val0 = &vals[0, 0]
-    _coors.val = _coors.val0 = &coors[0, 0]
-    _det.val = _det.val0 = &dets[0, 0]
-    _qp.val = _qp.val0 = &qps[0, 0]
-
-    # Pre-compute 1D Bernstein basis B, dB/dxi.
-    for iqp in range(0, n_qp):
-        for ii in range(0, <uint32>dim):
-            nf = n_efuns[ii]
-            _eval_bernstein_basis(_B + ii, _dB_dxi + ii,
-                                  _qp.val[ii], _degrees[ii])
-            (_B + ii).val += nf
-            (_dB_dxi + ii).val += nf
-        _qp.val += dim
-
-    if is_nurbs(weights):
-        # Loop over elements.
-        _cells = &cells[0]
-        for iseq in range(0, n_el):
-            ie = _cells[iseq]
-
-            ec = _conn + n_ep * ie
-
-            _qp.val = _qp.val0
-            for ii in range(0, <uint32>dim):
-                (_B + ii).val = (_B + ii).val0
-                (_dB_dxi + ii).val = (_dB_dxi + ii).val0
-
-            # Loop over quadrature points.
-            for iqp in range(0, n_qp):
-                _eval_nurbs_basis_tp(_bf, _bfg, _det,
-                                     _bfg_dxi,
-                                     _dx_dxi, _dxi_dx,
-                                     _B, _dB_dxi, _N, _dN_dxi,
-                                     _qp, ie,
-                                     _control_points, _weights,
-                                     _degrees, dim, _cs, _conn, n_el, n_ep,
-                                     1, 1)
-
-                # vals[ii, :] = np.dot(bf, variable[ec])
-                for ir in range(0, nc):
-                    _vals.val[ir] = 0.0
-
-                    for ic in range(0, n_efun):
-                        val = _variable.val[ec[ic] * nc + ir]
-                        _vals.val[ir] += _bf.val[ic] * val
-
-                # coors[ii, :] = np.dot(bf, control_points[ec])
-                for ir in range(0, <uint32>dim):
-                    _coors.val[ir] = 0.0
-
-                    for ic in range(0, n_efun):
-                        val = _control_points.val[ec[ic] * dim + ir]
-                        _coors.val[ir] += _bf.val[ic] * val
-
-                _vals.val += nc
-                _coors.val += dim
-                _det.val += 1
-                _qp.val += dim
-                for ii in range(0, <uint32>dim):
-                    nf = n_efuns[ii]
-                    (_B + ii).val += nf
-                    (_dB_dxi + ii).val += nf
-
-    else:
-        # Loop over elements.
-        _cells = &cells[0]
-        for iseq in range(0, n_el):
-            ie = _cells[iseq]
-
-            ec = _conn + n_ep * ie
-
-            _qp.val = _qp.val0
-            for ii in range(0, <uint32>dim):
-                (_B + ii).val = (_B + ii).val0
-                (_dB_dxi + ii).val = (_dB_dxi + ii).val0
-
-            # Loop over quadrature points.
-            for iqp in range(0, n_qp):
-                _eval_bspline_basis_tp(_bf, _bfg, _det,
-                                       _bfg_dxi,
-                                       _dx_dxi, _dxi_dx,
-                                       _B, _dB_dxi, _N, _dN_dxi,
-                                       _qp, ie,
-                                       _control_points,
-                                       _degrees, dim, _cs, _conn, n_el, n_ep,
-                                       1, 1)
-
-                # vals[ii, :] = np.dot(bf, variable[ec])
-                for ir in range(0, nc):
-                    _vals.val[ir] = 0.0
-
-                    for ic in range(0, n_efun):
-                        val = _variable.val[ec[ic] * nc + ir]
-                        _vals.val[ir] += _bf.val[ic] * val
-
-                # coors[ii, :] = np.dot(bf, control_points[ec])
-                for ir in range(0, <uint32>dim):
-                    _coors.val[ir] = 0.0
-
-                    for ic in range(0, n_efun):
-                        val = _control_points.val[ec[ic] * dim + ir]
-                        _coors.val[ir] += _bf.val[ic] * val
-
-                _vals.val += nc
-                _coors.val += dim
-                _det.val += 1
-                _qp.val += dim
-                for ii in range(0, <uint32>dim):
-                    nf = n_efuns[ii]
-                    (_B + ii).val += nf
-                    (_dB_dxi + ii).val += nf
+    _eval_in_qp(None, None, dets, coors, vals, variable,
+                qps, control_points, weights, degrees, cs, conn, cells)
 
     return coors, vals, dets
 
@@ -316,128 +316,167 @@ int32 eval_bernstein_basis(FMField *funs, FMField *ders,
 }
 
 #undef __FUNC__
-#define __FUNC__ "eval_bspline_basis_tp"
+#define __FUNC__ "eval_basis_tp_from_1d"
 /*
+  Evaluate the tensor-product B-spline (weights == NULL) or NURBS basis R,
+  dR/dxi from the 1D B-spline basis N, dN/dxi. If is_dx is set, evaluate also
+  the reference mapping and dR/dx.
+
   dR_dx has shape (dim, n_efun), transposed w.r.t. the Python version!
 */
-int32 eval_bspline_basis_tp(FMField *R, FMField *dR_dx, FMField *det,
+int32 eval_basis_tp_from_1d(FMField *R, FMField *dR_dx, FMField *det,
                             FMField *dR_dxi,
                             FMField *dx_dxi, FMField *dxi_dx,
-                            FMField *B, FMField *dB_dxi,
                             FMField *N, FMField *dN_dxi,
-                            FMField *qp, uint32 ie,
-                            FMField *control_points,
-                            int32 *degrees, int32 dim,
-                            FMField *cs,
-                            int32 *conn, int32 n_el, int32 n_ep,
-                            int32 has_bernstein, int32 is_dx)
+                            int32 *ec, FMField *control_points,
+                            FMField *weights, int32 *degrees, int32 dim,
+                            int32 n_ep, int32 is_dx)
 {
   int32 ret = RET_OK;
   uint32 ii, jj, a, i0, i1, i2;
   uint32 n_efuns[3];
-  uint32 n_efun = 1;
-  uint32 n_els[3];
-  uint32 ic[3];
-  int32 *ec;
-  FMField *C, *N0, *N1, *N2, *dN0_dxi, *dN1_dxi, *dN2_dxi;
-  float64 P;
-
-#ifdef DEBUG_FMF
-  if (!((dim == qp->nCol) && (dim <= 3))) {
-    errput(ErrHead "inconsistent dimension! (%d == $d <= 3)", dim, qp->nCol);
-    ERR_CheckGo(ret);
-  }
-#endif
+  FMField *N0, *N1, *N2, *dN0_dxi, *dN1_dxi, *dN2_dxi;
+  float64 w, W, P;
+  float64 dw_dxi[3];
 
   for (ii = 0; ii < (uint32)dim; ii++) {
     n_efuns[ii] = degrees[ii] + 1;
-    n_efun *= n_efuns[ii];
-  }
-
-#ifdef DEBUG_FMF
-  if (n_efun != n_ep) {
-    errput(ErrHead "inconsistent number of bases! (%d == $d)", n_efun, n_ep);
-    ERR_CheckGo(ret);
   }
-#endif
 
-  // Element connectivity.
-  ec = conn + n_ep * ie;
+  a = 0; // Basis function index.
+  if (weights == 0) {
+    // Tensor-product B-spline basis R, dR/dxi.
+    if (dim == 3) {
+      N0 = N + 0;
+      N1 = N + 1;
+      N2 = N + 2;
+      dN0_dxi = dN_dxi + 0;
+      dN1_dxi = dN_dxi + 1;
+      dN2_dxi = dN_dxi + 2;
+      for (i0 = 0; i0 < n_efuns[0]; i0++) {
+        for (i1 = 0; i1 < n_efuns[1]; i1++) {
+          for (i2 = 0; i2 < n_efuns[2]; i2++) {
+            R->val[a] = N0->val[i0] * N1->val[i1] * N2->val[i2];
+
+            dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0] * N1->val[i1] * N2->val[i2];
+
+            dR_dxi->val[a+n_ep*1] = N0->val[i0] * dN1_dxi->val[i1] * N2->val[i2];
+
+            dR_dxi->val[a+n_ep*2] = N0->val[i0] * N1->val[i1] * dN2_dxi->val[i2];
+
+            a += 1;
+          }
+        }
+      }
+    } else if (dim == 2) {
+      N0 = N + 0;
+      N1 = N + 1;
+      dN0_dxi = dN_dxi + 0;
+      dN1_dxi = dN_dxi + 1;
+      for (i0 = 0; i0 < n_efuns[0]; i0++) {
+        for (i1 = 0; i1 < n_efuns[1]; i1++) {
+          R->val[a] = N0->val[i0] * N1->val[i1];
 
-  // 1D Bernstein basis B, dB/dxi.
-  if (!has_bernstein) {
-    for (ii = 0; ii < (uint32)dim; ii++) {
-      eval_bernstein_basis(B + ii, dB_dxi + ii, qp->val[ii], degrees[ii]);
-    }
-  }
+          dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0] * N1->val[i1];
 
-  // 1D B-spline basis N = CB, dN/dxi = C dB/dxi.
-  for (ii = 0; ii < (uint32)dim; ii++) {
-    n_els[ii] = (cs + ii)->nCell;
-  }
+          dR_dxi->val[a+n_ep*1] = N0->val[i0] * dN1_dxi->val[i1];
 
-  unravel_index(ic, ie, n_els, dim);
+          a += 1;
+        }
+      }
+    } else {
+      // Simple copy here.
+      N0 = N + 0;
+      dN0_dxi = dN_dxi + 0;
+      for (i0 = 0; i0 < n_efuns[0]; i0++) {
+          R->val[a] = N0->val[i0];
 
-  for (ii = 0; ii < (uint32)dim; ii++) {
-    C = cs + ii;
-    FMF_SetCell(C, ic[ii]);
+          dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0];
 
-    fmf_mulAB_nn(N + ii, C, B + ii);
-    fmf_mulAB_nn(dN_dxi + ii, C, dB_dxi + ii);
-  }
-
-  ERR_CheckGo(ret);
+          a += 1;
+      }
+    }
 
-  // Tensor-product B-spline basis R, dR/dxi.
-  a = 0; // Basis function index.
-  if (dim == 3) {
-    N0 = N + 0;
-    N1 = N + 1;
-    N2 = N + 2;
-    dN0_dxi = dN_dxi + 0;
-    dN1_dxi = dN_dxi + 1;
-    dN2_dxi = dN_dxi + 2;
-    for (i0 = 0; i0 < n_efuns[0]; i0++) {
-      for (i1 = 0; i1 < n_efuns[1]; i1++) {
-        for (i2 = 0; i2 < n_efuns[2]; i2++) {
-          R->val[a] = N0->val[i0] * N1->val[i1] * N2->val[i2];
+  } else {
+    // Numerators and denominator for tensor-product NURBS basis R, dR/dxi.
+    w = 0; // w_b
+    for (ii = 0; ii < (uint32)dim; ii++) {
+      dw_dxi[ii] = 0.0; // dw_b/dxi
+    }
+    if (dim == 3) {
+      N0 = N + 0;
+      N1 = N + 1;
+      N2 = N + 2;
+      dN0_dxi = dN_dxi + 0;
+      dN1_dxi = dN_dxi + 1;
+      dN2_dxi = dN_dxi + 2;
+      for (i0 = 0; i0 < n_efuns[0]; i0++) {
+        for (i1 = 0; i1 < n_efuns[1]; i1++) {
+          for (i2 = 0; i2 < n_efuns[2]; i2++) {
+            W = weights->val[ec[a]];
+
+            R->val[a] = N0->val[i0] * N1->val[i1] * N2->val[i2] * W;
+            w += R->val[a];
+
+            dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0] * N1->val[i1] * N2->val[i2] * W;
+            dw_dxi[0] += dR_dxi->val[a+n_ep*0];
+
+            dR_dxi->val[a+n_ep*1] = N0->val[i0] * dN1_dxi->val[i1] * N2->val[i2] * W;
+            dw_dxi[1] += dR_dxi->val[a+n_ep*1];
+
+            dR_dxi->val[a+n_ep*2] = N0->val[i0] * N1->val[i1] * dN2_dxi->val[i2] * W;
+            dw_dxi[2] += dR_dxi->val[a+n_ep*2];
+
+            a += 1;
+          }
+        }
+      }
+    } else if (dim == 2) {
+      N0 = N + 0;
+      N1 = N + 1;
+      dN0_dxi = dN_dxi + 0;
+      dN1_dxi = dN_dxi + 1;
+      for (i0 = 0; i0 < n_efuns[0]; i0++) {
+        for (i1 = 0; i1 < n_efuns[1]; i1++) {
+          W = weights->val[ec[a]];
 
-          dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0] * N1->val[i1] * N2->val[i2];
+          R->val[a] = N0->val[i0] * N1->val[i1] * W;
+          w += R->val[a];
 
-          dR_dxi->val[a+n_ep*1] = N0->val[i0] * dN1_dxi->val[i1] * N2->val[i2];
+          dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0] * N1->val[i1] * W;
+          dw_dxi[0] += dR_dxi->val[a+n_ep*0];
 
-          dR_dxi->val[a+n_ep*2] = N0->val[i0] * N1->val[i1] * dN2_dxi->val[i2];
+          dR_dxi->val[a+n_ep*1] = N0->val[i0] * dN1_dxi->val[i1] * W;
+          dw_dxi[1] += dR_dxi->val[a+n_ep*1];
 
           a += 1;
         }
       }
-    }
-  } else if (dim == 2) {
-    N0 = N + 0;
-    N1 = N + 1;
-    dN0_dxi = dN_dxi + 0;
-    dN1_dxi = dN_dxi + 1;
-    for (i0 = 0; i0 < n_efuns[0]; i0++) {
-      for (i1 = 0; i1 < n_efuns[1]; i1++) {
-        R->val[a] = N0->val[i0] * N1->val[i1];
+    } else {
+      N0 = N + 0;
+      dN0_dxi = dN_dxi + 0;
+      for (i0 = 0; i0 < n_efuns[0]; i0++) {
+          W = weights->val[ec[a]];
 
-        dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0] * N1->val[i1];
+          R->val[a] = N0->val[i0] * W;
+          w += R->val[a];
 
-        dR_dxi->val[a+n_ep*1] = N0->val[i0] * dN1_dxi->val[i1];
+          dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0] * W;
+          dw_dxi[0] += dR_dxi->val[a+n_ep*0];
 
-        a += 1;
+          a += 1;
       }
     }
-  } else {
-    // Simple copy here.
-    N0 = N + 0;
-    dN0_dxi = dN_dxi + 0;
-    for (i0 = 0; i0 < n_efuns[0]; i0++) {
-        R->val[a] = N0->val[i0];
 
-        dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0];
+    // Finish R <- R / w_b.
+    fmf_mulC(R, 1.0 / w);
 
-        a += 1;
+    // Finish dR/dxi. D == W C dB/dxi, dR/dxi = (D - R dw_b/dxi) / w_b.
+    for (a = 0; a < (uint32)dR_dxi->nCol; a++) {
+      for (ii = 0; ii < (uint32)dim; ii++) {
+        dR_dxi->val[a+n_ep*ii] = (dR_dxi->val[a+n_ep*ii]
+                                  - R->val[a] * dw_dxi[ii]) / w;
+      }
     }
   }
 
@@ -462,36 +501,26 @@ int32 eval_bspline_basis_tp(FMField *R, FMField *dR_dx, FMField *det,
     fmf_mulATB_nn(dR_dx, dxi_dx, dR_dxi);
   }
 
- end_label:
   return(ret);
 }
 
 #undef __FUNC__
-#define __FUNC__ "eval_nurbs_basis_tp"
+#define __FUNC__ "eval_extracted_basis_1d"
 /*
-  dR_dx has shape (dim, n_efun), transposed w.r.t. the Python version!
+  1D Bernstein basis B, dB/dxi, and 1D B-spline basis N = CB, dN/dxi = C dB/dxi
+  of the Bezier element ie.
 */
-int32 eval_nurbs_basis_tp(FMField *R, FMField *dR_dx, FMField *det,
-                          FMField *dR_dxi,
-                          FMField *dx_dxi, FMField *dxi_dx,
-                          FMField *B, FMField *dB_dxi,
-                          FMField *N, FMField *dN_dxi,
-                          FMField *qp, uint32 ie, FMField *control_points,
-                          FMField *weights, int32 *degrees, int32 dim,
-                          FMField *cs,
-                          int32 *conn, int32 n_el, int32 n_ep,
-                          int32 has_bernstein, int32 is_dx)
+static int32 eval_extracted_basis_1d(FMField *B, FMField *dB_dxi,
+                                     FMField *N, FMField *dN_dxi,
+                                     FMField *qp, uint32 ie,
+                                     int32 *degrees, int32 dim,
+                                     FMField *cs, int32 has_bernstein)
 {
   int32 ret = RET_OK;
-  uint32 ii, jj, a, i0, i1, i2;
-  uint32 n_efuns[3];
-  uint32 n_efun = 1;
+  uint32 ii;
   uint32 n_els[3];
   uint32 ic[3];
-  int32 *ec;
-  FMField *C, *N0, *N1, *N2, *dN0_dxi, *dN1_dxi, *dN2_dxi;
-  float64 w, W, P;
-  float64 dw_dxi[3];
+  FMField *C;
 
 #ifdef DEBUG_FMF
   if (!((dim == qp->nCol) && (dim <= 3))) {
@@ -500,21 +529,6 @@ int32 eval_nurbs_basis_tp(FMField *R, FMField *dR_dx, FMField *det,
   }
 #endif
 
-  for (ii = 0; ii < (uint32)dim; ii++) {
-    n_efuns[ii] = degrees[ii] + 1;
-    n_efun *= n_efuns[ii];
-  }
-
-#ifdef DEBUG_FMF
-  if (n_efun != n_ep) {
-    errput(ErrHead "inconsistent number of bases! (%d == $d)", n_efun, n_ep);
-    ERR_CheckGo(ret);
-  }
-#endif
-
-  // Element connectivity.
-  ec = conn + n_ep * ie;
-
   // 1D Bernstein basis B, dB/dxi.
   if (!has_bernstein) {
     for (ii = 0; ii < (uint32)dim; ii++) {
@@ -539,109 +553,176 @@ int32 eval_nurbs_basis_tp(FMField *R, FMField *dR_dx, FMField *det,
 
   ERR_CheckGo(ret);
 
-  // Numerators and denominator for tensor-product NURBS basis R, dR/dxi.
-  w = 0; // w_b
-  for (ii = 0; ii < (uint32)dim; ii++) {
-    dw_dxi[ii] = 0.0; // dw_b/dxi
-  }
-  a = 0; // Basis function index.
-  if (dim == 3) {
-    N0 = N + 0;
-    N1 = N + 1;
-    N2 = N + 2;
-    dN0_dxi = dN_dxi + 0;
-    dN1_dxi = dN_dxi + 1;
-    dN2_dxi = dN_dxi + 2;
-    for (i0 = 0; i0 < n_efuns[0]; i0++) {
-      for (i1 = 0; i1 < n_efuns[1]; i1++) {
-        for (i2 = 0; i2 < n_efuns[2]; i2++) {
-          W = weights->val[ec[a]];
+ end_label:
+  return(ret);
+}
 
-          R->val[a] = N0->val[i0] * N1->val[i1] * N2->val[i2] * W;
-          w += R->val[a];
+#undef __FUNC__
+#define __FUNC__ "eval_bspline_basis_tp"
+/*
+  dR_dx has shape (dim, n_efun), transposed w.r.t. the Python version!
+*/
+int32 eval_bspline_basis_tp(FMField *R, FMField *dR_dx, FMField *det,
+                            FMField *dR_dxi,
+                            FMField *dx_dxi, FMField *dxi_dx,
+                            FMField *B, FMField *dB_dxi,
+                            FMField *N, FMField *dN_dxi,
+                            FMField *qp, uint32 ie,
+                            FMField *control_points,
+                            int32 *degrees, int32 dim,
+                            FMField *cs,
+                            int32 *conn, int32 n_el, int32 n_ep,
+                            int32 has_bernstein, int32 is_dx)
+{
+  int32 ret = RET_OK;
 
-          dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0] * N1->val[i1] * N2->val[i2] * W;
-          dw_dxi[0] += dR_dxi->val[a+n_ep*0];
+  ret = eval_extracted_basis_1d(B, dB_dxi, N, dN_dxi, qp, ie, degrees, dim,
+                                cs, has_bernstein);
+  if (ret) return(ret);
 
-          dR_dxi->val[a+n_ep*1] = N0->val[i0] * dN1_dxi->val[i1] * N2->val[i2] * W;
-          dw_dxi[1] += dR_dxi->val[a+n_ep*1];
+  ret = eval_basis_tp_from_1d(R, dR_dx, det, dR_dxi, dx_dxi, dxi_dx,
+                              N, dN_dxi, conn + n_ep * ie, control_points,
+                              0, degrees, dim, n_ep, is_dx);
 
-          dR_dxi->val[a+n_ep*2] = N0->val[i0] * N1->val[i1] * dN2_dxi->val[i2] * W;
-          dw_dxi[2] += dR_dxi->val[a+n_ep*2];
+  return(ret);
+}
 
-          a += 1;
-        }
-      }
-    }
-  } else if (dim == 2) {
-    N0 = N + 0;
-    N1 = N + 1;
-    dN0_dxi = dN_dxi + 0;
-    dN1_dxi = dN_dxi + 1;
-    for (i0 = 0; i0 < n_efuns[0]; i0++) {
-      for (i1 = 0; i1 < n_efuns[1]; i1++) {
-        W = weights->val[ec[a]];
+#undef __FUNC__
+#define __FUNC__ "eval_nurbs_basis_tp"
+/*
+  dR_dx has shape (dim, n_efun), transposed w.r.t. the Python version!
+*/
+int32 eval_nurbs_basis_tp(FMField *R, FMField *dR_dx, FMField *det,
+                          FMField *dR_dxi,
+                          FMField *dx_dxi, FMField *dxi_dx,
+                          FMField *B, FMField *dB_dxi,
+                          FMField *N, FMField *dN_dxi,
+                          FMField *qp, uint32 ie, FMField *control_points,
+                          FMField *weights, int32 *degrees, int32 dim,
+                          FMField *cs,
+                          int32 *conn, int32 n_el, int32 n_ep,
+                          int32 has_bernstein, int32 is_dx)
+{
+  int32 ret = RET_OK;
 
-        R->val[a] = N0->val[i0] * N1->val[i1] * W;
-        w += R->val[a];
+  ret = eval_extracted_basis_1d(B, dB_dxi, N, dN_dxi, qp, ie, degrees, dim,
+                                cs, has_bernstein);
+  if (ret) return(ret);
 
-        dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0] * N1->val[i1] * W;
-        dw_dxi[0] += dR_dxi->val[a+n_ep*0];
+  ret = eval_basis_tp_from_1d(R, dR_dx, det, dR_dxi, dx_dxi, dxi_dx,
+                              N, dN_dxi, conn + n_ep * ie, control_points,
+                              weights, degrees, dim, n_ep, is_dx);
 
-        dR_dxi->val[a+n_ep*1] = N0->val[i0] * dN1_dxi->val[i1] * W;
-        dw_dxi[1] += dR_dxi->val[a+n_ep*1];
+  return(ret);
+}
 
-        a += 1;
-      }
-    }
-  } else {
-    N0 = N + 0;
-    dN0_dxi = dN_dxi + 0;
-    for (i0 = 0; i0 < n_efuns[0]; i0++) {
-        W = weights->val[ec[a]];
+#undef __FUNC__
+#define __FUNC__ "eval_basis_tp_batch"
+/*
+  Evaluate the tensor-product B-spline (weights == NULL) or NURBS basis and
+  the reference mapping in n_qp quadrature points of the given cells.
 
-        R->val[a] = N0->val[i0] * W;
-        w += R->val[a];
+  The 1D B-spline bases N = CB, dN/dxi = C dB/dxi are precomputed for the
+  unique extraction operators only: Ns[ii], dNs_dxi[ii] have shape (n_uc[ii],
+  n_qp, 1, n_efuns[ii]) and ics[ii] maps the 1D element indices of the
+  parametric axis ii to the unique operators.
 
-        dR_dxi->val[a+n_ep*0] = dN0_dxi->val[i0] * W;
-        dw_dxi[0] += dR_dxi->val[a+n_ep*0];
+  If bfs, bfgs are given, R, dR/dx are stored there (shapes (n_cell, n_qp, 1,
+  n_efun), (n_cell, n_qp, dim, n_efun)), otherwise the single point buffers R,
+  dR_dx are used. If vals is given, the variable and the control points are
+  interpolated to vals, coors (shapes (n_cell * n_qp, nc), (n_cell * n_qp,
+  dim)). The Jacobians are always stored to dets.
 
-        a += 1;
-    }
+  Does not use the Python C-API, so it can be called without the GIL.
+*/
+int32 eval_basis_tp_batch(FMField *bfs, FMField *bfgs, FMField *dets,
+                          FMField *coors, FMField *vals, FMField *variable,
+                          FMField *R, FMField *dR_dx, FMField *dR_dxi,
+                          FMField *dx_dxi, FMField *dxi_dx,
+                          FMField *Ns, FMField *dNs_dxi,
+                          int32 **ics, uint32 *n_els,
+                          uint32 *cells, uint32 n_cell, uint32 n_qp,
+                          FMField *control_points, FMField *weights,
+                          int32 *degrees, int32 dim,
+                          int32 *conn, int32 n_ep)
+{
+  int32 ret = RET_OK;
+  uint32 ii, iseq, iqp, ie, ip, ir, ic, nc = 0;
+  uint32 n_efuns[3];
+  uint32 ics1d[3];
+  int32 *ec;
+  float64 val;
+  float64 *pvals = 0, *pcoors = 0;
+  FMField N[3], dN_dxi[3];
+  FMField _R[1], _dR_dx[1], _det[1];
+
+  for (ii = 0; ii < (uint32)dim; ii++) {
+    n_efuns[ii] = degrees[ii] + 1;
   }
 
-  // Finish R <- R / w_b.
-  fmf_mulC(R, 1.0 / w);
+  fmf_pretend_nc(_R, 1, 1, 1, n_ep, R->val0);
+  fmf_pretend_nc(_dR_dx, 1, 1, dim, n_ep, dR_dx->val0);
+  fmf_pretend_nc(_det, 1, 1, 1, 1, dets->val0);
 
-  // Finish dR/dxi. D == W C dB/dxi, dR/dxi = (D - R dw_b/dxi) / w_b.
-  for (a = 0; a < (uint32)dR_dxi->nCol; a++) {
-    for (ii = 0; ii < (uint32)dim; ii++) {
-      dR_dxi->val[a+n_ep*ii] = (dR_dxi->val[a+n_ep*ii]
-                                - R->val[a] * dw_dxi[ii]) / w;
-    }
+  if (vals) {
+    nc = vals->nCol;
   }
 
-  if (is_dx) {
-    // Mapping reference -> physical domain dxi/dx.
-    // x = sum P_a R_a, dx/dxi = sum P_a dR_a/dxi, invert.
+  for (iseq = 0; iseq < n_cell; iseq++) {
+    ie = cells[iseq];
+    ec = conn + n_ep * ie;
+
+    unravel_index(ics1d, ie, n_els, dim);
     for (ii = 0; ii < (uint32)dim; ii++) {
-      for (jj = 0; jj < (uint32)dim; jj++) {
-        dx_dxi->val[dim*ii+jj] = 0.0;
-        for (a = 0; a < (uint32)dR_dxi->nCol; a++) {
-          P = control_points->val[dim*ec[a]+ii];
+      ics1d[ii] = ics[ii][ics1d[ii]];
+    }
 
-          dx_dxi->val[dim*ii+jj] += P * dR_dxi->val[a+n_ep*jj];
-        }
+    for (iqp = 0; iqp < n_qp; iqp++) {
+      ip = n_qp * iseq + iqp;
+
+      for (ii = 0; ii < (uint32)dim; ii++) {
+        fmf_pretend_nc(N + ii, 1, 1, n_efuns[ii], 1,
+                       Ns[ii].val0 + n_efuns[ii] * (n_qp * ics1d[ii] + iqp));
+        fmf_pretend_nc(dN_dxi + ii, 1, 1, n_efuns[ii], 1,
+                       dNs_dxi[ii].val0
+                       + n_efuns[ii] * (n_qp * ics1d[ii] + iqp));
       }
-    }
-    geme_det3x3(det->val, dx_dxi);
 
-    geme_invert3x3(dxi_dx, dx_dxi);
+      if (bfs) {
+        _R->val = bfs->val0 + n_ep * ip;
+        _dR_dx->val = bfgs->val0 + dim * n_ep * ip;
+      }
+      _det->val = dets->val0 + ip;
+
+      eval_basis_tp_from_1d(_R, _dR_dx, _det, dR_dxi, dx_dxi, dxi_dx,
+                            N, dN_dxi, ec, control_points,
+                            weights, degrees, dim, n_ep, 1);
+
+      if (vals) {
+        // vals[ip, :] = np.dot(bf, variable[ec])
+        pvals = vals->val0 + nc * ip;
+        for (ir = 0; ir < nc; ir++) {
+          pvals[ir] = 0.0;
+
+          for (ic = 0; ic < (uint32)n_ep; ic++) {
+            val = variable->val[ec[ic] * nc + ir];
+            pvals[ir] += _R->val[ic] * val;
+          }
+        }
 
-    // dR/dx.
-    fmf_mulATB_nn(dR_dx, dxi_dx, dR_dxi);
+        // coors[ip, :] = np.dot(bf, control_points[ec])
+        pcoors = coors->val0 + dim * ip;
+        for (ir = 0; ir < (uint32)dim; ir++) {
+          pcoors[ir] = 0.0;
+
+          for (ic = 0; ic < (uint32)n_ep; ic++) {
+            val = control_points->val[ec[ic] * dim + ir];
+            pcoors[ir] += _R->val[ic] * val;
+          }
+        }
+      }
+    }
   }
 
- end_label:
   return(ret);
 }
@@ -71,6 +71,13 @@ int32 eval_basis_nurbs(FMField *out, FMField *coors, int32 diff,
 
 int32 eval_bernstein_basis(FMField *funs, FMField *ders,
                            float64 x, uint32 degree);
+int32 eval_basis_tp_from_1d(FMField *R, FMField *dR_dx, FMField *det,
+                            FMField *dR_dxi,
+                            FMField *dx_dxi, FMField *dxi_dx,
+                            FMField *N, FMField *dN_dxi,
+                            int32 *ec, FMField *control_points,
+                            FMField *weights, int32 *degrees, int32 dim,
+                            int32 n_ep, int32 is_dx);
 int32 eval_bspline_basis_tp(FMField *R, FMField *dR_dx, FMField *det,
                             FMField *dR_dxi,
                             FMField *dx_dxi, FMField *dxi_dx,
@@ -92,5 +99,15 @@ int32 eval_nurbs_basis_tp(FMField *R, FMField *dR_dx, FMField *det,
                           FMField *cs,
                           int32 *conn, int32 n_el, int32 n_ep,
                           int32 has_bernstein, int32 is_dx);
+int32 eval_basis_tp_batch(FMField *bfs, FMField *bfgs, FMField *dets,
+                          FMField *coors, FMField *vals, FMField *variable,
+                          FMField *R, FMField *dR_dx, FMField *dR_dxi,
+                          FMField *dx_dxi, FMField *dxi_dx,
+                          FMField *Ns, FMField *dNs_dxi,
+                          int32 **ics, uint32 *n_els,
+                          uint32 *cells, uint32 n_cell, uint32 n_qp,
+                          FMField *control_points, FMField *weights,
+                          int32 *degrees, int32 dim,
+                          int32 *conn, int32 n_ep);
 
 #endif /* !NURBS_H */
@@ -98,6 +98,19 @@ class IGField(Field):
         """
         return (self.nurbs.degrees > 1).any()
 
+    def get_coor(self, nods=None):
+        """
+        Get coordinates of the field nodes, i.e. of the NURBS control points.
+
+        Parameters
+        ----------
+        nods : array, optional
+           The indices of the required nodes. If not given, the
+           coordinates of all the nodes are returned.
+        """
+        cps = self.nurbs.cps
+        return cps if nods is None else cps[nods]
+
     def get_econn(self, conn_type, region, is_trace=False, integration=None):
         """
         Get DOF connectivity of the given type in the given region.
@@ -366,6 +379,26 @@ class IGField(Field):
 
         return cmap, mapping
 
+    def get_mapping_cache_key(self, region, integral, integration):
+        """
+        Get the key of a reference mapping in the persistent mappings cache.
+        The key is a hash of the NURBS patch, the region cells and the
+        integral.
+        """
+        from sfepy.base.disk_cache import get_hash
+
+        if integral.mode == 'custom':
+            qps = (nm.asarray(integral.coors), nm.asarray(integral.weights))
+
+        else:
+            qps = None
+
+        nurbs = self.nurbs
+        key = get_hash('iga', nurbs.degrees, nurbs.cps, nurbs.weights,
+                       nurbs.cs, nurbs.conn, region.cells, integration,
+                       integral.order, qps)
+        return key
+
     def create_mesh(self, extra_nodes=True):
         """
         Create a mesh corresponding to the field region. For IGA fields, this
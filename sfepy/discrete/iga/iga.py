@@ -206,6 +206,44 @@ def combine_bezier_extraction(cs):
 
     return ccs
 
+def get_unique_extraction_operators(cs, decimals=14):
+    """
+    Find the unique 1D element extraction operators in each parametric
+    dimension. On uniform knot vectors, most elements share the same
+    operator.
+
+    Parameters
+    ----------
+    cs : list of lists of 2D arrays
+        The element extraction operators in each parametric dimension.
+    decimals : int
+        The operators are compared after rounding to the given number of
+        decimals.
+
+    Returns
+    -------
+    ucs : list of 3D arrays
+        The unique element extraction operators in each parametric dimension.
+    ics : list of arrays
+        The indices of the unique operators of all elements in each parametric
+        dimension, i.e. ``cs[ii][ie] == ucs[ii][ics[ii][ie]]`` up to the
+        rounding.
+    """
+    ucs = []
+    ics = []
+    for cs1d in cs:
+        cs1d = nm.asarray(cs1d, dtype=nm.float64)
+        n_efun = cs1d.shape[-1]
+        cs1d = cs1d.reshape((-1, n_efun, n_efun))
+
+        keys = nm.round(cs1d.reshape((len(cs1d), -1)), decimals)
+        _, ii, ic = nm.unique(keys, axis=0, return_index=True,
+                              return_inverse=True)
+        ucs.append(nm.ascontiguousarray(cs1d[ii]))
+        ics.append(ic.astype(nm.int32).ravel())
+
+    return ucs, ics
+
 def create_connectivity_1d(n_el, knots, degree):
     """
     Create connectivity arrays of 1D Bezier elements.
@@ -1,4 +1,5 @@
 from __future__ import absolute_import
+import hashlib
 
 from sfepy.base.base import (Struct, Container, OneTypeList, assert_,
                              output, get_default, basestr)
@@ -6,6 +7,15 @@ from sfepy.base.timing import Timer
 from .functions import ConstantFunction, ConstantFunctionByRegion
 import six
 
+def _get_arrays_digest(arrays):
+    """
+    Return the SHA1 digest of contents of the given arrays.
+    """
+    sha1 = hashlib.sha1()
+    for arr in arrays:
+        sha1.update(arr.tobytes())
+
+    return sha1.hexdigest()
 
 class Materials(Container):
 
@@ -53,9 +63,11 @@ class Materials(Container):
         """
         if verbose: output('updating materials...')
         timer = Timer(start=True)
+        coors_digests = {}
         for mat in self:
             if verbose: output(' ', mat.name)
-            mat.time_update(ts, equations, mode=mode, problem=problem)
+            mat.time_update(ts, equations, mode=mode, problem=problem,
+                            coors_digests=coors_digests)
         if verbose: output('...done in %.2f s' % timer.stop())
 
 class Material(Struct):
@@ -71,7 +83,28 @@ class Material(Struct):
 
     Material parameters are passed to terms using the dot notation,
     i.e. 'm.E' in our example case.
+
+    The values of a time-dependent material given by a function are
+    recomputed in each call to :func:`Material.time_update()` in 'normal'
+    mode. If the function declares its dependencies, either by the
+    `depends_on` argument or by the `depends_on` attribute of the function,
+    the values are recomputed only when a declared dependency changes::
+
+        material_3 = {
+           'name' : 'm',
+           'function' : 'get_pars',
+           'depends_on' : ('time',),
+        }
+
+    The allowed dependencies are:
+
+    - 'time' : the time step and time of the time stepper;
+    - 'state' : the DOF values of the state variables;
+    - 'iteration' : each call to :func:`Material.time_update()` - the values
+      are always recomputed, as with no declared dependencies.
     """
+    dependencies = ('time', 'state', 'iteration')
+
     @staticmethod
     def from_conf(conf, functions):
         """
@@ -82,16 +115,19 @@ class Material(Struct):
 
         function = conf.get('function', None)
         values = conf.get('values', None)
+        depends_on = conf.get('depends_on', None)
 
         if isinstance(function, basestr):
             function = functions[function]
 
-        obj = Material(conf.name, kind, function, values, flags)
+        obj = Material(conf.name, kind, function, values, flags,
+                       depends_on=depends_on)
 
         return obj
 
     def __init__(self, name, kind='time-dependent',
-                 function=None, values=None, flags=None, **kwargs):
+                 function=None, values=None, flags=None, depends_on=None,
+                 **kwargs):
         """
         Parameters
         ----------
@@ -105,6 +141,10 @@ class Material(Struct):
             Constant material values.
         flags : dict, optional
             Special flags.
+        depends_on : sequence of str, optional
+            The dependencies of `function`, a subset of
+            :attr:`Material.dependencies`. If not given, the `depends_on`
+            attribute of `function` is used, if present.
         **kwargs : keyword arguments, optional
             Constant material values passed by their names.
         """
@@ -120,6 +160,9 @@ class Material(Struct):
         if hasattr(function, '__call__'):
             self.function = function
 
+            if depends_on is None:
+                depends_on = getattr(function, 'depends_on', None)
+
         elif (values is not None) or len(kwargs): # => function is None
             if isinstance(values, dict):
                 key0 = list(values.keys())[0]
@@ -147,6 +190,18 @@ class Material(Struct):
                   % self.name
             raise ValueError(msg)
 
+        if depends_on is not None:
+            if isinstance(depends_on, basestr):
+                depends_on = (depends_on,)
+
+            for dep in depends_on:
+                if dep not in self.dependencies:
+                    raise ValueError('material %s: unknown dependency! (%s)'
+                                     % (self.name, dep))
+            depends_on = tuple(depends_on)
+
+        self.depends_on = depends_on
+
         self.reset()
 
     def iter_terms(self, equations, only_new=True):
@@ -194,7 +249,8 @@ class Material(Struct):
 
         self.datas[key] = new_data
 
-    def update_data(self, key, ts, equations, term, problem=None):
+    def update_data(self, key, ts, equations, term, problem=None,
+                    coors_digests=None):
         """
         Update the material parameters in quadrature points.
 
@@ -210,10 +266,12 @@ class Material(Struct):
             The term for which the update occurs.
         problem : Problem, optional
             The problem definition for which the update occurs.
+        coors_digests : dict, optional
+            The mesh coordinates digests, see :func:`get_physical_qps()`.
         """
         self.datas.setdefault(key, {})
 
-        qps = term.get_physical_qps()
+        qps = self.get_physical_qps(key, term, coors_digests=coors_digests)
         coors = qps.values
         data = self.function(ts, coors, mode='qp',
                              equations=equations, term=term, problem=problem,
@@ -221,6 +279,95 @@ class Material(Struct):
 
         self.set_data(key, qps, data)
 
+    def get_physical_qps(self, key, term, coors_digests=None):
+        """
+        Get physical quadrature points of a term, reusing the cached ones for
+        the given key, if the mesh coordinates did not change.
+
+        Parameters
+        ----------
+        key : tuple
+            The (region_name, integral_name) data key.
+        term : Term
+            The term for which the quadrature points are required.
+        coors_digests : dict, optional
+            If given, the digests of the mesh coordinates are stored in and
+            reused from this dict, keyed by the cmesh ids, so that they can
+            be computed only once in a single update of all data keys. It
+            must not be reused after the coordinates change.
+
+        Returns
+        -------
+        qps : PhysicalQPs instance
+            The physical quadrature points.
+        """
+        cmesh = getattr(term.region.domain, 'cmesh', None)
+        if cmesh is None:
+            return term.get_physical_qps()
+
+        if coors_digests is None:
+            digest = _get_arrays_digest([cmesh.coors])
+
+        else:
+            digest = coors_digests.get(id(cmesh))
+            if digest is None:
+                digest = _get_arrays_digest([cmesh.coors])
+                coors_digests[id(cmesh)] = digest
+
+        cached = self.qps_cache.get(key)
+        if (cached is not None) and (cached[0] == digest):
+            qps = cached[1]
+
+        else:
+            qps = term.get_physical_qps()
+            self.qps_cache[key] = (digest, qps)
+
+        return qps
+
+    def get_dependency_key(self, ts, equations):
+        """
+        Get the key identifying the current values of the declared
+        dependencies of the material function.
+
+        Parameters
+        ----------
+        ts : TimeStepper
+            The time stepper.
+        equations : Equations
+            The equations using the material.
+
+        Returns
+        -------
+        dkey : tuple or None
+            The dependency key. None means that the dependencies are not
+            declared or change in each call, so that the material data have
+            to be recomputed.
+        """
+        if (self.depends_on is None) or ('iteration' in self.depends_on):
+            return None
+
+        dkey = []
+        if 'time' in self.depends_on:
+            if ts is None:
+                return None
+
+            dkey.append((ts.step, ts.time))
+
+        if 'state' in self.depends_on:
+            variables = getattr(equations, 'variables', None)
+            if variables is None:
+                return None
+
+            arrays = []
+            for var in variables.iter_state():
+                if var.data[0] is None:
+                    return None
+                arrays.append(var())
+
+            dkey.append(_get_arrays_digest(arrays))
+
+        return tuple(dkey)
+
     def update_special_data(self, ts, equations, problem=None):
         """
         Update the special material parameters.
@@ -264,7 +411,8 @@ class Material(Struct):
         self.datas['special_constant'] = datas
         self.constant_names.update(list(datas.keys()))
 
-    def time_update(self, ts, equations, mode='normal', problem=None):
+    def time_update(self, ts, equations, mode='normal', problem=None,
+                    coors_digests=None):
         """
         Evaluate material parameters in physical quadrature points.
 
@@ -283,11 +431,18 @@ class Material(Struct):
             ``self.datas`` is not empty. For time-dependent materials
             (``self.kind == 'time-dependent'``, the default) that are not
             constant, i.e., are given by a user function, 'normal' mode behaves
-            like 'force' mode. For constant materials it behaves like 'update'
+            like 'force' mode, unless the function declared its dependencies,
+            that did not change since the last update - then it behaves like
+            'update' mode. For constant materials it behaves like 'update'
             mode - existing data are reused.
         problem : Problem instance, optional
             The problem that can be passed to user functions as a context.
+        coors_digests : dict, optional
+            The mesh coordinates digests shared by several materials updated
+            at once, see :func:`get_physical_qps()`.
         """
+        dkey = self.get_dependency_key(ts, equations)
+
         if mode == 'force':
             self.datas = {}
 
@@ -297,10 +452,21 @@ class Material(Struct):
                     return
 
                 elif not self.is_constant:
-                    self.datas = {}
+                    if (dkey is None) or (dkey != self.dependency_key):
+                        self.datas = {}
+
+            elif dkey != self.dependency_key:
+                # Data for different dependency values would be mixed.
+                dkey = None
+
+        self.dependency_key = dkey
+
+        if coors_digests is None:
+            coors_digests = {}
 
         for key, term in self.iter_terms(equations):
-            self.update_data(key, ts, equations, term, problem=problem)
+            self.update_data(key, ts, equations, term, problem=problem,
+                             coors_digests=coors_digests)
 
         self.update_special_data(ts, equations, problem=problem)
         self.update_special_constant_data(equations, problem=problem)
@@ -339,11 +505,13 @@ class Material(Struct):
 
     def reset(self):
         """
-        Clear all data created by a call to ``time_update()``, set
-        ``self.mode`` to ``None``.
+        Clear all data created by a call to ``time_update()`` including the
+        cached physical quadrature points, set ``self.mode`` to ``None``.
         """
         self.mode = None
         self.datas = {}
+        self.qps_cache = {}
+        self.dependency_key = None
         self.special_names = set()
         self.constant_names = set()
         self.extra_args = {}
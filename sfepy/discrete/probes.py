@@ -8,6 +8,7 @@ import numpy.linalg as nla
 from sfepy.base.base import get_default, basestr, Struct
 from sfepy.linalg import make_axis_rotation_matrix, norm_l2_along_axis
 import six
+from six.moves import range
 
 def write_results(filename, probe, results):
     """
@@ -128,6 +129,181 @@ def get_data_name(fd):
 
             yield name, nc
 
+def get_dofs_from_output(out, variables):
+    """
+    Convert the output data of variables, as returned e.g. by
+    :func:`MeshIO.read_data() <sfepy.discrete.fem.meshio.MeshIO.read_data()>`,
+    to DOF values of the variable fields suitable for :func:`probe_steps()`.
+
+    The data in the mesh vertices are restricted to the vertices of the
+    field region and interpolated into the higher order field nodes, as in
+    :func:`FieldVariable.set_from_mesh_vertices()
+    <sfepy.discrete.variables.FieldVariable.set_from_mesh_vertices()>`.
+
+    Parameters
+    ----------
+    out : dict
+        The output data with the keys matching the keys of `variables`. Each
+        item has the `mode` and `data` attributes.
+    variables : dict
+        The FieldVariable instances.
+
+    Returns
+    -------
+    dofs : dict
+        The DOF values of the variable fields with shapes ``(n_nod,
+        n_component)``.
+    """
+    dofs = {}
+    for key, var in six.iteritems(variables):
+        val = out[key]
+        if val.mode != 'vertex':
+            raise ValueError('only vertex data can be probed! (%s: %s)'
+                             % (key, val.mode))
+
+        field = var.field
+        if not hasattr(field, 'interp_v_vals_to_n_vals'):
+            raise ValueError('field %s cannot be set from vertex data!'
+                             % field.name)
+
+        vals = val.data.reshape((val.data.shape[0], -1))
+        dofs[key] = field.interp_v_vals_to_n_vals(vals[field.get_vertices()])
+
+    return dofs
+
+def probe_steps(probes, variables, step_data, mode='val'):
+    """
+    Probe several variables in many time steps. The probe points are located
+    and the interpolation operators are created only once per probe and
+    variable field, so that probing a step costs a sparse matrix-vector
+    product per variable.
+
+    Parameters
+    ----------
+    probes : list of Probe instances
+        The probes.
+    variables : dict
+        The FieldVariable instances with the keys matching the keys of the
+        step data. Only the variable fields are used. The fields have to be
+        defined in the same region.
+    step_data : iterable
+        The iterable (e.g. a generator) of ``(step, time, data)`` tuples,
+        where `data` is a dict of DOF value arrays, with shapes ``(n_nod,
+        n_component)`` or compatible, of the variable fields. The step data
+        are consumed one by one. Use :func:`get_dofs_from_output()` to
+        convert output file data.
+    mode : {'val', 'grad'}, optional
+        The evaluation mode: the variable value (default) or the variable
+        value gradient.
+
+    Returns
+    -------
+    results : list of Struct instances
+        The results of the probes, each with the attributes `pars`,
+        `points`, `steps`, `times` and `vals`. `vals` is a dict with the
+        keys of `variables`, with the values of shape ``(n_step, n_point,
+        n_component)`` for the 'val' mode, or ``(n_step, n_point,
+        n_component, dim)`` for the 'grad' mode.
+    """
+    results = []
+    operators = []
+    for probe in probes:
+        result = Struct(name=probe.name, steps=[], times=[],
+                        vals=dict((key, []) for key in variables))
+        # The points are located (and refined) using the first variable.
+        keys = sorted(variables.keys())
+        region = variables[keys[0]].field.region
+        for key in keys[1:]:
+            if variables[key].field.region is not region:
+                raise ValueError('all variables have to be defined in the'
+                                 ' same region! (%s: %s, %s: %s)'
+                                 % (keys[0], region.name, key,
+                                    variables[key].field.region.name))
+
+        pars, points, iop = probe.locate(variables[keys[0]], mode=mode)
+        iops = {keys[0] : iop}
+        for key in keys[1:]:
+            iops[key] = probe.get_interp_operator(variables[key], points,
+                                                  mode=mode)
+
+        result.pars, result.points = pars, points
+        results.append(result)
+        operators.append(iops)
+
+    for step, time, data in step_data:
+        for ip, result in enumerate(results):
+            result.steps.append(step)
+            result.times.append(time)
+            for key, iop in six.iteritems(operators[ip]):
+                result.vals[key].append(iop(data[key], set_nan=False))
+
+    for result in results:
+        result.steps = nm.array(result.steps, dtype=nm.int32)
+        result.times = nm.array(result.times, dtype=nm.float64)
+        for key, vals in six.iteritems(result.vals):
+            result.vals[key] = nm.array(vals)
+
+    return results
+
+def write_steps_results(filename, probes, results, labels=None):
+    """
+    Write probing results returned by :func:`probe_steps()` into a single
+    compressed NumPy ``.npz`` file.
+
+    The array names are ``'<ip>/<item>'`` for the probe with the index `ip`,
+    where `item` is one of 'header', 'label', 'pars', 'points', 'steps',
+    'times', or ``'vals/<key>'``.
+    """
+    arrays = {'n_probe' : nm.array(len(probes))}
+    for ip, probe in enumerate(probes):
+        result = results[ip]
+        prefix = '%d/' % ip
+        arrays[prefix + 'header'] = nm.array('\n'.join(probe.report()))
+        if labels is not None:
+            arrays[prefix + 'label'] = nm.array(labels[ip])
+        arrays[prefix + 'pars'] = result.pars
+        arrays[prefix + 'points'] = result.points
+        arrays[prefix + 'steps'] = result.steps
+        arrays[prefix + 'times'] = result.times
+        for key, vals in six.iteritems(result.vals):
+            arrays[prefix + 'vals/' + key] = vals
+
+    nm.savez_compressed(filename, **arrays)
+
+def read_steps_results(filename):
+    """
+    Read probing results written by :func:`write_steps_results()`.
+
+    Returns
+    -------
+    results : list of Struct instances
+        The results of the probes, see :func:`probe_steps()`. Each result has
+        also the `header` and `label` attributes.
+    """
+    results = []
+    with nm.load(filename) as fd:
+        n_probe = int(fd['n_probe'])
+        for ip in range(n_probe):
+            prefix = '%d/' % ip
+            result = Struct(name='probe_result_%d' % ip, vals={},
+                            label=None)
+            for key in fd.files:
+                if not key.startswith(prefix): continue
+
+                item = key[len(prefix):]
+                if item.startswith('vals/'):
+                    result.vals[item[5:]] = fd[key]
+
+                elif item in ('header', 'label'):
+                    setattr(result, item, str(fd[key]))
+
+                else:
+                    setattr(result, item, fd[key])
+
+            results.append(result)
+
+    return results
+
 class Probe(Struct):
     """
     Base class for all point probes. Enforces two points minimum.
@@ -162,7 +338,7 @@ class Probe(Struct):
         self.options = Struct(close_limit=0.1, size_hint=None)
         self.cache = Struct(name='probe_local_evaluate_cache')
         self.acache = Struct(name='probe_actual_evaluate_cache',
-                             pars_digest='')
+                             pars_digest='', operators={})
 
         self.is_refined = False
 
@@ -177,8 +353,9 @@ class Probe(Struct):
         """
         Return the actual evaluate cache, which is a combination of the
         (mesh-based) evaluate cache and probe-specific data, like the reference
-        element coordinates. The reference element coordinates are reused, if
-        the sha1 hash of the probe parameter vector does not change.
+        element coordinates. The reference element coordinates and the
+        interpolation operators are reused, if the sha1 hash of the probe
+        parameter vector does not change.
         """
         self.acache += cache
 
@@ -198,6 +375,7 @@ class Probe(Struct):
             self.acache.ref_coors = None
             self.acache.cells = None
             self.acache.status = None
+            self.acache.operators = {}
 
         return self.acache
 
@@ -270,9 +448,13 @@ class Probe(Struct):
         """
         return self.probe(variable, **kwargs)
 
-    def probe(self, variable, mode='val', ret_points=False):
+    def locate(self, variable, mode='val'):
         """
-        Probe the given variable.
+        Locate the probe points in the field of the given variable, refining
+        the points if needed, and get the interpolation operator of the field
+        in the points.
+
+        Only the variable field is used, not the variable values.
 
         Parameters
         ----------
@@ -281,26 +463,30 @@ class Probe(Struct):
         mode : {'val', 'grad'}, optional
             The evaluation mode: the variable value (default) or the
             variable value gradient.
-        ret_points : bool
-            If True, return also the probe points.
 
         Returns
         -------
         pars : array
             The parametrization of the probe points.
-        points : array, optional
-            If `ret_points` is True, the coordinates of points corresponding to
-            `pars`, where the `variable` is evaluated.
-        vals : array
-            The probed values.
+        points : array
+            The coordinates of points corresponding to `pars`.
+        operator : InterpolationOperator instance
+            The interpolation operator of the variable field in `points`.
         """
         refine_flag = None
 
-        ev = variable.evaluate_at
         field = variable.field
 
-        cache = field.get_evaluate_cache(cache=self.get_evaluate_cache(),
-                                         share_geometry=self.share_geometry)
+        # The geometry data can be shared only by fields in the same region.
+        ecache = self.get_evaluate_cache()
+        share_geometry = (self.share_geometry
+                          and (ecache.get('region', None) is field.region))
+        cache = field.get_evaluate_cache(cache=ecache,
+                                         share_geometry=share_geometry)
+        cache.region = field.region
+        if self.acache.get('region', None) is not field.region:
+            self.acache = Struct(name='probe_actual_evaluate_cache',
+                                 pars_digest='', operators={})
         self.reset_refinement()
 
         while True:
@@ -308,27 +494,71 @@ class Probe(Struct):
             if not nm.isfinite(points).all():
                 raise ValueError('Inf/nan in probe points!')
 
-            acache = self.get_actual_cache(pars, cache)
-
-            vals, ref_coors, cells, status = ev(
-                points, mode=mode, strategy='general',
-                close_limit=self.options.close_limit, cache=acache,
-                ret_ref_coors=True, ret_status=True, ret_cells=True)
-
-            acache.ref_coors = ref_coors
-            acache.cells = cells
-            acache.status = status
+            self.get_actual_cache(pars, cache)
+            iop = self.get_interp_operator(variable, points, mode=mode)
 
             if self.is_refined:
                 break
 
             else:
-                refine_flag = self.refine_points(variable, points, cells)
+                refine_flag = self.refine_points(variable, points, iop.cells)
                 if (refine_flag == False).all():
                     break
 
         self.is_refined = True
 
+        return pars, points, iop
+
+    def get_interp_operator(self, variable, points, mode='val'):
+        """
+        Get the interpolation operator of the variable field in the probe
+        points. The operator is cached in the actual evaluate cache, that has
+        to correspond to `points`, see :func:`Probe.get_actual_cache()`.
+        """
+        field = variable.field
+        acache = self.acache
+
+        key = (field.name, mode)
+        iop = acache.operators.get(key)
+        if (iop is None) or (iop.field is not field):
+            iop = variable.create_interp_operator(
+                points, mode=mode, strategy='general',
+                close_limit=self.options.close_limit, cache=acache)
+            acache.operators[key] = iop
+
+        acache.ref_coors = iop.ref_coors
+        acache.cells = iop.cells
+        acache.status = iop.status
+
+        return iop
+
+    def probe(self, variable, mode='val', ret_points=False):
+        """
+        Probe the given variable.
+
+        Parameters
+        ----------
+        variable : Variable instance
+            The variable to be sampled along the probe.
+        mode : {'val', 'grad'}, optional
+            The evaluation mode: the variable value (default) or the
+            variable value gradient.
+        ret_points : bool
+            If True, return also the probe points.
+
+        Returns
+        -------
+        pars : array
+            The parametrization of the probe points.
+        points : array, optional
+            If `ret_points` is True, the coordinates of points corresponding to
+            `pars`, where the `variable` is evaluated.
+        vals : array
+            The probed values.
+        """
+        pars, points, iop = self.locate(variable, mode=mode)
+        vals = iop(variable(), set_nan=False)
+
         if ret_points:
             return pars, points, vals
 
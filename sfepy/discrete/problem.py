@@ -182,7 +182,15 @@ class Problem(Struct):
 
     @staticmethod
     def from_conf(conf, init_fields=True, init_equations=True,
-                  init_solvers=True):
+                  init_solvers=True, domain=None):
+        """
+        Create a Problem instance from a problem configuration.
+
+        If `domain` is given, it is used instead of the domain created from
+        the `filename_mesh` or `filename_domain` items of `conf`. It has to
+        correspond to those items, as it is not checked. The domain regions
+        are redefined.
+        """
         if conf.options.get('absolute_mesh_path', False):
             conf_dir = None
         else:
@@ -193,8 +201,12 @@ class Problem(Struct):
         if conf.get('filename_mesh') is not None:
             from sfepy.discrete.fem.domain import FEDomain
 
-            mesh = Mesh.from_file(conf.filename_mesh, prefix_dir=conf_dir)
-            domain = FEDomain(mesh.name, mesh)
+            if domain is None:
+                mesh = Mesh.from_file(conf.filename_mesh, prefix_dir=conf_dir)
+                order = conf.options.get('mesh_renumbering')
+                if order is not None:
+                    mesh = mesh.create_renumbered(order)
+                domain = FEDomain(mesh.name, mesh)
 
             refine = conf.options.get('refinement_level', 0)
             if refine > 0:
@@ -214,8 +226,9 @@ class Problem(Struct):
                 per.set_accuracy(conf.options.mesh_eps)
 
         elif conf.get('filename_domain') is not None:
-            from sfepy.discrete.iga.domain import IGDomain
-            domain = IGDomain.from_file(conf.filename_domain)
+            if domain is None:
+                from sfepy.discrete.iga.domain import IGDomain
+                domain = IGDomain.from_file(conf.filename_domain)
 
         else:
             raise ValueError('missing filename_mesh or filename_domain!')
@@ -476,6 +489,42 @@ class Problem(Struct):
     def set_fields(self, conf_fields=None):
         conf_fields = get_default(conf_fields, self.conf.fields)
         self.fields = fields_from_conf(conf_fields, self.domain.regions)
+        self.set_mappings_cache()
+
+        order = self.conf.options.get('dof_renumbering')
+        if order is not None:
+            for field in six.itervalues(self.fields):
+                field.set_dof_order(order)
+
+    def set_mappings_cache(self, dirname=None, max_size=None):
+        """
+        Set the persistent disk cache of the reference mappings of all
+        fields, so that the mappings are computed only once for a given mesh,
+        field approximation and integral, and then reused by subsequent runs.
+
+        Parameters
+        ----------
+        dirname : str, optional
+            The cache directory. If not given, the 'mappings_cache_dir'
+            option is used. If that is not set either, nothing is done.
+        max_size : float, optional
+            The maximum cache size in MB. If not given, the
+            'mappings_cache_size' option is used.
+        """
+        from sfepy.base.disk_cache import DiskCache
+
+        options = self.conf.options
+        if dirname is None:
+            dirname = options.get('mappings_cache_dir', None)
+            if dirname is None:
+                return
+
+        if max_size is None:
+            max_size = options.get('mappings_cache_size', None)
+
+        cache = DiskCache(dirname, max_size=max_size)
+        for field in six.itervalues(self.fields):
+            field.set_mappings_cache(cache)
 
     def set_variables(self, conf_variables=None):
         """
@@ -621,7 +670,8 @@ class Problem(Struct):
             If True, force the matrix graph computation.
         is_matrix : bool
             If False, the matrix is not created. Has precedence over
-            `create_matrix`.
+            `create_matrix`. The matrix is never created in the matrix-free
+            mode, see the 'matrix_free' option.
         """
         self.update_time_stepper(ts)
         functions = get_default(functions, self.functions)
@@ -635,6 +685,9 @@ class Problem(Struct):
                                        verbose=self.conf.get('verbose', True))
         self.graph_changed = graph_changed
 
+        if self.conf.options.get('matrix_free') is not None:
+            is_matrix = False
+
         if (is_matrix
             and ((self.active_only and graph_changed)
                  or (self.mtx_a is None) or create_matrix)):
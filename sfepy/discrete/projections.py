@@ -2,15 +2,15 @@
 Construct projections between FE spaces.
 """
 from __future__ import absolute_import
+import warnings
+
 import numpy as nm
+import scipy.sparse as sps
 
-from sfepy.base.base import output, IndexedStruct
-from sfepy.discrete import (FieldVariable, Integral,
-                            Equation, Equations, Material)
-from sfepy.discrete import Problem
+from sfepy.base.base import get_default, Struct
+from sfepy.discrete import FieldVariable, Integral, Equation, Equations
 from sfepy.terms import Term
 from sfepy.solvers.ls import ScipyDirect
-from sfepy.solvers.nls import Newton
 from six.moves import range
 
 def create_mass_matrix(field):
@@ -22,11 +22,35 @@ def create_mass_matrix(field):
     mtx : csr_matrix
         The mass matrix in CSR format.
     """
+    integral = Integral('i', order=field.approx_order * 2)
+
+    return create_projection_matrix(field, integral, kind='l2')
+
+def create_projection_matrix(field, integral, kind='l2'):
+    """
+    Create scalar :math:`L^2` (mass) or :math:`H^1` (mass + laplace) matrix
+    corresponding to the given field and integral.
+
+    Returns
+    -------
+    mtx : csr_matrix
+        The matrix in CSR format.
+    """
+    return _assemble_projection_matrix(field, integral, kind=kind)[0]
+
+def _assemble_projection_matrix(field, integral, kind='l2'):
+    """
+    Return the projection matrix and the field DOFs in the order of its rows.
+    The unused DOFs of fields with substituted DOFs are not included.
+    """
     u = FieldVariable('u', 'unknown', field)
     v = FieldVariable('v', 'test', field, primary_var_name='u')
 
-    integral = Integral('i', order=field.approx_order * 2)
     term = Term.new('dw_volume_dot(v, u)', integral, field.region, v=v, u=u)
+    if kind == 'h1':
+        term = term + Term.new('dw_laplace(v, u)', integral, field.region,
+                               v=v, u=u)
+
     eq = Equation('aux', term)
     eqs = Equations([eq])
     eqs.time_update(None)
@@ -36,19 +60,229 @@ def create_mass_matrix(field):
     mtx = eqs.create_matrix_graph()
     mtx = eqs.eval_tangent_matrices(dummy, mtx)
 
-    return mtx
+    return mtx, u.eq_map.eqi
+
+class Projector(Struct):
+    """
+    Projector of scalar data given in quadrature points to a scalar field
+    using the :math:`L^2` or :math:`H^1` dot product.
+
+    The projection matrix is assembled and factorized once, so that repeated
+    projections to the same field, e.g. after each time step, cost only the
+    right-hand side assembly and the back substitution. Several data
+    components or quantities can be projected at once.
+
+    Use :func:`get_projector()` to get a projector cached in the field.
+
+    Parameters
+    ----------
+    field : Field instance
+        The target scalar field.
+    order : int, optional
+        The quadrature order. If not given, it is set to
+        `2 * field.approx_order`.
+    kind : 'l2' or 'h1'
+        The projection kind.
+    lumped : bool
+        If True, the row-sum lumped mass matrix is used instead of the
+        consistent one. Only for the 'l2' kind and fields whose lumped mass
+        matrix is positive, e.g. the linear ones.
+    ls : LinearSolver instance, optional
+        The linear solver. If not given, :class:`ScipyDirect
+        <sfepy.solvers.ls.ScipyDirect>` with the matrix pre-factorization is
+        used.
+    """
+
+    def __init__(self, field, order=None, kind='l2', lumped=False, ls=None):
+        from sfepy.discrete.common.mappings import get_physical_qps
+
+        if kind not in ('l2', 'h1'):
+            raise ValueError('unknown projection kind! (%s)' % kind)
+
+        if lumped and (kind != 'l2'):
+            raise ValueError('lumped matrix can be used with "l2" kind only!')
+
+        order = get_default(order, 2 * field.approx_order)
+        integral = Integral('i', order=order)
+
+        mtx, eqi = _assemble_projection_matrix(field, integral, kind=kind)
+        if lumped:
+            diag = nm.asarray(mtx.sum(axis=1)).ravel()
+            ls = None
+
+        else:
+            diag = None
+            if ls is None:
+                ls = ScipyDirect({'use_presolve' : True})
+
+            if hasattr(ls, 'presolve'):
+                ls.presolve(mtx)
+
+        Struct.__init__(self, name='projector', field=field, order=order,
+                        integral=integral, kind=kind, lumped=lumped,
+                        mtx=mtx, diag=diag, ls=ls, eqi=eqi)
+
+        # The operators mapping data in quadrature points to the right-hand
+        # side.
+        geo, _ = field.get_mapping(field.region, integral, 'volume')
+        econn = field.get_econn('volume', field.region)
+        self.econn = econn
+
+        n_cell, n_qp, dim, n_ep = geo.bfg.shape
+        self.n_cell, self.n_qp, self.dim = n_cell, n_qp, dim
+
+        vals = geo.bf[..., 0, :] * geo.det[..., 0]
+        rows = nm.broadcast_to(econn[:, None, :], (n_cell, n_qp, n_ep))
+        cols = nm.broadcast_to(nm.arange(n_cell * n_qp)[:, None],
+                               (n_cell * n_qp, n_ep))
+        self.mtx_val = sps.coo_matrix((nm.broadcast_to(vals, rows.shape)
+                                       .ravel(),
+                                       (rows.ravel(), cols.ravel())),
+                                      shape=(field.n_nod,
+                                             n_cell * n_qp)).tocsr()[eqi]
+
+        if kind == 'h1':
+            vals = geo.bfg * geo.det
+            rows = nm.broadcast_to(econn[:, None, None, :], vals.shape)
+            cols = nm.broadcast_to(nm.arange(n_cell * n_qp * dim)[:, None],
+                                   (n_cell * n_qp * dim, n_ep))
+            self.mtx_grad = sps.coo_matrix((vals.ravel(),
+                                            (rows.ravel(), cols.ravel())),
+                                           shape=(field.n_nod,
+                                                  n_cell * n_qp * dim))
+            self.mtx_grad = self.mtx_grad.tocsr()[eqi]
+
+        else:
+            self.mtx_grad = None
+
+        self.qps = get_physical_qps(field.region, integral)
+
+    def eval_data(self, eval_data, mode='val'):
+        """
+        Evaluate a material-like function `eval_data(ts, coors, mode,
+        **kwargs)` in the quadrature points. For the 'h1' kind, the function
+        is called with an additional argument `mode` ('val' or 'grad') after
+        the `mode` argument, as in :func:`make_h1_projection_data()`.
+        """
+        if self.kind == 'h1':
+            return eval_data(None, self.qps.values, 'qp', mode)
+
+        else:
+            return eval_data(None, self.qps.values, 'qp')
+
+    def project(self, data, gdata=None):
+        """
+        Project the data given in quadrature points.
+
+        Parameters
+        ----------
+        data : array or callable
+            The values in quadrature points, reshapable to `(n_cell * n_qp,
+            n_c)`, where `n_c` is the number of projected components, e.g.
+            an array of shape `(n_cell, n_qp, n_c, 1)` as returned by
+            evaluating a term in the 'qp' mode. Alternatively, a
+            material-like function, see :func:`Projector.eval_data()`.
+        gdata : array, optional
+            The gradient values in quadrature points for the 'h1' kind,
+            reshapable to `(n_cell * n_qp * dim, n_c)`. If not given and
+            `data` is callable, it is evaluated by `data()`.
+
+        Returns
+        -------
+        out : array
+            The projected DOF values of shape `(n_nod, n_c)`.
+        """
+        n_qp = self.n_cell * self.n_qp
+        if callable(data):
+            if (self.kind == 'h1') and (gdata is None):
+                gdata = self.eval_data(data, mode='grad')
+            data = self.eval_data(data, mode='val')
+
+        data = nm.asarray(data)
+        rhs = self.mtx_val * data.reshape((n_qp, -1))
+
+        if self.kind == 'h1':
+            if gdata is None:
+                raise ValueError('gradient data required for "h1" kind!')
+
+            gdata = nm.asarray(gdata)
+            rhs += self.mtx_grad * gdata.reshape((n_qp * self.dim, -1))
+
+        if self.lumped:
+            sol = rhs / self.diag[:, None]
+
+        else:
+            sol = self.ls(rhs, mtx=self.mtx).reshape(rhs.shape)
+
+        out = nm.zeros((self.field.n_nod, rhs.shape[1]), dtype=sol.dtype)
+        out[self.eqi] = sol
+
+        if self.field.get('unused_dofs') is not None:
+            out = nm.column_stack([self.field.restore_substituted(out[:, ic])
+                                   for ic in range(out.shape[1])])
+
+        return out
+
+    def __call__(self, target, data, gdata=None):
+        """
+        Project the data given in quadrature points, see
+        :func:`Projector.project()`, and set the result to the `target`
+        variable. The `target` field has to have the same nodes as the
+        projector field and `n_c` components.
+        """
+        out = self.project(data, gdata=gdata)
+        target.set_data(out.ravel())
+
+def get_projector(field, order=None, kind='l2', lumped=False):
+    """
+    Get a :class:`Projector` instance cached in `field` for the given
+    quadrature order and projection kind. The cache is cleared together with
+    the reference mappings of the field, and a cached projector is rebuilt
+    when the field DOFs were substituted or restored.
+    """
+    order = get_default(order, 2 * field.approx_order)
+
+    projectors = getattr(field, 'projectors', None)
+    if projectors is None:
+        projectors = field.projectors = {}
+
+    key = (order, kind, lumped)
+    projector = projectors.get(key)
+    if ((projector is None)
+        or (projector.econn is not field.get_econn('volume', field.region))):
+        # The field DOFs were substituted or restored meanwhile.
+        projector = Projector(field, order=order, kind=kind, lumped=lumped)
+        projectors[key] = projector
+
+    return projector
+
+def _warn_nls_options(nls_options):
+    if nls_options is not None:
+        warnings.warn('the nls_options argument is deprecated and ignored:'
+                      ' the projections are linear and do not use'
+                      ' a nonlinear solver', DeprecationWarning, stacklevel=3)
 
 def project_by_component(tensor, tensor_qp, component, order,
                          ls=None, nls_options=None):
     """
-    Wrapper around make_l2_projection_data() for non-scalar fields.
+    Project non-scalar data to a non-scalar `tensor` field variable
+    component-wise using the :math:`L^2` dot product. The scalar field of the
+    `component` variable is used to project all components at once.
+
+    The projector of the scalar field is cached, unless the linear solver
+    `ls` is given. The `nls_options` argument is deprecated and ignored.
     """
-    aux = []
-    for ic in range(tensor_qp.shape[-2]):
-        make_l2_projection_data(component, tensor_qp[..., ic, :].copy(),
-                                order=order, ls=ls, nls_options=nls_options)
-        aux.append(component())
-    tensor.set_data(nm.array(aux).T.ravel())
+    _warn_nls_options(nls_options)
+
+    if ls is None:
+        projector = get_projector(component.field, order=order)
+
+    else:
+        projector = Projector(component.field, order=order, ls=ls)
+
+    out = projector.project(tensor_qp[..., 0])
+    component.set_data(out[:, -1])
+    tensor.set_data(out.ravel())
 
 def make_l2_projection(target, source, ls=None, nls_options=None):
     """
@@ -69,6 +303,10 @@ def make_l2_projection_data(target, eval_data, order=None,
     Project scalar data to a scalar `target` field variable using the
     :math:`L^2` dot product.
 
+    The projector of the target field is cached, see :func:`get_projector()`,
+    unless the linear solver `ls` is given. The `nls_options` argument is
+    deprecated and ignored.
+
     Parameters
     ----------
     target : FieldVariable instance
@@ -81,94 +319,22 @@ def make_l2_projection_data(target, eval_data, order=None,
         The quadrature order. If not given, it is set to
         `2 * target.field.approx_order`.
     """
-    if order is None:
-       order = 2 * target.field.approx_order
-    integral = Integral('i', order=order)
-
-    un = FieldVariable('u', 'unknown', target.field)
-
-    v = FieldVariable('v', 'test', un.field, primary_var_name=un.name)
-    lhs = Term.new('dw_volume_dot(v, %s)' % un.name, integral,
-                   un.field.region, v=v, **{un.name : un})
-
-    def _eval_data(ts, coors, mode, **kwargs):
-        if mode == 'qp':
-            if callable(eval_data):
-                val = eval_data(ts, coors, mode, **kwargs)
-
-            else:
-                val = eval_data.reshape((coors.shape[0], 1, 1))
-
-            return {'val' : val}
-
-    m = Material('m', function=_eval_data)
-    rhs = Term.new('dw_volume_lvf(m.val, v)', integral, un.field.region,
-                   m=m, v=v)
-
-    eq = Equation('projection', lhs - rhs)
-    eqs = Equations([eq])
+    _warn_nls_options(nls_options)
 
     if ls is None:
-        ls = ScipyDirect({})
-
-    if nls_options is None:
-        nls_options = {}
-
-    nls_status = IndexedStruct()
-    nls = Newton(nls_options, lin_solver=ls, status=nls_status)
-
-    pb = Problem('aux', equations=eqs)
-    pb.set_solver(nls)
-
-    # This sets the un variable with the projection solution.
-    pb.solve(save_results=False)
+        projector = get_projector(target.field, order=order)
 
-    # Copy the projection solution to target.
-    target.set_data(un())
+    else:
+        projector = Projector(target.field, order=order, ls=ls)
 
-    if nls_status.condition != 0:
-        output('L2 projection: solver did not converge!')
+    projector(target, eval_data)
 
 def make_h1_projection_data(target, eval_data):
     """
     Project scalar data given by a material-like `eval_data()` function to a
     scalar `target` field variable using the :math:`H^1` dot product.
-    """
-    order = target.field.approx_order * 2
-    integral = Integral('i', order=order)
-
-    un = target.name
-    v = FieldVariable('v', 'test', target.field, primary_var_name=un)
-    lhs1 = Term.new('dw_volume_dot(v, %s)' % un, integral,
-                    target.field.region, v=v, **{un : target})
-    lhs2 = Term.new('dw_laplace(v, %s)' % un, integral,
-                    target.field.region, v=v, **{un : target})
-
-    def _eval_data(ts, coors, mode, **kwargs):
-        if mode == 'qp':
-            val = eval_data(ts, coors, mode, 'val', **kwargs)
-            gval = eval_data(ts, coors, mode, 'grad', **kwargs)
-            return {'val' : val, 'gval' : gval}
-
-    m = Material('m', function=_eval_data)
-    rhs1 = Term.new('dw_volume_lvf(m.val, v)', integral, target.field.region,
-                    m=m, v=v)
-    rhs2 = Term.new('dw_diffusion_r(m.gval, v)', integral, target.field.region,
-                    m=m, v=v)
-
-    eq = Equation('projection', lhs1 + lhs2 - rhs1 - rhs2)
-    eqs = Equations([eq])
-
-    ls = ScipyDirect({})
-
-    nls_status = IndexedStruct()
-    nls = Newton({}, lin_solver=ls, status=nls_status)
 
-    pb = Problem('aux', equations=eqs)
-    pb.set_solver(nls)
-
-    # This sets the target variable with the projection solution.
-    pb.solve(save_results=False)
-
-    if nls_status.condition != 0:
-        output('H1 projection: solver did not converge!')
+    The projector of the target field is cached, see :func:`get_projector()`.
+    """
+    projector = get_projector(target.field, kind='h1')
+    projector(target, eval_data)
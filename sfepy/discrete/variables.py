@@ -434,6 +434,7 @@ class Variables(Container):
                                                problem=problem)
                 active_bcs.update(active)
 
+        self.active_only = active_only
         self.adi = DofInfo('active_state_dof_info')
         for var_name in self.ordered_state:
             self.adi.append_variable(self[var_name], active=active_only)
@@ -1220,6 +1221,7 @@ class FieldVariable(Variable):
         self.has_field = True
         self.has_bc = True
         self._variables = None
+        self.interp_operators = {}
 
         self.clear_evaluate_cache()
 
@@ -1871,6 +1873,24 @@ class FieldVariable(Variable):
 
         return out
 
+    def create_interp_operator(self, coors, mode='val', strategy='general',
+                               close_limit=0.1, get_cells_fun=None,
+                               cache=None, verbose=False):
+        """
+        Create a sparse operator interpolating the variable into the given
+        physical coordinates. Convenience wrapper around
+        :func:`Field.create_interp_operator()
+        <sfepy.discrete.common.fields.Field.create_interp_operator()>`, see
+        its docstring for more details.
+
+        The operator is applied to the variable by ``operator(var())``.
+        """
+        return self.field.create_interp_operator(coors, mode=mode,
+                                                 strategy=strategy,
+                                                 close_limit=close_limit,
+                                                 get_cells_fun=get_cells_fun,
+                                                 cache=cache, verbose=verbose)
+
     def set_from_other(self, other, strategy='projection', close_limit=0.1):
         """
         Set the variable using another variable. Undefined values (e.g. outside
@@ -1887,7 +1907,12 @@ class FieldVariable(Variable):
         -----
         If the other variable uses the same field mesh, the coefficients are
         set directly.
+
+        The interpolation operators are cached in `interp_operators` and
+        reused while the coordinates of both meshes do not change.
         """
+        import hashlib
+
         flag_same_mesh = self.has_same_mesh(other)
 
         if flag_same_mesh == 'same':
@@ -1905,10 +1930,22 @@ class FieldVariable(Variable):
         else:
             raise ValueError('unknown interpolation strategy! (%s)' % strategy)
 
-        vals = other.evaluate_at(coors, strategy='general',
-                                 close_limit=close_limit)
-
         if strategy == 'interpolation':
+            sha1 = hashlib.sha1()
+            sha1.update(nm.ascontiguousarray(coors).tobytes())
+            sha1.update(other.field.domain.cmesh.coors.tobytes())
+            digest = sha1.hexdigest()
+
+            key = (other.field.name, close_limit)
+            iop = self.interp_operators.get(key)
+            if ((iop is None) or (iop.field is not other.field)
+                or (iop.digest != digest)):
+                iop = other.create_interp_operator(coors, strategy='general',
+                                                   close_limit=close_limit)
+                iop.digest = digest
+                self.interp_operators[key] = iop
+
+            vals = iop(other())
             self.set_data(vals)
 
         elif strategy == 'projection':
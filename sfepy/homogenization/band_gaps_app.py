@@ -71,7 +71,7 @@ def plot_eigs(fig_num, plot_rsc, plot_labels, valid, freq_range, plot_range,
     resonances : red
     masked resonances: dotted red
     """
-    if plt is None: return
+    if not plt.is_available(): return
     assert_(len(valid) == len(freq_range))
 
     fig = plt.figure(fig_num)
@@ -109,7 +109,7 @@ def plot_logs(fig_num, plot_rsc, plot_labels,
     """
     Plot logs of min/middle/max eigs of a mass matrix.
     """
-    if plt is None: return
+    if not plt.is_available(): return
 
     fig = plt.figure(fig_num)
     if clear:
@@ -201,7 +201,7 @@ def plot_gaps(fig_num, plot_rsc, gaps, kinds, gap_ranges, freq_range,
     """
     Plot band gaps as rectangles.
     """
-    if plt is None: return
+    if not plt.is_available(): return
 
     fig = plt.figure(fig_num)
     if clear:
@@ -249,9 +249,34 @@ def _get_fig_name(output_dir, fig_name, key, common, fig_suffix):
     fig_name = fig_name + name + fig_suffix
     return op.join(output_dir, fig_name)
 
+def get_dependent_names(names, req_info, coef_info):
+    """
+    Get the names of the correctors and coefficients (with the 'c.' prefix)
+    that depend directly or indirectly on `names`, including `names`.
+    """
+    infos = list(six.iteritems(req_info))
+    infos += [('c.' + key, val) for key, val in six.iteritems(coef_info)]
+
+    dependent = set(names)
+    while 1:
+        new = set(name for name, info in infos
+                  if ((name not in dependent)
+                      and any(req in dependent
+                              for req in info.get('requires', []))))
+        if not new: break
+
+        dependent.update(new)
+
+    return dependent
+
 class AcousticBandGapsApp(HomogenizationApp):
     """
     Application for computing acoustic band gaps.
+
+    For the dispersion analysis, the `incident_wave_dir` option can be
+    either a single direction, or a list of directions. The `num_workers`
+    option gives the number of worker processes used to compute the
+    directions, or the band gaps frequency intervals of a single direction.
     """
 
     @staticmethod
@@ -321,6 +346,7 @@ class AcousticBandGapsApp(HomogenizationApp):
         plot_rsc = try_set_defaults(options, 'plot_rsc', plot_rsc)
 
         return Struct(incident_wave_dir=get('incident_wave_dir', None),
+                      num_workers=get('num_workers', 1),
 
                       plot_transform=get('plot_transform', None),
                       plot_transform_wave=get('plot_transform_wave', None),
@@ -349,7 +375,8 @@ class AcousticBandGapsApp(HomogenizationApp):
         incident_wave_dir=get('incident_wave_dir', None,
                               'missing "incident_wave_dir" in options!')
 
-        return Struct(incident_wave_dir=incident_wave_dir)
+        return Struct(incident_wave_dir=incident_wave_dir,
+                      num_workers=get('num_workers', 1))
 
     def __init__(self, conf, options, output_prefix, **kwargs):
         PDESolverApp.__init__(self, conf, options, output_prefix,
@@ -384,20 +411,21 @@ class AcousticBandGapsApp(HomogenizationApp):
                              'missing "%s" in problem description!'
                              % opts.coefs)
 
+        iw_keys = []
         if options.detect_band_gaps:
             # Compute band gaps coefficients and data.
             keys = [key for key in coef_info if key.startswith('band_gaps')]
 
         elif options.analyze_dispersion or options.phase_velocity:
 
-            # Insert incident wave direction to coefficients that need it.
+            # Find coefficients that need the incident wave direction.
             for key, val in six.iteritems(coef_info):
                 coef_opts = val.get('options', None)
                 if coef_opts is None: continue
 
                 if (('incident_wave_dir' in coef_opts)
                     and (coef_opts['incident_wave_dir'] is None)):
-                    coef_opts['incident_wave_dir'] = opts.incident_wave_dir
+                    iw_keys.append(key)
 
             if options.analyze_dispersion:
                 # Compute dispersion coefficients and data.
@@ -420,25 +448,34 @@ class AcousticBandGapsApp(HomogenizationApp):
             coefs_name = 'coefs_dummy'
             keys = ['dummy']
 
-        he_options = Struct(coefs=coefs_name, requirements=opts.requirements,
-                            compute_only=keys,
-                            post_process_hook=self.post_process_hook,
-                            multiprocessing=False)
+        iw_dir = opts.get('incident_wave_dir', None)
+        if (len(iw_keys) and (iw_dir is not None)
+            and (nm.asarray(iw_dir).ndim == 2)):
+            iw_dirs = nm.asarray(iw_dir, dtype=nm.float64)
 
-        volumes = {}
-        if hasattr(opts, 'volumes') and (opts.volumes is not None):
-            volumes.update(opts.volumes)
-        elif hasattr(opts, 'volume') and (opts.volume is not None):
-            volumes['total'] = opts.volume
         else:
-            volumes['total'] = 1.0
+            iw_dirs = [iw_dir]
 
-        he = HomogenizationEngine(self.problem, options,
-                                  app_options=he_options,
-                                  volumes=volumes)
-        coefs = he()
+        # The band gaps frequency intervals are processed in parallel, with
+        # several incident wave directions only in the first direction.
+        for key in keys:
+            if key.startswith('band_gaps') or key.startswith('dispersion'):
+                if coef_info[key].get('options', None) is None:
+                    coef_info[key]['options'] = {}
+
+                coef_opts = coef_info[key]['options']
+                if coef_opts.get('num_workers', None) is None:
+                    coef_opts['num_workers'] = opts.num_workers
 
-        coefs = Coefficients(**coefs.to_dict())
+        if len(iw_dirs) == 1:
+            for key in iw_keys:
+                coef_info[key]['options']['incident_wave_dir'] = iw_dirs[0]
+
+            coefs = self.compute_coefs(coefs_name, keys)
+
+        else:
+            coefs = self.compute_coefs_directions(coefs_name, keys, iw_keys,
+                                                  iw_dirs, opts.num_workers)
 
         coefs_filename = op.join(opts.output_dir, opts.coefs_filename)
         coefs.to_file_txt(coefs_filename + '.txt',
@@ -475,6 +512,185 @@ class AcousticBandGapsApp(HomogenizationApp):
 
         return coefs
 
+    def compute_coefs(self, coefs_name, keys, dependencies=None):
+        """
+        Construct and call the homogenization engine to compute the
+        coefficients `keys` of `coefs_name`. The already computed
+        `dependencies` are not computed again, see
+        :func:`HomogenizationEngine.call()
+        <sfepy.homogenization.engine.HomogenizationEngine.call()>`.
+        """
+        opts = self.app_options
+
+        he_options = Struct(coefs=coefs_name, requirements=opts.requirements,
+                            compute_only=keys,
+                            post_process_hook=self.post_process_hook,
+                            multiprocessing=False)
+
+        volumes = {}
+        if hasattr(opts, 'volumes') and (opts.volumes is not None):
+            volumes.update(opts.volumes)
+        elif hasattr(opts, 'volume') and (opts.volume is not None):
+            volumes['total'] = opts.volume
+        else:
+            volumes['total'] = 1.0
+
+        he = HomogenizationEngine(self.problem, self.options,
+                                  app_options=he_options,
+                                  volumes=volumes)
+        coefs = he(dependencies=dependencies)
+
+        return Coefficients(**coefs.to_dict())
+
+    def _compute_coefs_directions_multi(self, tasks, lock, remaining, results,
+                                        coefs_name, keys, iw_keys, iw_dirs,
+                                        iw_names, independent):
+        """
+        Compute the coefficients for the incident wave directions taken from
+        the `tasks` queue - called in a worker process.
+
+        Only the coefficients depending on the direction are returned, the
+        other ones need not be picklable.
+        """
+        coef_info = getattr(self.problem.conf, coefs_name)
+        for key in keys:
+            coef_opts = coef_info[key].get('options')
+            if coef_opts is not None and ('num_workers' in coef_opts):
+                coef_opts['num_workers'] = 1
+
+        n_dir = len(iw_dirs)
+        output_fun = output.output_function
+        while remaining.value > 0:
+            idir = tasks.get()
+            if idir is None:
+                continue
+
+            for key in iw_keys:
+                coef_info[key]['options']['incident_wave_dir'] = iw_dirs[idir]
+
+            output.set_output(quiet=True)
+            coefs = self.compute_coefs(coefs_name, keys,
+                                       dependencies=independent.copy())
+            output.output_function = output_fun
+
+            lock.acquire()
+            results[idir] = {key : val
+                             for key, val in six.iteritems(coefs.to_dict())
+                             if ('c.' + key) in iw_names}
+            remaining.value -= 1
+            output('incident wave direction %d/%d: %s done'
+                   % (n_dir - remaining.value, n_dir, iw_dirs[idir]))
+            lock.release()
+
+    def compute_coefs_directions(self, coefs_name, keys, iw_keys, iw_dirs,
+                                 num_workers=1):
+        """
+        Compute the coefficients `keys` of `coefs_name` for each incident wave
+        direction in `iw_dirs`.
+
+        The correctors and coefficients that do not depend on the coefficients
+        `iw_keys` using the incident wave direction are computed only once,
+        together with the first direction. The remaining directions are
+        independent - if `num_workers` is greater than one, they are
+        distributed over that many worker processes using
+        :mod:`sfepy.base.multiproc`. The workers share the precomputed
+        direction-independent dependencies and detect the band gaps
+        frequency intervals serially. The results are the same as in the
+        serial run.
+
+        Returns
+        -------
+        coefs : Coefficients instance
+            The coefficients, with the names suffixed by '_<direction index>'.
+            The log file names of the band gaps are suffixed in the same way.
+        """
+        conf = self.problem.conf
+        coef_info = getattr(conf, coefs_name)
+        req_info = getattr(conf, self.app_options.requirements, {})
+        iw_names = get_dependent_names(['c.' + key for key in iw_keys],
+                                       req_info, coef_info)
+
+        n_dir = len(iw_dirs)
+        num_workers = min(num_workers, n_dir - 1)
+        if num_workers > 1:
+            import sfepy.base.multiproc as multi
+
+            multiproc, mode = multi.get_multiproc()
+            if mode != 'proc':
+                output('multiprocessing not available,'
+                       ' using serial computation!')
+                num_workers = 1
+
+        independent = None
+        results = []
+        for idir, iw_dir in enumerate(iw_dirs):
+            if (idir > 0) and (num_workers > 1):
+                break
+
+            output('incident wave direction %d/%d: %s...'
+                   % (idir + 1, n_dir, iw_dir))
+            for key in iw_keys:
+                coef_info[key]['options']['incident_wave_dir'] = iw_dir
+
+            dependencies = {} if independent is None else independent.copy()
+            coefs = self.compute_coefs(coefs_name, keys,
+                                       dependencies=dependencies)
+            if independent is None:
+                independent = {name : val
+                               for name, val in six.iteritems(dependencies)
+                               if name not in iw_names}
+
+            results.append(coefs.to_dict())
+            output('...done')
+
+        if num_workers > 1:
+            output('computing %d incident wave directions using %d workers...'
+                   % (n_dir - 1, num_workers))
+            tasks = multiproc.get_queue('iw_tasks')
+            lock = multiproc.get_lock('iw_lock')
+            remaining = multiproc.get_int_value('iw_remaining', n_dir - 1)
+            mresults = multiproc.get_dict('iw_results', clear=True)
+
+            for idir in range(1, n_dir):
+                tasks.put(idir)
+
+            # The workers are forked, so that the precomputed dependencies
+            # need not be pickled.
+            workers = []
+            for ii in range(num_workers):
+                args = (tasks, lock, remaining, mresults, coefs_name, keys,
+                        iw_keys, iw_dirs, iw_names, independent)
+                worker = multiproc.Process(
+                    target=self._compute_coefs_directions_multi, args=args)
+                worker.start()
+                workers.append(worker)
+
+            # Block until all workers are terminated.
+            for worker in workers:
+                worker.join()
+            output('...done')
+
+            for idir in range(1, n_dir):
+                coefs = {key : val for key, val in six.iteritems(results[0])
+                         if ('c.' + key) not in iw_names}
+                coefs.update(mresults[idir])
+                results.append(coefs)
+
+        out = {}
+        for idir, coefs in enumerate(results):
+            suffix = '_%d' % idir
+            for key, val in six.iteritems(coefs):
+                if isinstance(val, Struct):
+                    for name in ['log_save_name', 'raw_log_save_name']:
+                        filename = val.get(name, None)
+                        if filename is not None:
+                            base, ext = op.splitext(filename)
+                            setattr(val, name, base + suffix + ext)
+
+                out[key + suffix] = val
+
+        return Coefficients(**out)
+
     def plot_band_gaps(self, coefs):
         opts = self.app_options
 
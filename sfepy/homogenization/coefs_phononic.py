@@ -141,138 +141,281 @@ def get_log_freqs(f0, f1, df, freq_eps, n_point_min, n_point_max):
 
     return log_freqs
 
-def detect_band_gaps(mass, freq_info, opts, gap_kind='normal', mtx_b=None):
-    """
-    Detect band gaps given solution to eigenproblem (eigs,
-    eig_vectors). Only valid resonance frequencies (e.i. those for which
-    corresponding eigenmomenta are above a given threshold) are taken into
-    account.
-
-    Notes
-    -----
-    - make freq_eps relative to ]f0, f1[ size?
+def detect_interval_gap(f0, f1, df, opts, callbacks, gap_kind='normal',
+                        n_col=1, verbose=True):
     """
-    output('eigensolver:', opts.eigensolver)
-
-    fm = freq_info.freq_range_margins
-    min_freq, max_freq = fm[0], fm[-1]
-    output('freq. range with margins: [%8.3f, %8.3f]'
-           % (min_freq, max_freq))
+    Detect band gaps in a single frequency interval ]`f0`, `f1`[, see
+    :func:`detect_band_gaps()`.
 
-    df = opts.freq_step * (max_freq - min_freq)
+    Parameters
+    ----------
+    f0, f1 : float
+        The interval bounds.
+    df : float
+        The frequency step for tracing.
+    opts : Struct
+        The band gaps options.
+    callbacks : tuple
+        The find zero, trace and batch (or None) callbacks.
+    gap_kind : 'normal' or 'liquid'
+        The kind of band gaps.
+    n_col : int
+        The number of logged items per frequency.
+    verbose : bool
+        If False, no messages are printed.
 
-    fz_callback = get_callback(mass.evaluate, opts.eigensolver,
-                               mtx_b=mtx_b, mode='find_zero')
-    trace_callback = get_callback(mass.evaluate, opts.eigensolver,
-                                  mtx_b=mtx_b, mode='trace')
+    Returns
+    -------
+    gap : tuple or list
+        The band gap of the interval, or a list of subgaps for the 'liquid'
+        gap kind.
+    log_freqs : array
+        The logged frequencies.
+    log_mevp : list
+        The logged eigenvalues (and eigenvectors) for each frequency.
+    """
+    fz_callback, trace_callback, batch_callback = callbacks
 
-    n_col = 1 + (mtx_b is not None)
-    logs = [[] for ii in range(n_col + 1)]
-    gaps = []
+    output('interval: ]%.8f, %.8f[...' % (f0, f1), verbose=verbose)
 
-    for ii in range(freq_info.freq_range.shape[0] + 1):
+    log_freqs = get_log_freqs(f0, f1, df, opts.freq_eps, 100, 1000)
 
-        f0, f1 = fm[[ii, ii+1]]
-        output('interval: ]%.8f, %.8f[...' % (f0, f1))
+    output('n_logged: %d' % log_freqs.shape[0], verbose=verbose)
 
-        log_freqs = get_log_freqs(f0, f1, df, opts.freq_eps, 100, 1000)
-
-        output('n_logged: %d' % log_freqs.shape[0])
+    if batch_callback is not None:
+        log_mevp = [list(data) for data in batch_callback(log_freqs)]
 
+    else:
         log_mevp = [[] for ii in range(n_col)]
         for f in log_freqs:
             for ii, data in enumerate(trace_callback(f)):
                 log_mevp[ii].append(data)
 
-        # Get log for the first and last f in log_freqs.
-        lf0 = log_freqs[0]
-        lf1 = log_freqs[-1]
+    # Get log for the first and last f in log_freqs.
+    lf0 = log_freqs[0]
+    lf1 = log_freqs[-1]
 
-        log0, log1 = log_mevp[0][0], log_mevp[0][-1]
-        min_eig0 = log0[0]
-        max_eig1 = log1[-1]
-        if gap_kind == 'liquid':
-            mevp = nm.array(log_mevp, dtype=nm.float64).squeeze()
-            si = nm.where(mevp[:,0] < 0.0)[0]
-            li = nm.where(mevp[:,-1] < 0.0)[0]
-            wi = nm.setdiff1d(si, li)
+    log0, log1 = log_mevp[0][0], log_mevp[0][-1]
+    min_eig0 = log0[0]
+    max_eig1 = log1[-1]
+    if gap_kind == 'liquid':
+        mevp = nm.array(log_mevp, dtype=nm.float64).squeeze()
+        si = nm.where(mevp[:,0] < 0.0)[0]
+        li = nm.where(mevp[:,-1] < 0.0)[0]
+        wi = nm.setdiff1d(si, li)
 
-            if si.shape[0] == 0: # No gaps.
-                gap = ([2, lf0, log0[0]], [2, lf0, log0[-1]])
-                gaps.append(gap)
+        if si.shape[0] == 0: # No gaps.
+            gap = ([2, lf0, log0[0]], [2, lf0, log0[-1]])
 
-            elif li.shape[0] == mevp.shape[0]: # Full interval strong gap.
-                gap = ([1, lf1, log1[0]], [1, lf1, log1[-1]])
-                gaps.append(gap)
+        elif li.shape[0] == mevp.shape[0]: # Full interval strong gap.
+            gap = ([1, lf1, log1[0]], [1, lf1, log1[-1]])
 
-            else:
-                subgaps = []
-                for chunk in split_chunks(li): # Strong gaps.
-                    i0, i1 = chunk[0], chunk[-1]
-                    fmin, fmax = log_freqs[i0], log_freqs[i1]
-                    gap = ([1, fmin, mevp[i0,-1]], [1, fmax, mevp[i1,-1]])
-                    subgaps.append(gap)
-
-                for chunk in split_chunks(wi): # Weak gaps.
-                    i0, i1 = chunk[0], chunk[-1]
-                    fmin, fmax = log_freqs[i0], log_freqs[i1]
-                    gap = ([0, fmin, mevp[i0,-1]], [2, fmax, mevp[i1,-1]])
-                    subgaps.append(gap)
-                gaps.append(subgaps)
+        else:
+            gap = []
+            for chunk in split_chunks(li): # Strong gaps.
+                i0, i1 = chunk[0], chunk[-1]
+                fmin, fmax = log_freqs[i0], log_freqs[i1]
+                gap.append(([1, fmin, mevp[i0,-1]], [1, fmax, mevp[i1,-1]]))
+
+            for chunk in split_chunks(wi): # Weak gaps.
+                i0, i1 = chunk[0], chunk[-1]
+                fmin, fmax = log_freqs[i0], log_freqs[i1]
+                gap.append(([0, fmin, mevp[i0,-1]], [2, fmax, mevp[i1,-1]]))
+
+    else:
+        if min_eig0 > 0.0: # No gaps.
+            gap = ([2, lf0, log0[0]], [2, lf0, log0[-1]])
+
+        elif max_eig1 < 0.0: # Full interval strong gap.
+            gap = ([1, lf1, log1[0]], [1, lf1, log1[-1]])
 
         else:
-            if min_eig0 > 0.0: # No gaps.
-                gap = ([2, lf0, log0[0]], [2, lf0, log0[-1]])
+            llog_freqs = list(log_freqs)
+
+            # Insert fmin, fmax into log.
+            output('finding zero of the largest eig...', verbose=verbose)
+            bracket = get_zero_bracket(log_freqs, log_mevp[0], 1)
+            smax, fmax, vmax = find_zero(lf0, lf1, fz_callback,
+                                         opts.freq_eps, opts.zero_eps, 1,
+                                         bracket=bracket)
+            im = nm.searchsorted(log_freqs, fmax)
+            llog_freqs.insert(im, fmax)
+            for ii, data in enumerate(trace_callback(fmax)):
+                log_mevp[ii].insert(im, data)
+
+            output('...done', verbose=verbose)
+            if smax in [0, 2]:
+                output('finding zero of the smallest eig...', verbose=verbose)
+                # having fmax instead of f0 does not work if freq_eps is
+                # large.
+                bracket = get_zero_bracket(llog_freqs, log_mevp[0], 0)
+                smin, fmin, vmin = find_zero(lf0, lf1, fz_callback,
+                                             opts.freq_eps, opts.zero_eps, 0,
+                                             bracket=bracket)
+                im = nm.searchsorted(log_freqs, fmin)
+                # +1 due to fmax already inserted before.
+                llog_freqs.insert(im+1, fmin)
+                for ii, data in enumerate(trace_callback(fmin)):
+                    log_mevp[ii].insert(im+1, data)
+
+                output('...done', verbose=verbose)
+
+            elif smax == 1:
+                smin = 1 # both are negative everywhere.
+                fmin, vmin = fmax, vmax
+
+            gap = ([smin, fmin, vmin], [smax, fmax, vmax])
+
+            log_freqs = nm.array(llog_freqs)
+
+        output(gap[0], verbose=verbose)
+        output(gap[1], verbose=verbose)
+
+    output('...done', verbose=verbose)
+
+    return gap, log_freqs, log_mevp
+
+def get_callbacks(mass, method, mtx_b=None, batch=True):
+    """
+    Return the find zero, trace and batch (or None) callbacks of
+    :func:`detect_interval_gap()`, see :func:`get_callback()` and
+    :func:`get_batch_callback()`.
+    """
+    fz_callback = get_callback(mass.evaluate, method,
+                               mtx_b=mtx_b, mode='find_zero')
+    trace_callback = get_callback(mass.evaluate, method,
+                                  mtx_b=mtx_b, mode='trace')
+    if batch:
+        batch_callback = get_batch_callback(mass.evaluate, method,
+                                            mtx_b=mtx_b)
 
-            elif max_eig1 < 0.0: # Full interval strong gap.
-                gap = ([1, lf1, log1[0]], [1, lf1, log1[-1]])
+    else:
+        batch_callback = None
 
-            else:
-                llog_freqs = list(log_freqs)
+    return fz_callback, trace_callback, batch_callback
 
-                # Insert fmin, fmax into log.
-                output('finding zero of the largest eig...')
-                smax, fmax, vmax = find_zero(lf0, lf1, fz_callback,
-                                             opts.freq_eps, opts.zero_eps, 1)
-                im = nm.searchsorted(log_freqs, fmax)
-                llog_freqs.insert(im, fmax)
-                for ii, data in enumerate(trace_callback(fmax)):
-                    log_mevp[ii].insert(im, data)
+def _detect_interval_gaps_multi(tasks, lock, remaining, results, n_interval,
+                                fm, df, opts, mass, mtx_b, gap_kind, n_col):
+    """
+    Detect band gaps in the frequency intervals taken from the `tasks` queue
+    - called in a worker process.
 
-                output('...done')
-                if smax in [0, 2]:
-                    output('finding zero of the smallest eig...')
-                    # having fmax instead of f0 does not work if freq_eps is
-                    # large.
-                    smin, fmin, vmin = find_zero(lf0, lf1, fz_callback,
-                                                 opts.freq_eps, opts.zero_eps, 0)
-                    im = nm.searchsorted(log_freqs, fmin)
-                    # +1 due to fmax already inserted before.
-                    llog_freqs.insert(im+1, fmin)
-                    for ii, data in enumerate(trace_callback(fmin)):
-                        log_mevp[ii].insert(im+1, data)
+    The callbacks are created here from `mass` and `mtx_b`, so that only
+    picklable arguments are passed to the worker.
+    """
+    callbacks = get_callbacks(mass, opts.eigensolver, mtx_b=mtx_b,
+                              batch=opts.get('batch', True))
+    while remaining.value > 0:
+        ii = tasks.get()
+        if ii is None:
+            continue
 
-                    output('...done')
+        f0, f1 = fm[[ii, ii+1]]
+        gap, log_freqs, log_mevp = detect_interval_gap(f0, f1, df, opts,
+                                                       callbacks,
+                                                       gap_kind=gap_kind,
+                                                       n_col=n_col,
+                                                       verbose=False)
+        log_mevp = [nm.array(data, dtype=nm.float64) for data in log_mevp]
+
+        lock.acquire()
+        results[ii] = (gap, log_freqs, log_mevp)
+        remaining.value -= 1
+        output('interval %d/%d: ]%.8f, %.8f[ done'
+               % (n_interval - remaining.value, n_interval, f0, f1))
+        lock.release()
 
-                elif smax == 1:
-                    smin = 1 # both are negative everywhere.
-                    fmin, vmin = fmax, vmax
+def detect_band_gaps(mass, freq_info, opts, gap_kind='normal', mtx_b=None):
+    """
+    Detect band gaps given solution to eigenproblem (eigs,
+    eig_vectors). Only valid resonance frequencies (e.i. those for which
+    corresponding eigenmomenta are above a given threshold) are taken into
+    account.
 
-                gap = ([smin, fmin, vmin], [smax, fmax, vmax])
+    If `opts.batch` is True (default), the eigenvalues are traced for all
+    logged frequencies of an interval at once, see
+    :func:`get_batch_callback()`.
 
-                log_freqs = nm.array(llog_freqs)
+    The frequency intervals are independent - if `opts.num_workers` is
+    greater than one, they are distributed over that many worker processes
+    using :mod:`sfepy.base.multiproc`. The results are the same as in the
+    serial run.
 
-            output(gap[0])
-            output(gap[1])
+    Notes
+    -----
+    - make freq_eps relative to ]f0, f1[ size?
+    """
+    output('eigensolver:', opts.eigensolver)
+
+    fm = freq_info.freq_range_margins
+    min_freq, max_freq = fm[0], fm[-1]
+    output('freq. range with margins: [%8.3f, %8.3f]'
+           % (min_freq, max_freq))
+
+    df = opts.freq_step * (max_freq - min_freq)
+
+    n_col = 1 + (mtx_b is not None)
+    n_interval = freq_info.freq_range.shape[0] + 1
+
+    num_workers = min(opts.get('num_workers', 1), n_interval)
+    if num_workers > 1:
+        import sfepy.base.multiproc as multi
+
+        multiproc, mode = multi.get_multiproc()
+        if mode != 'proc':
+            output('multiprocessing not available, using serial detection!')
+            num_workers = 1
+
+    if num_workers > 1:
+        output('detecting band gaps in %d intervals using %d workers...'
+               % (n_interval, num_workers))
+        tasks = multiproc.get_queue('bg_tasks')
+        lock = multiproc.get_lock('bg_lock')
+        remaining = multiproc.get_int_value('bg_remaining', n_interval)
+        results = multiproc.get_dict('bg_results', clear=True)
+
+        for ii in range(n_interval):
+            tasks.put(ii)
+
+        if isinstance(mass, Struct) and (mass.get('problem') is not None):
+            # The problem is not needed for evaluating the tensor.
+            mass = mass.copy()
+            mass.problem = None
+
+        workers = []
+        for ii in range(num_workers):
+            args = (tasks, lock, remaining, results, n_interval,
+                    fm, df, opts, mass, mtx_b, gap_kind, n_col)
+            worker = multiproc.Process(target=_detect_interval_gaps_multi,
+                                       args=args)
+            worker.start()
+            workers.append(worker)
+
+        # Block until all workers are terminated.
+        for worker in workers:
+            worker.join()
+        output('...done')
 
-            gaps.append(gap)
+        results = [results[ii] for ii in range(n_interval)]
 
+    else:
+        callbacks = get_callbacks(mass, opts.eigensolver, mtx_b=mtx_b,
+                                  batch=opts.get('batch', True))
+        results = []
+        for ii in range(n_interval):
+            f0, f1 = fm[[ii, ii+1]]
+            results.append(detect_interval_gap(f0, f1, df, opts, callbacks,
+                                               gap_kind=gap_kind,
+                                               n_col=n_col))
+
+    logs = [[] for ii in range(n_col + 1)]
+    gaps = []
+    for gap, log_freqs, log_mevp in results:
+        gaps.append(gap)
         logs[0].append(log_freqs)
         for ii, data in enumerate(log_mevp):
             logs[ii+1].append(nm.array(data, dtype = nm.float64))
 
-        output('...done')
-
     kinds = describe_gaps(gaps)
 
     slogs = Struct(freqs=logs[0], eigs=logs[1])
@@ -324,12 +467,75 @@ def get_callback(mass, method, mtx_b=None, mode='trace'):
 
     return eval(mode + '_callback')
 
-def find_zero(f0, f1, callback, freq_eps, zero_eps, mode):
+def get_batch_callback(mass, method, mtx_b=None):
+    """
+    Return callback to solve band gaps or dispersion eigenproblem P for an
+    array of frequencies at once, see :func:`get_callback()`.
+
+    The callback returns a tuple of arrays with the first axis corresponding
+    to the frequencies. The eigenproblems are solved by a single vectorized
+    :func:`numpy.linalg.eigh()` call, so it is available only for the
+    'eig.sgscipy' method (dense symmetric problems).
+
+    Returns
+    -------
+    callback : callable or None
+        The callback, or None if the batched solution is not supported.
+    """
+    if method != 'eig.sgscipy':
+        return None
+
+    if mtx_b is None:
+        def trace_batch_callback(freqs):
+            meigs = nla.eigvalsh(mass(freqs))
+            return meigs,
+
+    else:
+        try:
+            # Transform the generalized problem to the standard one.
+            mtx_li = nla.inv(nla.cholesky(mtx_b))
+
+        except nla.LinAlgError:
+            return None
+
+        def trace_batch_callback(freqs):
+            mtx_a = (freqs**2)[:, None, None] * mass(freqs)
+            mtx_a = nm.matmul(nm.matmul(mtx_li, mtx_a), mtx_li.T)
+            meigs, mvecs = nla.eigh(mtx_a)
+            mvecs = nm.matmul(mtx_li.T, mvecs)
+            return meigs, mvecs
+
+    return trace_batch_callback
+
+def get_zero_bracket(log_freqs, log_eigs, mode):
+    """
+    Get the initial interval for :func:`find_zero()` from the eigenvalues of
+    problem P traced in `log_freqs`, that increase with the frequency.
+
+    Returns
+    -------
+    bracket : tuple or None
+        The frequencies of the last nonpositive and the first positive
+        traced eigenvalue, or None, if the traced eigenvalue does not change
+        its sign.
+    """
+    ieig = {0 : 0, 1 : -1}[mode]
+    vals = nm.array([eigs[ieig] for eigs in log_eigs])
+    ii = nm.where(vals > 0.0)[0]
+    if (len(ii) == 0) or (ii[0] == 0):
+        return None
+
+    return log_freqs[ii[0] - 1], log_freqs[ii[0]]
+
+def find_zero(f0, f1, callback, freq_eps, zero_eps, mode, bracket=None):
     """
     For f \in ]f0, f1[ find frequency f for which either the smallest (`mode` =
     0) or the largest (`mode` = 1) eigenvalue of problem P given by `callback`
     is zero.
 
+    If `bracket` is given, the bisection starts in that subinterval of
+    ]f0, f1[, see :func:`get_zero_bracket()`.
+
     Returns
     -------
     flag : 0, 1, or 2
@@ -353,7 +559,7 @@ def find_zero(f0, f1, callback, freq_eps, zero_eps, mode):
     1       2       f -> f0, largest eigenvalue > 0
     =====  ======  ========
     """
-    fm, fp = f0, f1
+    fm, fp = (f0, f1) if bracket is None else bracket
     ieig = {0 : 0, 1 : -1}[mode]
     while 1:
         f = 0.5 * (fm + fp)
@@ -519,12 +725,18 @@ def compute_cat_dim_dim(coef, iw_dir):
 class SimpleEVP(CorrMiniApp):
     """
     Simple eigenvalue problem.
+
+    The `eigensolver_options` are passed to the `eigensolver`, for example
+    the `interval` of 'eig.scipy_slicing'. The matrices are converted to
+    dense arrays, unless the eigensolver supports sparse matrices.
     """
+    _sparse_eigensolvers = ['eig.scipy_slicing']
 
     def process_options(self):
         get = self.options.get
 
         return Struct(eigensolver=get('eigensolver', 'eig.sgscipy'),
+                      eigensolver_options=get('eigensolver_options', {}),
                       elasticity_contrast=get('elasticity_contrast', 1.0),
                       scale_epsilon=get('scale_epsilon', 1.0),
                       save_eig_vectors=get('save_eig_vectors', (0, 0)))
@@ -546,13 +758,15 @@ class SimpleEVP(CorrMiniApp):
         output('computing resonance frequencies...')
         tt = [0]
 
-        if isinstance(mtx_a, sc.sparse.spmatrix):
-            mtx_a = mtx_a.toarray()
-        if isinstance(mtx_m, sc.sparse.spmatrix):
-            mtx_m = mtx_m.toarray()
+        if opts.eigensolver not in self._sparse_eigensolvers:
+            if isinstance(mtx_a, sc.sparse.spmatrix):
+                mtx_a = mtx_a.toarray()
+            if isinstance(mtx_m, sc.sparse.spmatrix):
+                mtx_m = mtx_m.toarray()
 
         eigs, mtx_s_phi = eig(mtx_a, mtx_m, return_time=tt,
-                              method=opts.eigensolver)
+                              method=opts.eigensolver,
+                              **opts.eigensolver_options)
         eigs[eigs<0.0] = 0.0
         output('...done in %.2f s' % tt[0])
         output('original eigenfrequencies:')
@@ -628,6 +842,10 @@ class SimpleEVP(CorrMiniApp):
 class SchurEVP(SimpleEVP):
     """
     Schur complement eigenvalue problem.
+
+    The Schur complement matrix is dense, so that sparse eigensolvers do not
+    help here - 'eig.scipy_slicing' solves it by :func:`scipy.linalg.eigh()`
+    and only selects the eigenvalues in its `interval`.
     """
 
     def prepare_matrices(self, problem):
@@ -840,28 +1058,32 @@ class AcousticMassTensor(MiniAppBase):
         return self
 
     def evaluate(self, freq):
+        """
+        Evaluate the tensor for a given frequency, or for an array of
+        frequencies at once. In the latter case, the tensors are returned in
+        an array of shape ``(n_freq, n_c, n_c)``.
+        """
         ema = self.eigenmomenta
 
-        n_c = ema.shape[1]
-        fmass = nm.zeros((n_c, n_c), dtype=nm.float64)
-
-        num, denom = self.get_coefs(freq)
+        freqs = nm.asarray(freq, dtype=nm.float64)
+        num, denom = self.get_coefs(freqs.reshape((-1, 1)))
         de = 1.0 / denom
         if not nm.isfinite(de).all():
-            raise ValueError('frequency %e too close to resonance!' % freq)
+            ii = nm.where(~nm.isfinite(de).all(axis=1))[0][0]
+            raise ValueError('frequency %e too close to resonance!'
+                             % freqs.ravel()[ii])
 
-        for ir in range(n_c):
-            for ic in range(n_c):
-                if ir <= ic:
-                    val = nm.sum(num * de * (ema[:, ir] * ema[:, ic]))
-                    fmass[ir, ic] += val
-                else:
-                    fmass[ir, ic] = fmass[ic, ir]
+        n_c = ema.shape[1]
+        fmass = nm.einsum('fk,ki,kj->fij', num * de, ema, ema)
+        fmass = 0.5 * (fmass + fmass.transpose((0, 2, 1)))
 
         eye = nm.eye(n_c, n_c, dtype=nm.float64)
         mtx_mass = (eye * self.dv_info.average_density) \
                    - (fmass / self.dv_info.total_volume)
 
+        if freqs.ndim == 0:
+            mtx_mass = mtx_mass[0]
+
         return mtx_mass
 
     def get_coefs(self, freq):
@@ -913,25 +1135,31 @@ class AppliedLoadTensor(AcousticMassTensor):
         return self
 
     def evaluate(self, freq):
+        """
+        Evaluate the tensor for a given frequency, or for an array of
+        frequencies at once. In the latter case, the tensors are returned in
+        an array of shape ``(n_freq, n_c, n_c)``.
+        """
         ema, uema = self.eigenmomenta, self.ueigenmomenta
 
-        n_c = ema.shape[1]
-        fload = nm.zeros((n_c, n_c), dtype=nm.float64)
-
-        num, denom = self.get_coefs(freq)
+        freqs = nm.asarray(freq, dtype=nm.float64)
+        num, denom = self.get_coefs(freqs.reshape((-1, 1)))
         de = 1.0 / denom
         if not nm.isfinite(de).all():
-            raise ValueError('frequency %e too close to resonance!' % freq)
+            ii = nm.where(~nm.isfinite(de).all(axis=1))[0][0]
+            raise ValueError('frequency %e too close to resonance!'
+                             % freqs.ravel()[ii])
 
-        for ir in range(n_c):
-            for ic in range(n_c):
-                val = nm.sum(num * de * (ema[:, ir] * uema[:, ic]))
-                fload[ir, ic] += val
+        n_c = ema.shape[1]
+        fload = nm.einsum('fk,ki,kj->fij', num * de, ema, uema)
 
         eye = nm.eye(n_c, n_c, dtype=nm.float64)
 
         mtx_load = eye - (fload / self.dv_info.total_volume)
 
+        if freqs.ndim == 0:
+            mtx_load = mtx_load[0]
+
         return mtx_load
 
 class BandGaps(MiniAppBase):
@@ -959,6 +1187,13 @@ class BandGaps(MiniAppBase):
     detect_fun : callable
         The function for detecting the band gaps. Default is
         :func:`detect_band_gaps()`.
+    batch : bool
+        If True (default), the mass tensor eigenvalues are traced for all
+        logged frequencies of an interval at once, when supported by the
+        eigensolver, see :func:`get_batch_callback()`.
+    num_workers : int
+        If greater than one, the frequency intervals are processed in
+        parallel by that many worker processes.
     log_save_name : str
         If not None, the band gaps log is to be saved under the given name.
     raw_log_save_name : str
@@ -984,6 +1219,8 @@ class BandGaps(MiniAppBase):
                       freq_eps=get('freq_eps', 1e-8),
                       zero_eps=get('zero_eps', 1e-8),
                       detect_fun=get('detect_fun', detect_band_gaps),
+                      batch=get('batch', True),
+                      num_workers=get('num_workers', 1),
                       log_save_name=get('log_save_name', None),
                       raw_log_save_name=get('raw_log_save_name', None))
 
@@ -59,7 +59,8 @@ class CoefVolume(MiniAppBase):
 class HomogenizationWorker(object):
     def __call__(self, problem, options, post_process_hook,
                  req_info, coef_info,
-                 micro_states, store_micro_idxs, time_tag=''):
+                 micro_states, store_micro_idxs, time_tag='',
+                 dependencies=None):
         """Calculate homogenized correctors and coefficients.
 
         Parameters
@@ -81,6 +82,9 @@ class HomogenizationWorker(object):
         time_tag : str
             The label corresponding to the actual time step and iteration,
             used in the corrector file names.
+        dependencies : dict, optional
+            The already computed correctors and coefficients, that are not
+            computed again. The newly computed ones are added to it.
 
         Returns
         -------
@@ -89,11 +93,14 @@ class HomogenizationWorker(object):
         save_names : list
             The names of computed dependencies.
         """
-        dependencies = {}
+        if dependencies is None:
+            dependencies = {}
         save_names = {}
         sorted_names = self.get_sorted_dependencies(req_info, coef_info,
                                                     options.compute_only)
         for name in sorted_names:
+            if name in dependencies: continue
+
             if not name.startswith('c.'):
                 if micro_states is not None:
                     req_info[name]['store_idxs'] = (store_micro_idxs, 0)
@@ -694,7 +701,14 @@ class HomogenizationEngine(PDESolverApp):
 
         return coef_info
 
-    def call(self, ret_all=False, time_tag=''):
+    def call(self, ret_all=False, time_tag='', dependencies=None):
+        """
+        Compute the homogenized coefficients.
+
+        If the `dependencies` dict is given, the correctors and coefficients
+        it contains are not computed again, and the newly computed ones are
+        added to it. This implies the computation without multiprocessing.
+        """
         problem = self.problem
         opts = self.app_options
 
@@ -707,7 +721,8 @@ class HomogenizationEngine(PDESolverApp):
         is_store_filenames = coef_info.pop('filenames', None) is not None
 
         multiproc_mode = None
-        if opts.multiprocessing and multi.use_multiprocessing:
+        if ((dependencies is None) and opts.multiprocessing
+            and multi.use_multiprocessing):
             multiproc, multiproc_mode = multi.get_multiproc(mpi=opts.use_mpi)
             if multiproc_mode == 'mpi':
                 HomogWorkerMulti = HomogenizationWorkerMultiMPI
@@ -734,7 +749,8 @@ class HomogenizationEngine(PDESolverApp):
             dependencies, save_names = \
                 worker(problem, opts, self.post_process_hook,
                        req_info, coef_info, self.micro_states,
-                       self.app_options.store_micro_idxs, time_tag)
+                       self.app_options.store_micro_idxs, time_tag,
+                       dependencies=dependencies)
 
         deps = {}
 
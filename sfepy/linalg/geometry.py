@@ -459,3 +459,145 @@ def get_coors_in_ball(coors, centre, radius, inside=True):
         out = nm.where(norm(vec) >= radius)[0]
 
     return out
+
+def get_rigid_body_modes(coors):
+    """
+    Get the rigid body modes (infinitesimal rotations and translations) of
+    points with coordinates `coors`.
+
+    Parameters
+    ----------
+    coors : array
+        The coordinates of the points, shape (n_nod, dim), dim in [2, 3].
+
+    Returns
+    -------
+    modes : array
+        The rotations followed by the translations in columns, shape
+        (n_nod * dim, n_mode), with the node-by-node order of rows. The
+        number of modes is 3 in 2D and 6 in 3D.
+    """
+    coors = nm.asarray(coors)
+    n_nod, dim = coors.shape
+
+    mtx_e = nm.tile(nm.eye(dim, dtype=nm.float64), (n_nod, 1))
+
+    if dim == 2:
+        mtx_r = nm.empty((dim * n_nod, 1), dtype=nm.float64)
+        mtx_r[0::dim,0] = -coors[:,1]
+        mtx_r[1::dim,0] = coors[:,0]
+
+    elif dim == 3:
+        mtx_r = nm.zeros((dim * n_nod, dim), dtype=nm.float64)
+        mtx_r[0::dim,1] = coors[:,2]
+        mtx_r[0::dim,2] = -coors[:,1]
+        mtx_r[1::dim,0] = -coors[:,2]
+        mtx_r[1::dim,2] = coors[:,0]
+        mtx_r[2::dim,0] = coors[:,1]
+        mtx_r[2::dim,1] = -coors[:,0]
+
+    else:
+        msg = 'dimension in [2, 3]: %d' % dim
+        raise ValueError(msg)
+
+    return nm.hstack((mtx_r, mtx_e))
+
+def _interleave_bits(icoors, n_bits):
+    """
+    Interleave the bits of integer coordinates, the most significant bits
+    first.
+    """
+    one = nm.uint64(1)
+    keys = nm.zeros(icoors.shape[0], dtype=nm.uint64)
+    for ib in range(n_bits - 1, -1, -1):
+        for ii in range(icoors.shape[1]):
+            keys <<= one
+            keys |= (icoors[:, ii] >> nm.uint64(ib)) & one
+
+    return keys
+
+def _get_hilbert_keys(icoors, n_bits):
+    """
+    Get the Hilbert curve indices of integer coordinates using the algorithm
+    of J. Skilling, Programming the Hilbert curve, AIP Conf. Proc. 707, 381
+    (2004).
+    """
+    xx = icoors.copy()
+    dim = xx.shape[1]
+
+    # Inverse undo.
+    qq = 1 << (n_bits - 1)
+    while qq > 1:
+        pp = nm.uint64(qq - 1)
+        for ii in range(dim):
+            is_set = (xx[:, ii] & nm.uint64(qq)) != 0
+            xx[is_set, 0] ^= pp
+
+            ir = ~is_set
+            tt = (xx[ir, 0] ^ xx[ir, ii]) & pp
+            xx[ir, 0] ^= tt
+            xx[ir, ii] ^= tt
+
+        qq >>= 1
+
+    # Gray encode.
+    for ii in range(1, dim):
+        xx[:, ii] ^= xx[:, ii - 1]
+
+    tt = nm.zeros(xx.shape[0], dtype=nm.uint64)
+    qq = 1 << (n_bits - 1)
+    while qq > 1:
+        is_set = (xx[:, dim - 1] & nm.uint64(qq)) != 0
+        tt[is_set] ^= nm.uint64(qq - 1)
+        qq >>= 1
+
+    xx ^= tt[:, None]
+
+    return _interleave_bits(xx, n_bits)
+
+def get_space_filling_order(coors, kind='hilbert'):
+    """
+    Get the permutation that orders points along a space-filling curve, so
+    that points close in the permutation are also close in space.
+
+    Parameters
+    ----------
+    coors : array
+        The coordinates of points, shape `(n_point, dim)`.
+    kind : 'hilbert' or 'morton'
+        The space-filling curve kind. The Hilbert curve has a better locality,
+        the Morton (Z-order) curve is cheaper to compute.
+
+    Returns
+    -------
+    perm : array
+        The permutation, such that `coors[perm]` are the ordered points.
+    """
+    coors = nm.asarray(coors, dtype=nm.float64)
+    if coors.ndim == 1:
+        coors = coors[:, None]
+
+    dim = coors.shape[1]
+    if (dim == 1) or (coors.shape[0] == 0):
+        return nm.argsort(coors[:, 0], kind='mergesort')
+
+    n_bits = min(21, 63 // dim)
+
+    cmin = coors.min(axis=0)
+    size = (coors.max(axis=0) - cmin).max()
+    if size == 0.0:
+        return nm.arange(coors.shape[0])
+
+    scale = ((1 << n_bits) - 1) / size
+    icoors = ((coors - cmin) * scale).astype(nm.uint64)
+
+    if kind == 'hilbert':
+        keys = _get_hilbert_keys(icoors, n_bits)
+
+    elif kind == 'morton':
+        keys = _interleave_bits(icoors, n_bits)
+
+    else:
+        raise ValueError('unknown space-filling curve kind! (%s)' % kind)
+
+    return nm.argsort(keys, kind='mergesort')
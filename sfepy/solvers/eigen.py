@@ -248,6 +248,283 @@ class LOBPCGEigenvalueSolver(EigenvalueSolver):
 
         return out
 
+def factorize_shifted(mtx_a, mtx_b, shift, n_try=5):
+    r"""
+    Factorize the shifted symmetric matrix :math:`A - \sigma B` using the
+    symmetric mode of SuperLU without pivoting, so that the signs of the
+    diagonal of U give the inertia of the matrix.
+
+    Parameters
+    ----------
+    mtx_a, mtx_b : sparse matrix
+        The symmetric (Hermitian) matrices of the eigenvalue problem.
+        If `mtx_b` is None, the identity matrix is used.
+    shift : float
+        The shift :math:`\sigma`. When the off-diagonal pivoting was
+        necessary, or the shifted matrix is singular, i.e. the shift is an
+        eigenvalue, the factorization is repeated up to `n_try` times with the
+        shift decreased by a small relative amount. The eigenvalues equal to
+        the requested shift are thus not counted in `n_neg`.
+
+    Returns
+    -------
+    lu : SuperLU
+        The factorization.
+    shift : float
+        The actual shift.
+    n_neg : int
+        The number of negative eigenvalues of :math:`A - \sigma B`, i.e. the
+        number of eigenvalues of the problem less than `shift`.
+    """
+    import scipy.sparse.linalg as ssla
+
+    if mtx_b is None:
+        mtx_b = sps.eye(mtx_a.shape[0], dtype=mtx_a.dtype)
+
+    scale = max(abs(shift), 1.0)
+    for ii in range(n_try):
+        mtx = (mtx_a - shift * mtx_b).tocsc()
+        try:
+            lu = ssla.splu(mtx, permc_spec='MMD_AT_PLUS_A',
+                           diag_pivot_thresh=0.0,
+                           options={'SymmetricMode' : True})
+
+        except RuntimeError: # Exactly singular matrix.
+            lu = None
+
+        if (lu is not None) and (lu.perm_r == lu.perm_c).all():
+            n_neg = (lu.U.diagonal().real < 0.0).sum()
+            return lu, shift, n_neg
+
+        shift -= 1e-8 * scale * (ii + 1)
+
+    raise ValueError('cannot compute inertia of shifted matrix! (shift: %e)'
+                     % shift)
+
+def _solve_slice(mtx_a, mtx_b, lower, upper, n_eig, eigenvectors, kwargs):
+    """
+    Find the `n_eig` eigenvalues in [`lower`, `upper`[ using the shift-invert
+    Lanczos method with the shift in the slice centre. The shifted matrix is
+    factorized once and the factorization is used in all Lanczos iterations
+    and restarts.
+    """
+    import scipy.sparse.linalg as ssla
+
+    n_row = mtx_a.shape[0]
+    lu, sigma, _ = factorize_shifted(mtx_a, mtx_b, 0.5 * (lower + upper))
+    opinv = ssla.LinearOperator(mtx_a.shape, matvec=lu.solve,
+                                dtype=mtx_a.dtype)
+
+    # All eigenvalues in the slice are nearer to the centre than the others.
+    n_req = min(n_eig + 2, n_row - 1)
+    while 1:
+        eigs, vecs = ssla.eigsh(mtx_a, k=n_req, M=mtx_b, sigma=sigma,
+                                OPinv=opinv, which='LM', **kwargs)
+        ii = nm.where((eigs >= lower) & (eigs < upper))[0]
+        if (len(ii) >= n_eig) or (n_req == n_row - 1):
+            break
+
+        n_req = min(2 * n_req, n_row - 1)
+
+    if len(ii) < n_eig:
+        output('slice [%e, %e[: found %d of %d eigenvalues!'
+               % (lower, upper, len(ii), n_eig))
+
+    ii = ii[nm.argsort(eigs[ii])]
+    if eigenvectors:
+        return eigs[ii], vecs[:, ii]
+
+    else:
+        return eigs[ii], None
+
+def _solve_slices_multi(tasks, lock, remaining, results, slices,
+                        mtx_a, mtx_b, eigenvectors, kwargs):
+    """
+    Solve the slices taken from the `tasks` queue - called in a worker
+    process.
+    """
+    while remaining.value > 0:
+        ii = tasks.get()
+        if ii is None:
+            continue
+
+        lower, upper, n_eig = slices[ii]
+        out = _solve_slice(mtx_a, mtx_b, lower, upper, n_eig, eigenvectors,
+                           kwargs)
+
+        lock.acquire()
+        results[ii] = out
+        remaining.value -= 1
+        lock.release()
+
+class ScipySlicingEigenvalueSolver(EigenvalueSolver):
+    """
+    Spectrum slicing solver for sparse symmetric (Hermitian) problems,
+    that finds all eigenvalues in a given interval.
+
+    The interval is recursively bisected into slices with at most
+    `max_eigs_per_slice` eigenvalues, counted using the inertia of the
+    factorized shifted matrices (Sylvester's law of inertia). The eigenvalues
+    of each slice are found by :func:`scipy.sparse.linalg.eigsh()` in the
+    shift-invert mode, using a single factorization of the matrix shifted to
+    the slice centre. The slices are independent and can be solved in
+    parallel processes, see `num_workers`.
+
+    If `n_eigs` is given, only the `n_eigs` smallest eigenvalues in the
+    interval are returned. Dense matrices are solved by
+    :func:`scipy.linalg.eigh()`.
+    """
+    name = 'eig.scipy_slicing'
+
+    _parameters = [
+        ('interval', '(float, float)', None, True,
+         'The interval [a, b[ of eigenvalues to find.'),
+        ('max_eigs_per_slice', 'int', 20, False,
+         'The maximum number of eigenvalues in a single slice.'),
+        ('num_workers', 'int', 1, False,
+         """The number of worker processes for solving the slices, using
+            :mod:`sfepy.base.multiproc`."""),
+        ('*', '*', None, False,
+         'Additional parameters supported by eigsh().'),
+    ]
+
+    def __init__(self, conf, **kwargs):
+        EigenvalueSolver.__init__(self, conf, **kwargs)
+
+    def get_slices(self, mtx_a, mtx_b, interval, max_eigs_per_slice):
+        """
+        Split `interval` into slices with at most `max_eigs_per_slice`
+        eigenvalues.
+
+        Returns
+        -------
+        slices : list
+            The list of (lower, upper, number of eigenvalues) of the non-empty
+            slices, ordered by the lower bound. The bounds are the actual
+            shifts used for counting the eigenvalues, see
+            :func:`factorize_shifted()`, so that the eigenvalues equal to the
+            requested bounds are assigned to the slices consistently with the
+            counts.
+        """
+        counts = {}
+        def count(shift):
+            if shift not in counts:
+                counts[shift] = factorize_shifted(mtx_a, mtx_b, shift)[1:]
+
+            return counts[shift]
+
+        lower, upper = interval
+
+        slices = []
+        stack = [(lower, upper)]
+        while len(stack):
+            lower, upper = stack.pop()
+            (slower, n_lower), (supper, n_upper) = count(lower), count(upper)
+            n_eig = n_upper - n_lower
+            if n_eig == 0:
+                continue
+
+            middle = 0.5 * (lower + upper)
+            if ((n_eig > max_eigs_per_slice)
+                and (lower < middle < upper)):
+                stack.extend([(middle, upper), (lower, middle)])
+
+            else:
+                slices.append((slower, supper, n_eig))
+
+        slices.sort(key=lambda x: x[0])
+
+        return slices
+
+    @standard_call
+    def __call__(self, mtx_a, mtx_b=None, n_eigs=None, eigenvectors=None,
+                 status=None, conf=None):
+        kwargs = self.build_solver_kwargs(conf)
+
+        lower, upper = conf.interval
+
+        if not (sps.issparse(mtx_a)
+                and (mtx_b is None or sps.issparse(mtx_b))):
+            import scipy.linalg as sla
+
+            mtx_a, mtx_b = self._to_array(mtx_a, mtx_b)
+            eigs, vecs = sla.eigh(mtx_a, mtx_b)
+            ii = nm.where((eigs >= lower) & (eigs < upper))[0]
+            eigs, vecs = eigs[ii], vecs[:, ii]
+            slices = []
+
+        else:
+            timer = Timer(start=True)
+            slices = self.get_slices(mtx_a, mtx_b, (lower, upper),
+                                     conf.max_eigs_per_slice)
+            output('%d eigenvalues in %d slices (counted in %.2f [s])'
+                   % (sum(ii[2] for ii in slices), len(slices),
+                      timer.stop()), verbose=conf.verbose)
+
+            n_slice = len(slices)
+            num_workers = min(conf.num_workers, n_slice)
+            if num_workers > 1:
+                import sfepy.base.multiproc as multi
+
+                multiproc, mode = multi.get_multiproc()
+                if mode != 'proc':
+                    output('multiprocessing not available, using serial'
+                           ' solution!')
+                    num_workers = 1
+
+            if num_workers > 1:
+                tasks = multiproc.get_queue('eig_tasks')
+                lock = multiproc.get_lock('eig_lock')
+                remaining = multiproc.get_int_value('eig_remaining', n_slice)
+                results = multiproc.get_dict('eig_results', clear=True)
+
+                for ii in range(n_slice):
+                    tasks.put(ii)
+
+                workers = []
+                for ii in range(num_workers):
+                    args = (tasks, lock, remaining, results, slices,
+                            mtx_a, mtx_b, eigenvectors, kwargs)
+                    worker = multiproc.Process(target=_solve_slices_multi,
+                                               args=args)
+                    worker.start()
+                    workers.append(worker)
+
+                for worker in workers:
+                    worker.join()
+
+                results = [results[ii] for ii in range(n_slice)]
+
+            else:
+                results = [_solve_slice(mtx_a, mtx_b, lower, upper, n_eig,
+                                        eigenvectors, kwargs)
+                           for lower, upper, n_eig in slices]
+
+            if n_slice:
+                eigs = nm.concatenate([ii[0] for ii in results])
+                if eigenvectors:
+                    vecs = nm.hstack([ii[1] for ii in results])
+
+            else:
+                eigs = nm.zeros(0, dtype=nm.float64)
+                vecs = nm.zeros((mtx_a.shape[0], 0), dtype=mtx_a.dtype)
+
+        if status is not None:
+            status['n_slice'] = len(slices)
+
+        if n_eigs is not None:
+            eigs = eigs[:n_eigs]
+            if eigenvectors:
+                vecs = vecs[:, :n_eigs]
+
+        if eigenvectors:
+            out = (eigs, vecs)
+
+        else:
+            out = eigs
+
+        return out
+
 def init_slepc_args():
     try:
         import sys, slepc4py
@@ -10,7 +10,8 @@ from six.moves import range
 
 warnings.simplefilter('ignore', sps.SparseEfficiencyWarning)
 
-from sfepy.base.base import output, get_default, assert_, try_imports
+from sfepy.base.base import (output, get_default, assert_, try_imports,
+                             Struct)
 from sfepy.base.timing import Timer
 from sfepy.solvers.solvers import LinearSolver
 
@@ -29,7 +30,7 @@ def solve(mtx, rhs, solver_class=None, solver_conf=None):
 
     return solution
 
-def _get_cs_matrix_hash(mtx, chunk_size=100000):
+def _get_cs_matrix_hash(mtx, chunk_size=100000, pattern_only=False):
     def _gen_array_chunks(arr):
         ii = 0
         while len(arr[ii:]):
@@ -41,8 +42,9 @@ def _get_cs_matrix_hash(mtx, chunk_size=100000):
         sha1.update(chunk)
     for chunk in _gen_array_chunks(mtx.indices):
         sha1.update(chunk)
-    for chunk in _gen_array_chunks(mtx.data):
-        sha1.update(chunk)
+    if not pattern_only:
+        for chunk in _gen_array_chunks(mtx.data):
+            sha1.update(chunk)
 
     digest = sha1.hexdigest()
     return digest
@@ -62,6 +64,19 @@ def _is_new_matrix(mtx, mtx_digest, force_reuse=False):
 
     return True, (id1, digest1)
 
+def _is_new_pattern(mtx, pattern_digest):
+    """
+    Check whether the sparsity pattern of `mtx` differs from the pattern with
+    the digest `pattern_digest`. The pattern of non-CSR matrices is always
+    considered new.
+    """
+    if not isinstance(mtx, sps.csr_matrix):
+        return True, None
+
+    digest = _get_cs_matrix_hash(mtx, pattern_only=True)
+
+    return digest != pattern_digest, digest
+
 def standard_call(call):
     """
     Decorator handling argument preparation and timing for linear solvers.
@@ -137,6 +152,9 @@ def petsc_call(call):
 class ScipyDirect(LinearSolver):
     """
     Direct sparse solver from SciPy.
+
+    Multiple right-hand sides can be passed as columns of a 2D array - a
+    single factorization is used for all of them.
     """
     name = 'ls.scipy_direct'
 
@@ -183,6 +201,7 @@ class ScipyDirect(LinearSolver):
                                 assumeSortedIndices=True)
         else:
             self.sls.use_solver(useUmfpack=False)
+        self.is_umfpack = is_umfpack
 
     @standard_call
     def __call__(self, rhs, x0=None, conf=None, eps_a=None, eps_r=None,
@@ -193,6 +212,11 @@ class ScipyDirect(LinearSolver):
 
         if self.solve is not None:
             # Matrix is already prefactorized.
+            if (rhs.ndim == 2) and self.is_umfpack:
+                # The UMFPACK solve function accepts only vectors.
+                return nm.array([self.solve(rhs[:, ii])
+                                 for ii in range(rhs.shape[1])]).T
+
             return self.solve(rhs)
         else:
             return self.sls.spsolve(mtx, rhs)
@@ -234,12 +258,457 @@ class ScipyUmfpack(ScipyDirect):
         ScipyDirect.__init__(self, conf, method='umfpack', **kwargs)
 
 
+def create_jacobi_precond(mtx):
+    """
+    Create the Jacobi preconditioner of `mtx`, i.e. the inverse of its
+    diagonal. Zero diagonal entries are replaced by ones.
+    """
+    diag = mtx.diagonal()
+    ii = diag == 0
+    diag[ii] = 1.0
+
+    return sps.diags(1.0 / diag, format='csr')
+
+def create_block_jacobi_precond(mtx, blocks):
+    """
+    Create the block Jacobi preconditioner of `mtx`, i.e. the inverse of its
+    block diagonal part.
+
+    Parameters
+    ----------
+    mtx : sparse matrix
+        The matrix.
+    blocks : array
+        The block number of each matrix row, for example the node of each
+        DOF.
+
+    Returns
+    -------
+    precond : csr_matrix
+        The inverse of the block diagonal part.
+    """
+    mtx = mtx.tocsr()
+    blocks = nm.asarray(blocks)
+
+    perm = nm.argsort(blocks, kind='stable')
+    _, starts, sizes = nm.unique(blocks[perm], return_index=True,
+                                 return_counts=True)
+
+    rows, cols, vals = [], [], []
+    for size in nm.unique(sizes):
+        ii = nm.where(sizes == size)[0]
+        idx = perm[starts[ii][:, None] + nm.arange(size)]
+        ir = nm.repeat(idx, size, axis=1).ravel()
+        ic = nm.tile(idx, (1, size)).ravel()
+
+        bmtx = nm.asarray(mtx[ir, ic]).reshape((-1, size, size))
+        try:
+            ibmtx = nm.linalg.inv(bmtx)
+
+        except nm.linalg.LinAlgError:
+            ibmtx = nm.linalg.pinv(bmtx)
+
+        rows.append(ir)
+        cols.append(ic)
+        vals.append(ibmtx.ravel())
+
+    precond = sps.coo_matrix((nm.concatenate(vals),
+                              (nm.concatenate(rows), nm.concatenate(cols))),
+                             shape=mtx.shape)
+
+    return precond.tocsr()
+
+def create_ilu_precond(mtx, drop_tol=1e-4, fill_factor=10.0, **kwargs):
+    """
+    Create the incomplete LU (ILUT) preconditioner of `mtx` using
+    :func:`scipy.sparse.linalg.spilu()`. The `kwargs` are passed to spilu().
+    """
+    import scipy.sparse.linalg as spla
+
+    ilu = spla.spilu(mtx.tocsc(), drop_tol=drop_tol, fill_factor=fill_factor,
+                     **kwargs)
+    return spla.LinearOperator(mtx.shape, matvec=ilu.solve, dtype=mtx.dtype)
+
+def create_field_split_precond(mtx, field_ranges, sub_precond='ilu',
+                               **kwargs):
+    """
+    Create the block diagonal (additive field split) preconditioner of `mtx`.
+
+    Parameters
+    ----------
+    mtx : sparse matrix
+        The matrix.
+    field_ranges : dict
+        The row ranges (slices or (start, stop) tuples) of the fields.
+    sub_precond : 'lu', 'ilu' or 'jacobi'
+        The preconditioner of the diagonal field blocks.
+    **kwargs : dict
+        The additional arguments of the 'ilu' preconditioner.
+
+    Returns
+    -------
+    precond : LinearOperator
+        The preconditioner.
+    """
+    import scipy.sparse.linalg as spla
+
+    mtx = mtx.tocsr()
+
+    subs = []
+    for key, rng in six.iteritems(field_ranges):
+        if not isinstance(rng, slice):
+            rng = slice(*rng)
+
+        smtx = mtx[rng, rng]
+        if sub_precond == 'lu':
+            spc = spla.LinearOperator(smtx.shape,
+                                      matvec=spla.splu(smtx.tocsc()).solve,
+                                      dtype=mtx.dtype)
+
+        elif sub_precond == 'ilu':
+            spc = create_ilu_precond(smtx, **kwargs)
+
+        elif sub_precond == 'jacobi':
+            spc = create_jacobi_precond(smtx)
+
+        else:
+            raise ValueError('unknown field split sub-preconditioner! (%s)'
+                             % sub_precond)
+
+        subs.append((rng, spc))
+
+    def matvec(vec):
+        vec = vec.ravel()
+        out = vec.copy()
+        for rng, spc in subs:
+            out[rng] = spc.dot(vec[rng])
+
+        return out
+
+    return spla.LinearOperator(mtx.shape, matvec=matvec, dtype=mtx.dtype)
+
+def _get_row_dofs(variables, var):
+    """
+    Get the DOFs of the state variable `var` corresponding to its rows in the
+    (active) DOF numbering of `variables`. With the active DOFs only, the
+    rows follow the equation numbering, that can be permuted even without
+    constrained DOFs, see :func:`Field.set_dof_order()
+    <sfepy.discrete.common.fields.Field.set_dof_order()>`.
+    """
+    if getattr(variables, 'active_only', True):
+        return var.eq_map.eqi
+
+    else:
+        return nm.arange(var.n_dof)
+
+def get_dof_blocks(variables, n_row):
+    """
+    Get the node number of each matrix row of the state variables
+    `variables`, or None, if the matrix rows do not correspond to the
+    (active) state DOFs.
+    """
+    adi = variables.adi
+    if adi.ptr[-1] != n_row:
+        return None
+
+    blocks = nm.empty(n_row, dtype=nm.int64)
+    offset = 0
+    for name in adi.var_names:
+        var = variables[name]
+        dofs = _get_row_dofs(variables, var)
+        blocks[adi.indx[name]] = offset + dofs // var.n_components
+        offset += var.n_nod
+
+    return blocks
+
+def get_near_null_space(variables, n_row):
+    """
+    Get the near null space vectors of the matrix of the state variables
+    `variables`, for example for the smoothed aggregation AMG.
+
+    For vector variables with the number of components equal to the space
+    dimension (2 or 3), the rigid body modes computed from the DOF
+    coordinates are used, for other variables the constant vectors of each
+    component. The vectors are restricted to the active DOFs, and the
+    vectors of different variables do not overlap.
+
+    Returns
+    -------
+    modes : array or None
+        The near null space vectors in columns, or None, if the matrix rows
+        do not correspond to the (active) state DOFs, e.g. due to LCBCs.
+    """
+    from sfepy.linalg import get_rigid_body_modes
+
+    adi = variables.adi
+    if adi.ptr[-1] != n_row:
+        return None
+
+    blocks = []
+    for name in adi.var_names:
+        var = variables[name]
+        coors = var.field.get_coor()
+        dim = coors.shape[1]
+        if (var.n_components == dim) and (dim in (2, 3)):
+            modes = get_rigid_body_modes(coors)
+
+        else:
+            modes = nm.tile(nm.eye(var.n_components, dtype=nm.float64),
+                            (var.n_nod, 1))
+
+        blocks.append(modes[_get_row_dofs(variables, var)])
+
+    modes = nm.zeros((n_row, sum(ii.shape[1] for ii in blocks)),
+                     dtype=nm.float64)
+    ic = 0
+    for name, block in zip(adi.var_names, blocks):
+        modes[adi.indx[name], ic:ic + block.shape[1]] = block
+        ic += block.shape[1]
+
+    return modes
+
+def solve_multiple_rhs(solve, mtx, rhs, x0=None):
+    """
+    Solve a linear system with multiple right-hand sides by an iterative
+    solver, one right-hand side after another.
+
+    If the initial guesses `x0` are not given, the initial guess for each
+    right-hand side is its projection onto the space spanned by the previous
+    solutions that minimizes the residual norm.
+
+    Parameters
+    ----------
+    solve : callable
+        The function solving the system with a single right-hand side, called
+        as `solve(rhs, x0)` and returning the solution and the number of
+        iterations.
+    mtx : sparse matrix or LinearOperator
+        The system matrix.
+    rhs : array
+        The right-hand sides in columns.
+    x0 : array, optional
+        The initial guesses in columns.
+
+    Returns
+    -------
+    sol : array
+        The solutions in columns.
+    n_iter : int
+        The total number of iterations.
+    """
+    sol = nm.empty(rhs.shape, dtype=nm.result_type(mtx.dtype, rhs.dtype))
+
+    # A zs[i] = qs[i], qs orthonormal.
+    zs, qs = [], []
+    n_iter = 0
+    for ii in range(rhs.shape[1]):
+        vec = rhs[:, ii]
+        if x0 is not None:
+            guess = x0[:, ii]
+
+        elif len(qs):
+            coefs = nm.dot(nm.array(qs).conj(), vec)
+            guess = nm.dot(coefs, nm.array(zs))
+
+        else:
+            guess = None
+
+        sol[:, ii], _n_iter = solve(vec, guess)
+        n_iter += _n_iter
+
+        if x0 is None:
+            vz = sol[:, ii].copy()
+            vq = mtx.dot(vz)
+            norm0 = nm.linalg.norm(vq)
+            for zz, qq in zip(zs, qs):
+                coef = nm.vdot(qq, vq)
+                vq -= coef * qq
+                vz -= coef * zz
+
+            norm = nm.linalg.norm(vq)
+            if norm > 1e-12 * norm0:
+                qs.append(vq / norm)
+                zs.append(vz / norm)
+
+    return sol, n_iter
+
+class KrylovRecycler(Struct):
+    """
+    Deflation of a small subspace that is recycled between consecutive solves
+    of slowly varying linear systems by an iterative solver.
+
+    The recycled space :math:`U` is spanned by the approximate eigenvectors
+    (Ritz vectors) corresponding to the eigenvalues of the smallest magnitude,
+    extracted from the search directions of the previous solves. With :math:`C
+    = A U` and :math:`W^H C = I`, where :math:`W = U` for symmetric positive
+    definite matrices and :math:`W = C` otherwise, the solution is split as
+    :math:`x = U W^H b + (I - U W^H A) y`, where :math:`y` solves the deflated
+    system :math:`P A y = P b`, :math:`P = I - C W^H`. The residual of the
+    deflated system is equal to the residual of the original system, so the
+    solver tolerances apply without change.
+
+    Each iteration of the deflated system costs additional :math:`O(n k)`
+    operations for :math:`n` DOFs and the recycled space dimension :math:`k`,
+    so that the recycling pays off when the iterations are expensive, for
+    example with incomplete factorization preconditioners.
+
+    Parameters
+    ----------
+    n_vec : int
+        The dimension of the recycled space.
+    n_collect : int, optional
+        The number of the first search directions of each solve used for the
+        recycled space update. By default, `4 * n_vec`.
+    symmetric : bool
+        If True, the matrices are assumed to be symmetric (Hermitian) positive
+        definite.
+    """
+
+    def __init__(self, n_vec, n_collect=None, symmetric=False):
+        n_collect = get_default(n_collect, 4 * n_vec)
+        Struct.__init__(self, n_vec=n_vec, n_collect=n_collect,
+                        symmetric=symmetric, space=None, dirs=[], last=None)
+
+    def get_deflation(self, mtx):
+        """
+        Get the recycled space :math:`U` and :math:`C = A U` normalized for the
+        matrix `mtx`, or (None, None), if there is no compatible space.
+        """
+        uu = self.space
+        if (uu is None) or (uu.shape[0] != mtx.shape[0]):
+            return None, None
+
+        cc = mtx.dot(uu)
+        try:
+            if self.symmetric:
+                gg = nm.dot(uu.T.conj(), cc)
+                ll = nm.linalg.cholesky(0.5 * (gg + gg.T.conj()))
+                tt = nm.linalg.inv(ll).T.conj()
+
+            else:
+                rr = nm.linalg.qr(cc, mode='r')
+                tt = nm.linalg.inv(rr)
+
+        except nm.linalg.LinAlgError:
+            self.space = None
+            return None, None
+
+        return nm.dot(uu, tt), nm.dot(cc, tt)
+
+    def collect(self, sol):
+        """
+        Collect the search direction given by the difference of the current
+        iterate `sol` and the previous one.
+        """
+        if (self.last is None) or (len(self.dirs) >= self.n_collect):
+            return
+
+        vec = sol - self.last
+        norm = nm.linalg.norm(vec)
+        if norm > 0.0:
+            self.dirs.append(vec / norm)
+
+        self.last = sol.copy()
+
+    def update(self, mtx, uu, cc):
+        """
+        Update the recycled space using the collected search directions and
+        the current space :math:`U`, :math:`C = A U`.
+        """
+        dirs, self.dirs, self.last = self.dirs, [], None
+        if not len(dirs):
+            return
+
+        vv = nm.array(dirs).T
+        avv = mtx.dot(vv)
+        if uu is not None:
+            vv = nm.c_[uu, vv]
+            avv = nm.c_[cc, avv]
+
+        qq, rr = nm.linalg.qr(vv)
+        diag = nm.abs(rr.diagonal())
+        ii = nm.where(diag > 1e-10 * diag.max())[0]
+        if len(ii) < len(diag):
+            qq, rr = nm.linalg.qr(vv[:, ii])
+            avv = avv[:, ii]
+
+        avv = nm.dot(avv, nm.linalg.inv(rr))
+
+        gg = nm.dot(qq.T.conj(), avv)
+        if self.symmetric:
+            vals, vecs = nm.linalg.eigh(0.5 * (gg + gg.T.conj()))
+
+        else:
+            vals, vecs = nm.linalg.eig(gg)
+
+        ii = nm.argsort(nm.abs(vals))
+        uu = nm.dot(qq, vecs[:, ii])
+        if nm.iscomplexobj(uu) and not nm.iscomplexobj(vv):
+            uu = nm.c_[uu.real, uu.imag]
+            qq, rr = nm.linalg.qr(uu)
+            diag = nm.abs(rr.diagonal())
+            uu = qq[:, diag > 1e-10 * diag.max()]
+
+        self.space = uu[:, :self.n_vec]
+
+    def __call__(self, solve, mtx, rhs, x0=None):
+        """
+        Solve the system `mtx` x = `rhs` using the function `solve(rhs, x0,
+        mtx)` applied to the deflated system, and update the recycled space.
+
+        The function has to call :func:`KrylovRecycler.collect()` with the
+        current iterate in each iteration for the space to be updated from
+        the search directions.
+        """
+        from scipy.sparse.linalg import LinearOperator
+
+        uu, cc = self.get_deflation(mtx)
+
+        self.dirs = []
+        self.last = nm.zeros_like(rhs) if x0 is None else x0.copy()
+        if uu is None:
+            sol, n_iter = solve(rhs, x0, mtx)
+            self.collect(sol)
+            self.update(mtx, uu, cc)
+
+            return sol, n_iter
+
+        ww = uu if self.symmetric else cc
+        wh = nm.ascontiguousarray(ww.T.conj())
+
+        def matvec(vec):
+            avec = mtx.dot(vec)
+            return avec - nm.dot(cc, nm.dot(wh, avec))
+
+        dtype = nm.result_type(mtx.dtype, rhs.dtype)
+        op = LinearOperator(mtx.shape, matvec=matvec, dtype=dtype)
+
+        prhs = rhs - nm.dot(cc, nm.dot(wh, rhs))
+        psol, n_iter = solve(prhs, x0, op)
+        self.collect(psol)
+
+        sol = nm.dot(uu, nm.dot(wh, rhs - mtx.dot(psol))) + psol
+
+        self.update(mtx, uu, cc)
+
+        return sol, n_iter
+
+
 class ScipyIterative(LinearSolver):
     """
     Interface to SciPy iterative solvers.
 
     The `eps_r` tolerance is both absolute and relative - the solvers
     stop when either the relative or the absolute residual is below it.
+
+    Multiple right-hand sides can be passed as columns of a 2D array, see
+    :func:`solve_multiple_rhs()`. The preconditioner is shared by all of
+    them.
+
+    The matrix can be a `scipy.sparse.linalg.LinearOperator`, for example
+    :class:`MatrixFreeOperator <sfepy.discrete.evaluate.MatrixFreeOperator>`.
+    Then only the 'jacobi' built-in preconditioner can be used, provided the
+    operator has the `diagonal()` method.
     """
     name = 'ls.scipy_iterative'
 
@@ -252,6 +721,41 @@ class ScipyIterative(LinearSolver):
             matrix, context is a user-supplied context, and should return one
             of {sparse matrix, dense matrix, LinearOperator}.
          """),
+        ('precond', "{'jacobi', 'block_jacobi', 'ilu', 'field_split', None}",
+         None, False,
+         """The built-in preconditioner. If given, it is used instead of
+            `setup_precond`. The 'block_jacobi' preconditioner inverts the
+            diagonal blocks of DOFs of the same node, the 'field_split'
+            preconditioner applies `sub_precond` to the diagonal blocks of
+            variables given by :func:`ScipyIterative.set_field_split()` or
+            by the state variables of the problem passed as the context.
+         """),
+        ('sub_precond', "{'lu', 'ilu', 'jacobi'}", 'ilu', False,
+         'The preconditioner of the field blocks of the field split.'),
+        ('precond_kwargs', 'dict', {}, False,
+         """Additional arguments of the built-in preconditioners: `block_size`
+            of 'block_jacobi' (otherwise the nodes are taken from the
+            context), `drop_tol`, `fill_factor` etc. of 'ilu' and of the
+            'ilu' field split sub-preconditioner.
+         """),
+        ('precond_rebuild', 'int', 1, False,
+         """The preconditioner is rebuilt every `precond_rebuild` solves, or
+            only when the matrix shape changes or due to `precond_iter_factor`,
+            if 0.
+         """),
+        ('precond_iter_factor', 'float', None, False,
+         """If given, the preconditioner is rebuilt before the next solve,
+            when the number of iterations exceeds `precond_iter_factor` times
+            the number of iterations of the first solve with the current
+            preconditioner.
+         """),
+        ('recycle', 'int', 0, False,
+         """If > 0, the dimension of the subspace recycled between consecutive
+            solves, see :class:`KrylovRecycler`. The space is built from the
+            iterates, so the methods that pass a residual to the callback
+            only use the solution of each solve. The 'cg' method matrices
+            are assumed to be symmetric positive definite.
+         """),
         ('callback', 'callable', None, False,
          """User-supplied function to call after each iteration. It is called
             as callback(xk), where xk is the current solution vector, except
@@ -288,6 +792,113 @@ class ScipyIterative(LinearSolver):
             1 : 'number of iterations',
             -1 : 'illegal input or breakdown',
         }
+        self.fields = None
+        self.precond = None
+        self.precond_shape = None
+        self.precond_n_solve = 0
+        self.precond_n_iter0 = 0
+        self.precond_expired = False
+
+        if self.conf.recycle > 0:
+            self.recycler = KrylovRecycler(self.conf.recycle,
+                                           symmetric=self.conf.method == 'cg')
+
+        else:
+            self.recycler = None
+
+    def set_field_split(self, field_ranges, **kwargs):
+        """
+        Set the ranges of fields to be used with the 'field_split'
+        preconditioner.
+        """
+        self.fields = field_ranges
+        self.precond_expired = True
+
+    def create_precond(self, mtx, conf, context=None):
+        """
+        Create the built-in preconditioner `conf.precond` of `mtx`.
+        """
+        kwargs = get_default(conf.precond_kwargs, {}).copy()
+
+        if conf.precond == 'jacobi':
+            precond = create_jacobi_precond(mtx)
+
+        elif conf.precond == 'block_jacobi':
+            block_size = kwargs.get('block_size')
+            if block_size is not None:
+                blocks = nm.arange(mtx.shape[0]) // block_size
+
+            else:
+                variables = getattr(getattr(context, 'equations', None),
+                                    'variables', None)
+                if variables is None:
+                    raise ValueError('block_jacobi preconditioner requires'
+                                     ' block_size or a problem context!')
+                blocks = get_dof_blocks(variables, mtx.shape[0])
+                if blocks is None:
+                    raise ValueError('matrix rows do not correspond to DOFs'
+                                     ' - set block_size!')
+
+            precond = create_block_jacobi_precond(mtx, blocks)
+
+        elif conf.precond == 'ilu':
+            kwargs.pop('block_size', None)
+            precond = create_ilu_precond(mtx, **kwargs)
+
+        elif conf.precond == 'field_split':
+            kwargs.pop('block_size', None)
+            fields = self.fields
+            if fields is None:
+                variables = getattr(getattr(context, 'equations', None),
+                                    'variables', None)
+                if variables is None:
+                    raise ValueError('field_split preconditioner requires'
+                                     ' field ranges or a problem context!')
+                fields = variables.adi.indx
+
+            precond = create_field_split_precond(mtx, fields,
+                                                 sub_precond=conf.sub_precond,
+                                                 **kwargs)
+
+        else:
+            raise ValueError('unknown preconditioner! (%s)' % conf.precond)
+
+        return precond
+
+    def get_precond(self, mtx, conf, setup_precond, context=None):
+        """
+        Get the preconditioner of `mtx`, rebuilding it according to the
+        `precond_rebuild` and `precond_iter_factor` parameters.
+        """
+        rebuild = (self.precond_expired
+                   or (self.precond_shape != mtx.shape)
+                   or ((conf.precond_rebuild > 0)
+                       and (self.precond_n_solve >= conf.precond_rebuild)))
+        if rebuild:
+            timer = Timer(start=True)
+            if conf.precond is not None:
+                self.precond = self.create_precond(mtx, conf, context=context)
+
+            else:
+                self.precond = setup_precond(mtx, context)
+
+            self.precond_shape = mtx.shape
+            self.precond_n_solve = 0
+            self.precond_expired = False
+            output('%s: preconditioner setup: %.2f [s]'
+                   % (self.conf.name, timer.stop()), verbose=conf.verbose > 1)
+
+        return self.precond
+
+    def _update_precond_stats(self, n_iter, conf):
+        self.precond_n_solve += 1
+        if self.precond_n_solve == 1:
+            self.precond_n_iter0 = n_iter
+
+        elif ((conf.precond_iter_factor is not None)
+              and (n_iter > conf.precond_iter_factor
+                   * max(self.precond_n_iter0, 1))):
+            self.precond_expired = True
 
     @standard_call
     def __call__(self, rhs, x0=None, conf=None, eps_a=None, eps_r=None,
@@ -303,25 +914,7 @@ class ScipyIterative(LinearSolver):
         callback = get_default(kwargs.get('callback', lambda sol: None),
                                self.conf.callback)
 
-        self.iter = 0
-        def iter_callback(sol):
-            self.iter += 1
-            msg = '%s: iteration %d' % (self.conf.name, self.iter)
-            if conf.verbose > 2:
-                if conf.method not in self._callbacks_res:
-                    res = mtx * sol - rhs
-
-                else:
-                    res = sol
-
-                rnorm = nm.linalg.norm(res)
-                msg += ': |Ax-b| = %e' % rnorm
-            output(msg, verbose=conf.verbose > 1)
-
-            # Call an optional user-defined callback.
-            callback(sol)
-
-        precond = setup_precond(mtx, context)
+        precond = self.get_precond(mtx, conf, setup_precond, context=context)
 
         if conf.method == 'qmr':
             prec_args = {'M1' : precond, 'M2' : precond}
@@ -331,21 +924,59 @@ class ScipyIterative(LinearSolver):
 
         solver_kwargs.update(prec_args)
 
-        try:
-            sol, info = self.solver(mtx, rhs, x0=x0, atol=eps_a, tol=eps_r,
-                                    maxiter=i_max, callback=iter_callback,
-                                    **solver_kwargs)
-        except TypeError:
-            sol, info = self.solver(mtx, rhs, x0=x0, tol=eps_r,
-                                    maxiter=i_max, callback=iter_callback,
-                                    **solver_kwargs)
+        collect = ((self.recycler is not None)
+                   and (conf.method not in self._callbacks_res))
 
-        output('%s: %s convergence: %s (%s, %d iterations)'
-               % (self.conf.name, self.conf.method,
-                  info, self.converged_reasons[nm.sign(info)], self.iter),
-               verbose=conf.verbose)
+        def solve(rhs, x0, mtx=mtx):
+            self.iter = 0
+            def iter_callback(sol):
+                self.iter += 1
+                if collect:
+                    self.recycler.collect(sol)
 
-        return sol, self.iter
+                msg = '%s: iteration %d' % (self.conf.name, self.iter)
+                if conf.verbose > 2:
+                    if conf.method not in self._callbacks_res:
+                        res = mtx * sol - rhs
+
+                    else:
+                        res = sol
+
+                    rnorm = nm.linalg.norm(res)
+                    msg += ': |Ax-b| = %e' % rnorm
+                output(msg, verbose=conf.verbose > 1)
+
+                # Call an optional user-defined callback.
+                callback(sol)
+
+            try:
+                sol, info = self.solver(mtx, rhs, x0=x0, atol=eps_a,
+                                        tol=eps_r, maxiter=i_max,
+                                        callback=iter_callback,
+                                        **solver_kwargs)
+            except TypeError:
+                sol, info = self.solver(mtx, rhs, x0=x0, tol=eps_r,
+                                        maxiter=i_max, callback=iter_callback,
+                                        **solver_kwargs)
+
+            output('%s: %s convergence: %s (%s, %d iterations)'
+                   % (self.conf.name, self.conf.method,
+                      info, self.converged_reasons[nm.sign(info)], self.iter),
+                   verbose=conf.verbose)
+
+            self._update_precond_stats(self.iter, conf)
+
+            return sol, self.iter
+
+        if self.recycler is not None:
+            _solve = solve
+            solve = lambda rhs, x0: self.recycler(_solve, mtx, rhs, x0)
+
+        if rhs.ndim == 2:
+            return solve_multiple_rhs(solve, mtx, rhs, x0=x0)
+
+        else:
+            return solve(rhs, x0)
 
 class PyAMGSolver(LinearSolver):
     """
@@ -374,6 +1005,26 @@ class PyAMGSolver(LinearSolver):
         ('force_reuse', 'bool', False, False,
          """If True, skip the check whether the MG solver object corresponds
             to the `mtx` argument: it is always reused."""),
+        ('reuse_hierarchy', 'bool', False, False,
+         """If True, a new matrix with the same sparsity pattern does not
+            trigger the full MG setup: the aggregation, prolongators and
+            restrictors of the last full setup are kept, and only the
+            Galerkin coarse level matrices, the smoothers and the coarse
+            solver are recomputed."""),
+        ('rebuild_iter_factor', 'float', 2.0, False,
+         """With `reuse_hierarchy`, the full MG setup is done before the next
+            solve, when the number of iterations exceeds
+            `rebuild_iter_factor` times the number of iterations of the first
+            solve after the last full setup."""),
+        ('rebuild_every', 'int', 0, False,
+         """With `reuse_hierarchy`, if greater than zero, the full MG setup is
+            done after `rebuild_every` numeric-only setups."""),
+        ('near_null_space', "{'auto', None}", 'auto', False,
+         """If 'auto' and the `method` accepts the near null space vectors
+            `B` that are not given by the 'method:B' parameter, compute them
+            using :func:`get_near_null_space()` from the state variables of
+            the problem passed as the context: the rigid body modes for
+            displacement-like variables."""),
         ('*', '*', None, False,
          """Additional parameters supported by the method. Use the 'method:'
             prefix for arguments of the method construction function
@@ -392,7 +1043,9 @@ class PyAMGSolver(LinearSolver):
             msg =  'cannot import pyamg!'
             raise ImportError(msg)
 
-        LinearSolver.__init__(self, conf, mg=None, **kwargs)
+        LinearSolver.__init__(self, conf, mg=None, pattern_digest=None,
+                              n_resetup=0, n_iter0=None, mg_expired=False,
+                              **kwargs)
 
         try:
             solver = getattr(pyamg, self.conf.method)
@@ -402,9 +1055,64 @@ class PyAMGSolver(LinearSolver):
             solver = pyamg.smoothed_aggregation_solver
         self.solver = solver
 
+    def get_near_null_space(self, mtx, context=None):
+        """
+        Get the near null space vectors of `mtx` from the state variables of
+        the problem `context`, if the `method` supports them.
+        """
+        import inspect
+
+        if 'B' not in inspect.signature(self.solver).parameters:
+            return None
+
+        variables = getattr(getattr(context, 'equations', None),
+                            'variables', None)
+        if variables is None:
+            return None
+
+        modes = get_near_null_space(variables, mtx.shape[0])
+        if modes is None:
+            output('%s: cannot determine near null space - using default!'
+                   % self.conf.name)
+
+        return modes
+
+    def resetup(self, mtx, method_kwargs):
+        """
+        Numeric-only setup of the MG hierarchy for the new matrix `mtx`
+        with the sparsity pattern of the matrix of the last full setup: the
+        level matrices are recomputed as the Galerkin products with the
+        stored prolongators and restrictors, and the smoothers and the coarse
+        solver are set up again.
+        """
+        import inspect
+        from pyamg import coarse_grid_solver
+        from pyamg.relaxation.smoothing import change_smoothers
+
+        levels = self.mg.levels
+        levels[0].A = mtx
+        for ii in range(len(levels) - 1):
+            lev = levels[ii]
+            levels[ii + 1].A = lev.R * lev.A * lev.P
+
+        params = inspect.signature(self.solver).parameters
+        smoothers = {}
+        for key in ['presmoother', 'postsmoother']:
+            if key in method_kwargs:
+                smoothers[key] = method_kwargs[key]
+
+            else:
+                smoothers[key] = params[key].default
+
+        change_smoothers(self.mg, smoothers['presmoother'],
+                         smoothers['postsmoother'])
+        self.mg.coarse_solver = coarse_grid_solver(
+            method_kwargs.get('coarse_solver', 'pinv')
+        )
+
     @standard_call
     def __call__(self, rhs, x0=None, conf=None, eps_a=None, eps_r=None,
-                 i_max=None, mtx=None, status=None, **kwargs):
+                 i_max=None, mtx=None, status=None, context=None, **kwargs):
         solver_kwargs = self.build_solver_kwargs(conf)
 
         eps_r = get_default(eps_r, self.conf.eps_r)
@@ -433,11 +1141,41 @@ class PyAMGSolver(LinearSolver):
 
         is_new, mtx_digest = _is_new_matrix(mtx, self.mtx_digest,
                                             force_reuse=conf.force_reuse)
-        if is_new or (self.mg is None):
+        if is_new or (self.mg is None) or self.mg_expired:
             _kwargs = {key[7:] : val
                        for key, val in six.iteritems(solver_kwargs)
                        if key.startswith('method:')}
-            self.mg = self.solver(mtx, **_kwargs)
+
+            full = True
+            if conf.reuse_hierarchy and (self.mg is not None):
+                new_pattern, pattern_digest = _is_new_pattern(
+                    mtx, self.pattern_digest
+                )
+                full = (new_pattern or self.mg_expired
+                        or ((conf.rebuild_every > 0)
+                            and (self.n_resetup >= conf.rebuild_every)))
+
+            timer = Timer(start=True)
+            if full:
+                if (conf.near_null_space == 'auto') and ('B' not in _kwargs):
+                    modes = self.get_near_null_space(mtx, context=context)
+                    if modes is not None:
+                        _kwargs['B'] = modes
+
+                self.mg = self.solver(mtx, **_kwargs)
+                if conf.reuse_hierarchy:
+                    self.pattern_digest = _is_new_pattern(mtx, None)[1]
+                self.n_resetup = 0
+                self.n_iter0 = None
+                self.mg_expired = False
+
+            else:
+                self.resetup(mtx, _kwargs)
+                self.n_resetup += 1
+
+            output('%s: %s MG setup: %.2f [s]'
+                   % (self.conf.name, 'full' if full else 'numeric-only',
+                      timer.stop()), verbose=conf.verbose > 1)
             self.mtx_digest = mtx_digest
 
         _kwargs = {key[6:] : val
@@ -447,6 +1185,16 @@ class PyAMGSolver(LinearSolver):
                             maxiter=i_max, callback=iter_callback,
                             **_kwargs)
 
+        if conf.reuse_hierarchy and not conf.force_reuse:
+            if self.n_iter0 is None:
+                self.n_iter0 = self.iter
+
+            elif ((self.n_resetup > 0) and
+                  (self.iter > conf.rebuild_iter_factor
+                   * max(self.n_iter0, 1))):
+                # Only a numeric-only setup can be out of date.
+                self.mg_expired = True
+
         return sol, self.iter
 
 class PyAMGKrylovSolver(LinearSolver):
@@ -548,6 +1296,24 @@ class PyAMGKrylovSolver(LinearSolver):
 
         return sol, self.iter
 
+class PETScLinearOperator(object):
+    """
+    The context of a PETSc shell matrix applying a
+    `scipy.sparse.linalg.LinearOperator` in serial runs. The diagonal is
+    available, if the operator has the `diagonal()` method, for example
+    :class:`MatrixFreeOperator
+    <sfepy.discrete.evaluate.MatrixFreeOperator>`.
+    """
+
+    def __init__(self, op):
+        self.op = op
+
+    def mult(self, mat, x, y):
+        y[...] = self.op.matvec(x[...])
+
+    def getDiagonal(self, mat, d):
+        d[...] = self.op.diagonal()
+
 class PETScKrylovSolver(LinearSolver):
     """
     PETSc Krylov subspace solver.
@@ -556,7 +1322,11 @@ class PETScKrylovSolver(LinearSolver):
     argument of :func:`PETScKrylovSolver.__init__()`) and allows passing in
     PETSc matrices and vectors. Returns a (global) PETSc solution vector
     instead of a (local) numpy array, when given a PETSc right-hand side
-    vector.
+    vector. Multiple right-hand sides can be passed as columns of a 2D numpy
+    array - the KSP object is then reused for all of them. A
+    `scipy.sparse.linalg.LinearOperator` matrix is wrapped into a PETSc shell
+    matrix, that supports only preconditioners not requiring the matrix
+    entries, such as 'jacobi' or 'none'.
 
     The solver and preconditioner types are set upon the solver object
     creation. Tolerances can be overridden when called by passing a `conf`
@@ -596,6 +1366,12 @@ class PETScKrylovSolver(LinearSolver):
         ('force_reuse', 'bool', False, False,
          """If True, skip the check whether the KSP solver object corresponds
             to the `mtx` argument: it is always reused."""),
+        ('recycle', 'int', 0, False,
+         """If > 0, the KSP solver object is kept when the matrix changes and
+            the initial guess of each solve is the Galerkin projection onto a
+            subspace of this dimension, built from the previous solutions by
+            the proper orthogonal decomposition (PETSc KSPGuess 'pod').
+         """),
         ('*', '*', None, False,
          """Additional parameters supported by the method. Can be used to pass
             all PETSc options supported by :func:`petsc.Options()`."""),
@@ -642,6 +1418,10 @@ class PETScKrylovSolver(LinearSolver):
         optDB = self.petsc.Options()
 
         optDB['sub_pc_type'] = self.conf.sub_precond
+        if self.conf.recycle > 0:
+            optDB['ksp_guess_type'] = 'pod'
+            optDB['ksp_guess_pod_size'] = self.conf.recycle
+
         if options is not None:
             for key, val in six.iteritems(options):
                 optDB[key] = val
@@ -673,9 +1453,17 @@ class PETScKrylovSolver(LinearSolver):
         return ksp
 
     def create_petsc_matrix(self, mtx, comm=None):
+        from scipy.sparse.linalg import LinearOperator
+
         if isinstance(mtx, self.petsc.Mat):
             pmtx = mtx
 
+        elif isinstance(mtx, LinearOperator):
+            pmtx = self.petsc.Mat()
+            pmtx.createPython(mtx.shape, context=PETScLinearOperator(mtx),
+                              comm=comm)
+            pmtx.setUp()
+
         else:
             mtx = sps.csr_matrix(mtx)
 
@@ -705,7 +1493,13 @@ class PETScKrylovSolver(LinearSolver):
         else:
             pmtx = self.create_petsc_matrix(mtx, comm=comm)
 
-            ksp = self.create_ksp(options=solver_kwargs, comm=comm)
+            if ((conf.recycle > 0) and (self.ksp is not None)
+                and (self.pmtx.getSize() == pmtx.getSize())):
+                ksp = self.ksp
+
+            else:
+                ksp = self.create_ksp(options=solver_kwargs, comm=comm)
+
             ksp.setOperators(pmtx)
             ksp.setTolerances(atol=eps_a, rtol=eps_r, divtol=eps_d,
                               max_it=i_max)
@@ -719,6 +1513,17 @@ class PETScKrylovSolver(LinearSolver):
             self.ksp = ksp
             self.pmtx = pmtx
 
+        if isinstance(rhs, self.petsc.Vec) or (rhs.ndim == 1):
+            return self._solve(ksp, pmtx, rhs, x0, conf)
+
+        sol = nm.empty(rhs.shape, dtype=rhs.dtype)
+        for ii in range(rhs.shape[1]):
+            sol[:, ii] = self._solve(ksp, pmtx, rhs[:, ii],
+                                     None if x0 is None else x0[:, ii], conf)
+
+        return sol
+
+    def _solve(self, ksp, pmtx, rhs, x0, conf):
         if isinstance(rhs, self.petsc.Vec):
             prhs = rhs
 
@@ -774,13 +1579,14 @@ class MUMPSSolver(LinearSolver):
         import sfepy.solvers.ls_mumps as mumps
 
         self.mumps_ls = None
-        if not mumps.use_mpi:
+        if not mumps.is_mpi_available():
             raise AttributeError('No mpi4py found! Required by MUMPS solver.')
 
         mumps.load_mumps_libraries()  # try to load MUMPS libraries
 
         LinearSolver.__init__(self, conf, mumps=mumps, mumps_ls=None,
-                              mumps_presolved=False, **kwargs)
+                              mumps_presolved=False, pattern_digest=None,
+                              **kwargs)
 
     @standard_call
     def __call__(self, rhs, x0=None, conf=None, eps_a=None, eps_r=None,
@@ -788,14 +1594,24 @@ class MUMPSSolver(LinearSolver):
         if not self.mumps_presolved:
             self.presolve(mtx, presolve_flag=conf.use_presolve)
 
-        out = rhs.copy()
+        out = nm.array(rhs, order='F')
         self.mumps_ls.set_rhs(out)
         self.mumps_ls(3)  # solve
 
         return out
 
     def presolve(self, mtx, presolve_flag=False):
+        """
+        Factorize the matrix, if it has changed. The symbolic analysis is
+        performed only for the first matrix or when the sparsity pattern
+        changes, otherwise only the numeric factorization is performed.
+        """
         is_new, mtx_digest = _is_new_matrix(mtx, self.mtx_digest)
+        if not is_new:
+            return
+
+        is_new_pattern, pattern_digest = _is_new_pattern(mtx,
+                                                         self.pattern_digest)
         if not isinstance(mtx, sps.coo_matrix):
             mtx = mtx.tocoo()
         if self.mumps_ls is None:
@@ -806,16 +1622,19 @@ class MUMPSSolver(LinearSolver):
             self.mumps_ls = self.mumps.MumpsSolver(system=system,
                                                    is_sym=is_sym,
                                                    mem_relax=mem_relax)
+            is_new_pattern = True
 
-        if is_new:
-            if self.conf.verbose:
-                self.mumps_ls.set_verbose()
+        if self.conf.verbose:
+            self.mumps_ls.set_verbose()
 
-            self.mumps_ls.set_mtx_centralized(mtx)
-            self.mumps_ls(4)  # analyze + factorize
-            if presolve_flag:
-                self.mumps_presolved = True
-            self.mtx_digest = mtx_digest
+        self.mumps_ls.set_mtx_centralized(mtx)
+        if is_new_pattern:
+            self.mumps_ls(1)  # analyze
+        self.mumps_ls(2)  # factorize
+        if presolve_flag:
+            self.mumps_presolved = True
+        self.mtx_digest = mtx_digest
+        self.pattern_digest = pattern_digest
 
     def __del__(self):
         if self.mumps_ls is not None:
@@ -825,6 +1644,11 @@ class MUMPSSolver(LinearSolver):
 class MUMPSParallelSolver(LinearSolver):
     """
     Interface to MUMPS parallel solver.
+
+    A group of MPI worker processes is spawned on the first call and persists
+    until the solver is deleted. The matrix is sent to the workers, analyzed
+    and factorized only when it changes, so that repeated solves with the same
+    matrix cost only the triangular solves.
     """
     name = 'ls.mumps_par'
 
@@ -841,20 +1665,39 @@ class MUMPSParallelSolver(LinearSolver):
 
         LinearSolver.__init__(self, conf, mumps=mumps, mumps_ls=None,
                               number_of_cpu=multiprocessing.cpu_count(),
-                              mumps_presolved=False, **kwargs)
+                              mumps_presolved=False, mumps_comm=None,
+                              mumps_flags=None, pattern_digest=None,
+                              **kwargs)
 
-    @standard_call
-    def __call__(self, rhs, x0=None, conf=None, eps_a=None, eps_r=None,
-                 i_max=None, mtx=None, status=None, **kwargs):
+    def _start_workers(self):
         from mpi4py import MPI
         import sys
         from sfepy import data_dir
         import os.path as op
-        from tempfile import gettempdir
 
-        def tmpfile(fname):
-            return op.join(gettempdir(), fname)
+        mumps_call = op.join(data_dir, 'sfepy', 'solvers',
+                             'ls_mumps_parallel.py')
+        self.mumps_comm = MPI.COMM_SELF.Spawn(sys.executable,
+                                              args=[mumps_call],
+                                              maxprocs=self.number_of_cpu)
+
+    def _stop_workers(self):
+        if self.mumps_comm is not None:
+            from mpi4py import MPI
+
+            self.mumps_comm.bcast(('stop', None), root=MPI.ROOT)
+            self.mumps_comm.Disconnect()
+            self.mumps_comm = None
+
+    def _set_matrix(self, mtx):
+        from mpi4py import MPI
+
+        is_new, mtx_digest = _is_new_matrix(mtx, self.mtx_digest)
+        if not is_new:
+            return
 
+        is_new_pattern, pattern_digest = _is_new_pattern(mtx,
+                                                         self.pattern_digest)
         if not isinstance(mtx, sps.coo_matrix):
             mtx = mtx.tocoo()
 
@@ -864,37 +1707,57 @@ class MUMPSParallelSolver(LinearSolver):
             idxs = nm.where(cc >= rr)[0]  # upper triangular matrix
             rr, cc, data = rr[idxs], cc[idxs], data[idxs]
 
-        n = mtx.shape[0]
-        nz = rr.shape[0]
-        flags = nm.memmap(tmpfile('vals_flags.array'), dtype='int32',
-                          mode='w+', shape=(4,))
-        flags[0] = n
-        flags[1] = 1 if data.dtype.name.startswith('complex') else 0
-        flags[2] = int(is_sym)
-        flags[3] = int(self.conf.verbose)
-
-        idxs = nm.memmap(tmpfile('idxs.array'), dtype='int32',
-                         mode='w+', shape=(2, nz))
-        idxs[0, :] = rr
-        idxs[1, :] = cc
-
-        dtype = {0: 'float64', 1: 'complex128'}[flags[1]]
-        vals_mtx = nm.memmap(tmpfile('vals_mtx.array'), dtype=dtype,
-                             mode='w+', shape=(nz,))
-        vals_rhs = nm.memmap(tmpfile('vals_rhs.array'), dtype=dtype,
-                             mode='w+', shape=(n,))
-        vals_mtx[:] = data
-        vals_rhs[:] = rhs
+        flags = {
+            'n' : mtx.shape[0],
+            'nz' : rr.shape[0],
+            'is_complex' : int(data.dtype.name.startswith('complex')),
+            'is_sym' : int(is_sym),
+            'verbose' : int(self.conf.verbose),
+            'new_pattern' : is_new_pattern,
+        }
+        # The workers store the sparsity pattern together with the flags.
+        if self.mumps_comm is None:
+            self._start_workers()
+            flags['new_pattern'] = True
 
-        mumps_call = op.join(data_dir, 'sfepy', 'solvers',
-                             'ls_mumps_parallel.py')
-        comm = MPI.COMM_SELF.Spawn(sys.executable, args=[mumps_call],
-                                   maxprocs=self.number_of_cpu)
-        comm.Disconnect()
+        elif not flags['new_pattern']:
+            flags['new_pattern'] = ((flags['is_complex'], flags['is_sym'])
+                                    != self.mumps_flags)
 
-        out = nm.memmap(tmpfile('vals_x.array'), dtype=dtype, mode='r')
+        comm = self.mumps_comm
+        comm.bcast(('matrix', flags), root=MPI.ROOT)
+        if flags['new_pattern']:
+            comm.Send(nm.array([rr, cc], dtype=nm.int32), dest=0)
 
-        return out
+        dtype = 'complex128' if flags['is_complex'] else 'float64'
+        comm.Send(nm.ascontiguousarray(data, dtype=dtype), dest=0)
+
+        self.mumps_flags = (flags['is_complex'], flags['is_sym'])
+        self.mtx_digest = mtx_digest
+        self.pattern_digest = pattern_digest
+
+    @standard_call
+    def __call__(self, rhs, x0=None, conf=None, eps_a=None, eps_r=None,
+                 i_max=None, mtx=None, status=None, **kwargs):
+        from mpi4py import MPI
+
+        self._set_matrix(mtx)
+
+        dtype = 'complex128' if self.mumps_flags[0] else 'float64'
+        nrhs = rhs.shape[1] if rhs.ndim == 2 else 1
+        comm = self.mumps_comm
+        comm.bcast(('solve', {'n' : rhs.shape[0], 'nrhs' : nrhs}),
+                   root=MPI.ROOT)
+        # Multiple right-hand sides are sent by rows.
+        comm.Send(nm.ascontiguousarray(rhs.T, dtype=dtype), dest=0)
+
+        out = nm.empty(rhs.shape[::-1], dtype=dtype)
+        comm.Recv(out, source=0)
+
+        return out.T
+
+    def __del__(self):
+        self._stop_workers()
 
 
 class SchurMumps(MUMPSSolver):
@@ -908,30 +1771,64 @@ class SchurMumps(MUMPSSolver):
          'The list of Schur variables.'),
     ]
 
+    def __init__(self, conf, **kwargs):
+        MUMPSSolver.__init__(self, conf, schur_list=None, **kwargs)
+
+    def presolve(self, mtx, presolve_flag=False):
+        """
+        Do nothing: the factorization computing the Schur complement needs
+        the Schur variables of the problem passed as the context, so it is
+        performed when solving.
+        """
+        pass
+
     @standard_call
     def __call__(self, rhs, x0=None, conf=None, eps_a=None, eps_r=None,
                  i_max=None, mtx=None, status=None, **kwargs):
         import scipy.linalg as sla
 
-        if not isinstance(mtx, sps.coo_matrix):
-            mtx = mtx.tocoo()
-
-        system = 'complex' if mtx.dtype.name.startswith('complex') else 'real'
-        self.mumps_ls = self.mumps.MumpsSolver(system=system)
-
-        if self.conf.verbose:
-            self.mumps_ls.set_verbose()
-
         schur_list = []
         for schur_var in conf.schur_variables:
             slc = self.context.equations.variables.adi.indx[schur_var]
             schur_list.append(nm.arange(slc.start, slc.stop, slc.step, dtype='i'))
+        schur_list = nm.hstack(schur_list)
+
+        # Analyze only for a new sparsity pattern or Schur variables,
+        # factorize only for new matrix values.
+        is_new, mtx_digest = _is_new_matrix(mtx, self.mtx_digest)
+        if is_new:
+            is_new_pattern, pattern_digest = _is_new_pattern(
+                mtx, self.pattern_digest
+            )
+            if not isinstance(mtx, sps.coo_matrix):
+                mtx = mtx.tocoo()
+
+            if (is_new_pattern or (self.mumps_ls is None)
+                or (self.schur_list is None)
+                or not nm.array_equal(schur_list, self.schur_list)):
+                system = ('complex' if mtx.dtype.name.startswith('complex')
+                          else 'real')
+                self.mumps_ls = self.mumps.MumpsSolver(system=system)
+                job = 4
+
+            else:
+                job = 2
+
+            if self.conf.verbose:
+                self.mumps_ls.set_verbose()
+
+            self.mumps_ls.set_mtx_centralized(mtx)
+            self.mtx_digest = mtx_digest
+            self.pattern_digest = pattern_digest
+            self.schur_list = schur_list
+
+        else:
+            job = None
 
-        self.mumps_ls.set_mtx_centralized(mtx)
         out = rhs.copy()
         self.mumps_ls.set_rhs(out)
 
-        S, y2 = self.mumps_ls.get_schur(nm.hstack(schur_list))
+        S, y2 = self.mumps_ls.get_schur(schur_list, job=job)
         x2 = sla.solve(S.T, y2)  # solve the dense Schur system using scipy.linalg
 
         return self.mumps_ls.expand_schur(x2)
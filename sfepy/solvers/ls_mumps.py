@@ -1,14 +1,11 @@
 import ctypes
 import re
 import numpy as nm
-try:
-    from mpi4py import MPI
-    use_mpi = True
-except ImportError:
-    use_mpi = False
 
 AUX_LENGTH = 16 * 1024
 
+_use_mpi = None
+
 c_pointer = ctypes.POINTER
 
 mumps_int = ctypes.c_int
@@ -55,6 +52,26 @@ def load_mumps_libraries():
     mumps_libs['zmumps'] = load_library('zmumps').zmumps_c
 
 
+def is_mpi_available():
+    """
+    Return True if mpi4py can be imported. The import is done on the first
+    call only, so that importing this module does not initialize MPI.
+    """
+    global _use_mpi
+
+    if _use_mpi is None:
+        try:
+            from mpi4py import MPI
+
+        except ImportError:
+            _use_mpi = False
+
+        else:
+            _use_mpi = True
+
+    return _use_mpi
+
+
 def coo_is_symmetric(mtx, tol=1e-6):
     r, c = mtx.row, mtx.col
     odiag = nm.where(r != c)[0]
@@ -254,9 +271,11 @@ class MumpsSolver(object):
         """
         self.struct = None
 
-        if not use_mpi:
+        if not is_mpi_available():
             raise AttributeError('No mpi4py found! Required by MUMPS solver.')
 
+        from mpi4py import MPI
+
         if len(mumps_libs) == 0:
             load_mumps_libraries()
 
@@ -385,7 +404,19 @@ class MumpsSolver(object):
         self.struct.a = data.ctypes.data_as(mumps_pcomplex)
 
     def set_rhs(self, rhs):
-        """Set the right hand side of the linear system."""
+        """
+        Set the right hand side of the linear system. Multiple right hand
+        sides can be given as columns of a 2D array in the Fortran order.
+        """
+        if rhs.ndim == 2:
+            assert rhs.flags.f_contiguous
+            self.struct.nrhs = rhs.shape[1]
+
+        else:
+            self.struct.nrhs = 1
+
+        self.struct.lrhs = rhs.shape[0]
+
         self._data.update(rhs=rhs)
         self.struct.rhs = rhs.ctypes.data_as(mumps_pcomplex)
 
@@ -393,13 +424,19 @@ class MumpsSolver(object):
         """Set the job and call MUMPS."""
         self._mumps_call(job)
 
-    def get_schur(self, schur_list):
+    def get_schur(self, schur_list, job=4):
         """Get the Schur matrix and the condensed right-hand side vector.
 
         Parameters
         ----------
         schur_list : array
             The list of the Schur DOFs (indexing starts with 1).
+        job : 4, 2 or None
+            The MUMPS job computing the Schur matrix: 4 = analyze +
+            factorize, 2 = factorize only, if the sparsity pattern and
+            `schur_list` are the same as in the previous call. If None, the
+            Schur matrix of the previous call is reused and only the
+            right-hand side is condensed.
 
         Returns
         -------
@@ -408,29 +445,38 @@ class MumpsSolver(object):
         schur_rhs : array
             The reduced right-hand side vector. 
         """
-        # Schur
-        slist = schur_list + 1
-        schur_size = slist.shape[0]
-        schur_arr = nm.empty((schur_size**2, ), dtype='d')
-        schur_rhs = nm.empty((schur_size, ), dtype='d')
-        self._schur_rhs = schur_rhs
-
-        self.struct.size_schur = schur_size
-        self.struct.listvar_schur = slist.ctypes.data_as(mumps_pint)
-        self.struct.schur = schur_arr.ctypes.data_as(mumps_pcomplex)
-        self.struct.lredrhs = schur_size
-        self.struct.redrhs = schur_rhs.ctypes.data_as(mumps_pcomplex)
-
-        # get matrix
-        self.struct.schur_lld = schur_size
-        self.struct.nprow = 1
-        self.struct.npcol = 1
-        self.struct.mblock = 100
-        self.struct.nblock = 100
-
-        self.struct.icntl[18] = 3  # centr. Schur complement stored by columns
-        self.struct.job = 4  # analyze + factorize
-        self._mumps_c(ctypes.byref(self.struct))
+        if job == 4:
+            # Schur
+            slist = schur_list + 1
+            schur_size = slist.shape[0]
+            schur_arr = nm.empty((schur_size**2, ), dtype='d')
+            schur_rhs = nm.empty((schur_size, ), dtype='d')
+            self._schur_rhs = schur_rhs
+            self._data.update(schur_list=slist, schur_arr=schur_arr)
+
+            self.struct.size_schur = schur_size
+            self.struct.listvar_schur = slist.ctypes.data_as(mumps_pint)
+            self.struct.schur = schur_arr.ctypes.data_as(mumps_pcomplex)
+            self.struct.lredrhs = schur_size
+            self.struct.redrhs = schur_rhs.ctypes.data_as(mumps_pcomplex)
+
+            # get matrix
+            self.struct.schur_lld = schur_size
+            self.struct.nprow = 1
+            self.struct.npcol = 1
+            self.struct.mblock = 100
+            self.struct.nblock = 100
+
+            self.struct.icntl[18] = 3  # centr. Schur compl. stored by columns
+
+        else:
+            schur_arr = self._data['schur_arr']
+            schur_rhs = self._schur_rhs
+            schur_size = schur_rhs.shape[0]
+
+        if job is not None:
+            self.struct.job = job  # (analyze +) factorize
+            self._mumps_c(ctypes.byref(self.struct))
 
         # get RHS
         self.struct.icntl[25] = 1  # Reduction/condensation phase
@@ -1,48 +1,90 @@
+"""
+MUMPS parallel solver server.
+
+The script is spawned by :class:`MUMPSParallelSolver
+<sfepy.solvers.ls.MUMPSParallelSolver>` as a group of MPI processes, that
+persist between the linear solver calls. The commands and data are received
+from the parent process using the parent intercommunicator:
+
+- ('matrix', flags): set a new matrix. The row and column indices (if the
+  sparsity pattern changed) and the matrix values are then received by the
+  worker 0. The matrix is analyzed (if the sparsity pattern changed) and
+  factorized.
+- ('solve', flags): solve the system with the right-hand side(s) received by
+  the worker 0 using the current factorization, and send the solution back.
+  Multiple right-hand sides are sent as rows of a 2D array.
+- ('stop', None): finish.
+"""
 import numpy as nm
 from mpi4py import MPI
 import ls_mumps as mumps
-from tempfile import gettempdir
-import os.path as op
 
 
-def tmpfile(fname):
-    return op.join(gettempdir(), fname)
+def mumps_parallel_server(parent):
+    comm = MPI.COMM_WORLD
+
+    mumps_ls = None
+    while 1:
+        cmd, flags = parent.bcast(None, root=0)
 
+        if cmd == 'matrix':
+            dtype = {0: 'float64', 1: 'complex128'}[flags['is_complex']]
 
-def mumps_parallel_solve():
-    comm = MPI.COMM_WORLD
-    flags = nm.memmap(tmpfile('vals_flags.array'), dtype='int32', mode='r')
+            if flags['new_pattern']:
+                if mumps_ls is not None:
+                    del(mumps_ls)
+
+                mumps_ls = mumps.MumpsSolver(
+                    system={0: 'real', 1: 'complex'}[flags['is_complex']],
+                    is_sym=flags['is_sym'])
+
+                if flags['verbose']:
+                    mumps_ls.set_verbose()
+
+            if comm.rank == 0:
+                n, nz = flags['n'], flags['nz']
+                if flags['new_pattern']:
+                    idxs = nm.empty((2, nz), dtype='int32')
+                    parent.Recv(idxs, source=0)
+                    ir, ic = idxs
+
+                else:
+                    ir, ic = mumps_ls._data['ir'], mumps_ls._data['ic']
+
+                vals_mtx = nm.empty(nz, dtype=dtype)
+                parent.Recv(vals_mtx, source=0)
+
+                mumps_ls.set_rcd_centralized(ir, ic, vals_mtx, n)
 
-    mumps_ls = mumps.MumpsSolver(system={0: 'real', 1: 'complex'}[flags[1]],
-                                 is_sym=flags[2])
+            if flags['new_pattern']:
+                mumps_ls(1)  # analyse
+            mumps_ls(2)  # factorize
 
-    if flags[3]:
-        mumps_ls.set_verbose()
+        elif cmd == 'solve':
+            if comm.rank == 0:
+                nrhs = flags.get('nrhs', 1)
+                if nrhs > 1:
+                    x = nm.empty((nrhs, flags['n']), dtype=dtype)
 
-    if comm.rank == 0:
-        dtype = {0: 'float64', 1: 'complex128'}[flags[1]]
+                else:
+                    x = nm.empty(flags['n'], dtype=dtype)
 
-        vals_mtx = nm.memmap(tmpfile('vals_mtx.array'), dtype=dtype, mode='r')
-        vals_rhs = nm.memmap(tmpfile('vals_rhs.array'), dtype=dtype, mode='r')
-        idxs = nm.memmap(tmpfile('idxs.array'), dtype='int32',
-                         mode='r').reshape((2, vals_mtx.shape[0]))
+                parent.Recv(x, source=0)
+                mumps_ls.set_rhs(x.T)
 
-        mumps_ls.set_rcd_centralized(idxs[0, :], idxs[1, :], vals_mtx,
-                                     flags[0])
-        x = vals_rhs.copy()
-        mumps_ls.set_rhs(x)
+            mumps_ls(3)  # solve
 
-    mumps_ls(6)  # analyse, factorize, solve
+            if comm.rank == 0:
+                parent.Send(x, dest=0)
 
-    if comm.rank == 0:
-        vals_x = nm.memmap(tmpfile('vals_x.array'), dtype=dtype, mode='w+',
-                           shape=x.shape)
-        vals_x[:] = x
+        elif cmd == 'stop':
+            break
 
-    del(mumps_ls)
+    if mumps_ls is not None:
+        del(mumps_ls)
 
 
 if __name__ == '__main__':
     comm = MPI.Comm.Get_parent()
-    mumps_parallel_solve()
+    mumps_parallel_server(comm)
     comm.Disconnect()
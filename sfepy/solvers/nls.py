@@ -134,6 +134,12 @@ class Newton(NonlinearSolver):
          """If not None, the linear system solution tolerances are set in each
             nonlinear iteration relative to the current residual norm by the
             `lin_precision` factor. Ignored for direct linear solvers."""),
+        ('lin_x0', "'x', 'zero' or 'dx'", 'x', False,
+         r"""The initial guess for iterative linear solvers: the current
+            iterate :math:`x^i` ('x'), zero ('zero') or the previous
+            Newton step scaled by the ratio of the current and previous
+            residual norms ('dx'), i.e. :math:`\Delta x^{i-1} ||f(x^i)|| /
+            ||f(x^{i-1})||`, which is zero in the first iteration."""),
         ('ls_on', 'float', 0.99999, False,
          """Start the backtracking line-search by reducing the step, if
             :math:`||f(x^i)|| / ||f(x^{i-1})||` is larger than `ls_on`."""),
@@ -240,7 +246,7 @@ class Newton(NonlinearSolver):
             self.log.plot_vlines(color='r', linewidth=1.0)
 
         err = err0 = -1.0
-        err_last = -1.0
+        err_last = err_dx = -1.0
         it = 0
         ls_status = {}
         ls_n_iter = 0
@@ -345,10 +351,20 @@ class Newton(NonlinearSolver):
             if conf.verbose:
                 output('solving linear system...')
 
+            if conf.lin_x0 == 'x':
+                lin_x0 = vec_x
+
+            elif (conf.lin_x0 == 'dx') and (vec_dx is not None):
+                lin_x0 = (err / err_dx) * vec_dx
+
+            else:
+                lin_x0 = None
+
             timer.start()
-            vec_dx = lin_solver(vec_r, x0=vec_x,
+            vec_dx = lin_solver(vec_r, x0=lin_x0,
                                 eps_a=eps_a, eps_r=eps_r, mtx=mtx_a,
                                 status=ls_status)
+            err_dx = err
             ls_n_iter += ls_status['n_iter']
             time_stats['solve'] = timer.stop()
 
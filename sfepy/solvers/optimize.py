@@ -8,8 +8,6 @@ from sfepy.base.log import Log, get_logging_conf
 from sfepy.base.timing import Timer
 from sfepy.solvers.solvers import OptimizationSolver
 
-import scipy.optimize as sopt
-import scipy.optimize.linesearch as linesearch
 import six
 from six.moves import range
 
@@ -238,6 +236,9 @@ class FMinSteepestDescent(OptimizationSolver):
             of_prev_prev_bak = of_prev_prev
 
             if conf.ls and can_ls and conf.ls_method == 'full':
+                import scipy.optimize as sopt
+                import scipy.optimize.linesearch as linesearch
+
                 output('full linesearch...')
                 alpha, fc, gc, of_prev, of_prev_prev, ofg1 = \
                     linesearch.line_search(fn_of,fn_ofg,xit,
@@ -42,6 +42,22 @@ def standard_ts_call(call):
 
     return _standard_ts_call
 
+def extrapolate_solution(vecs, times, time):
+    """
+    Extrapolate the solution at `time` from the solutions `vecs` at `times`
+    using the Lagrange interpolation polynomial.
+    """
+    out = nm.zeros_like(vecs[-1])
+    for ii, (vec, ti) in enumerate(zip(vecs, times)):
+        coef = 1.0
+        for ij, tj in enumerate(times):
+            if ij != ii:
+                coef *= (time - tj) / (ti - tj)
+
+        out += coef * vec
+
+    return out
+
 #
 # General solvers.
 #
@@ -94,12 +110,19 @@ class SimpleTimeSteppingSolver(TimeSteppingSolver):
         ('quasistatic', 'bool', False, False,
          """If True, assume a quasistatic time-stepping. Then the non-linear
             solver is invoked also for the initial time."""),
+        ('extrapolate', 'int', 0, False,
+         """If > 0, the initial guess of the non-linear solver in each time
+            step is extrapolated from the solutions of up to `extrapolate` + 1
+            previous time steps by the Lagrange polynomial of the order
+            `extrapolate`. Otherwise, the previous time step solution is
+            used."""),
     ]
 
     def __init__(self, conf, nls=None, context=None, **kwargs):
         TimeSteppingSolver.__init__(self, conf, nls=nls, context=context,
                                     **kwargs)
         self.ts = TimeStepper.from_conf(self.conf)
+        self.history = []
 
         nd = self.ts.n_digit
         format = '====== time %%e (step %%%dd of %%%dd) =====' % (nd, nd)
@@ -122,6 +145,28 @@ class SimpleTimeSteppingSolver(TimeSteppingSolver):
     def solve_step(self, ts, nls, vec, prestep_fun=None):
         return nls(vec)
 
+    def extrapolate(self, ts, vec):
+        """
+        Return the initial guess of the non-linear solver at the time
+        `ts.time` extrapolated from the previous time step solutions, if the
+        `extrapolate` option is set and enough solutions are available.
+        Otherwise, return `vec`.
+        """
+        order = min(self.conf.extrapolate, len(self.history) - 1)
+        if order < 1:
+            return vec
+
+        times, vecs = zip(*self.history[-(order + 1):])
+        return extrapolate_solution(vecs, times, ts.time)
+
+    def store_solution(self, ts, vec):
+        """
+        Store the time step solution for the extrapolation.
+        """
+        if self.conf.extrapolate > 0:
+            self.history.append((ts.time, vec.copy()))
+            del self.history[:-(self.conf.extrapolate + 1)]
+
     def output_step_info(self, ts):
         output(self.format % (ts.time, ts.step + 1, ts.n_step),
                verbose=self.verbose)
@@ -137,6 +182,7 @@ class SimpleTimeSteppingSolver(TimeSteppingSolver):
 
         vec0 = init_fun(ts, vec0)
 
+        self.history = []
         self.output_step_info(ts)
         if ts.step == 0:
             prestep_fun(ts, vec0)
@@ -144,6 +190,7 @@ class SimpleTimeSteppingSolver(TimeSteppingSolver):
             vec = self.solve_step0(nls, vec0)
 
             poststep_fun(ts, vec)
+            self.store_solution(ts, vec)
             ts.advance()
 
         else:
@@ -152,11 +199,13 @@ class SimpleTimeSteppingSolver(TimeSteppingSolver):
         for step, time in ts.iter_from(ts.step):
             self.output_step_info(ts)
 
+            vec = self.extrapolate(ts, vec)
             prestep_fun(ts, vec)
 
             vect = self.solve_step(ts, nls, vec, prestep_fun)
 
             poststep_fun(ts, vect)
+            self.store_solution(ts, vect)
 
             vec = vect
 
@@ -311,6 +360,7 @@ class AdaptiveTimeSteppingSolver(SimpleTimeSteppingSolver):
             if is_break:
                 break
 
+            vec = self.extrapolate(ts, vec)
             prestep_fun(ts, vec)
 
         return vect
@@ -364,6 +364,7 @@ class Term(Struct):
         self._kwargs = kwargs
         self._integration = self.integration
         self.sign = 1.0
+        self.workspace = {}
 
         self.set_integral(integral)
 
@@ -377,6 +378,7 @@ class Term(Struct):
         out = self.copy(name=self.name)
 
         out.sign = mul * self.sign
+        out.workspace = {}
 
         return out
 
@@ -1311,9 +1313,45 @@ class Term(Struct):
 
         return status
 
+    def get_workspace(self, name, shape, dtype=nm.float64, reuse=True):
+        """
+        Get a work array for the term evaluation.
+
+        If `reuse` is True and the 'reuse_term_buffers' global option is set,
+        the array allocated in a previous call with the same `name`, `shape`
+        and `dtype` is returned, otherwise a new array is allocated. The
+        array contents are undefined.
+        """
+        if not (reuse and goptions['reuse_term_buffers']):
+            return nm.empty(shape, dtype=dtype)
+
+        key = (name, tuple(shape), nm.dtype(dtype).char)
+        out = self.workspace.get(key)
+        if out is None:
+            out = nm.empty(shape, dtype=dtype)
+            self.workspace[key] = out
+
+        return out
+
+    def clear_workspace(self):
+        """
+        Free the work arrays allocated by :func:`Term.get_workspace()`.
+        """
+        self.workspace = {}
+
     def eval_real(self, shape, fargs, mode='eval', term_mode=None,
-                  diff_var=None, **kwargs):
-        out = nm.empty(shape, dtype=nm.float64)
+                  diff_var=None, use_workspace=False, **kwargs):
+        """
+        Evaluate a real-valued term.
+
+        The output array is taken from the term workspace in 'eval' mode,
+        where the result is a new array summed over elements, and in other
+        modes if `use_workspace` is True. In the latter case, the returned
+        array is overwritten by the next evaluation and has to be used
+        (e.g. assembled) before.
+        """
+        reuse = (mode == 'eval') or use_workspace
+        out = self.get_workspace('out', shape, reuse=reuse)
 
         if mode == 'eval':
             status = self.call_function(out, fargs)
@@ -1327,33 +1365,49 @@ class Term(Struct):
             return out, status
 
     def eval_complex(self, shape, fargs, mode='eval', term_mode=None,
-                     diff_var=None, **kwargs):
-        rout = nm.empty(shape, dtype=nm.float64)
+                     diff_var=None, use_workspace=False, **kwargs):
+        """
+        Evaluate a complex-valued term.
+
+        The real-valued kernels are called for the individual combinations of
+        real and imaginary parts of arguments, and their results are written
+        directly into the real and imaginary parts of a single complex output
+        array. See :func:`Term.eval_real()` for the workspace use.
+        """
+        reuse = (mode == 'eval') or use_workspace
+        rout = self.get_workspace('rout', shape, reuse=reuse)
 
         fargsd = split_complex_args(fargs)
 
+        out = self.get_workspace('cout', shape, dtype=nm.complex128,
+                                 reuse=reuse)
+
         # Assuming linear forms. Then the matrix is the
         # same both for real and imaginary part.
         rstatus = self.call_function(rout, fargsd['r'])
+        out.real[...] = rout
         if (diff_var is None) and len(fargsd) >= 2:
-            iout = nm.empty(shape, dtype=nm.float64)
+            iout = self.get_workspace('iout', shape, reuse=reuse)
             istatus = self.call_function(iout, fargsd['i'])
 
             if mode == 'eval' and len(fargsd) >= 4:
-                irout = nm.empty(shape, dtype=nm.float64)
-                irstatus = self.call_function(irout, fargsd['ir'])
-                riout = nm.empty(shape, dtype=nm.float64)
-                ristatus = self.call_function(riout, fargsd['ri'])
+                out.real -= iout
+
+                # Reuse the work arrays of real and imaginary parts.
+                irstatus = self.call_function(rout, fargsd['ir'])
+                out.imag[...] = rout
+                ristatus = self.call_function(iout, fargsd['ri'])
+                out.imag += iout
 
-                out = (rout - iout) + (riout + irout) * 1j
                 status = rstatus or istatus or ristatus or irstatus
 
             else:
-                out = rout + 1j * iout
+                out.imag[...] = iout
                 status = rstatus or istatus
 
         else:
-            out, status = rout + 0j, rstatus
+            out.imag[...] = 0.0
+            status = rstatus
 
         if mode == 'eval':
             out1 = nm.sum(out, 0).squeeze()
@@ -1371,6 +1425,10 @@ class Term(Struct):
         ----------
         mode : 'eval' (default), or 'weak'
             The term evaluation mode.
+        use_workspace : bool, optional
+            If True, the 'weak' mode result is stored in a reused work array
+            of the term, see :func:`Term.eval_real()`. The result has to be
+            consumed (e.g. assembled) before the next term evaluation.
 
         Returns
         -------
@@ -1390,6 +1448,7 @@ class Term(Struct):
 
         kwargs = kwargs.copy()
         term_mode = kwargs.pop('term_mode', None)
+        use_workspace = kwargs.pop('use_workspace', False)
 
         if mode in ('eval', 'el_eval', 'el_avg', 'qp'):
             args = self.get_args(**kwargs)
@@ -1456,14 +1515,16 @@ class Term(Struct):
                 fargs = self.call_get_fargs(_args, kwargs)
 
                 if varr.dtype == nm.float64:
-                    vals, status = self.eval_real(shape, fargs, mode,
-                                                  term_mode,
-                                                  diff_var, **kwargs)
+                    vals, status = self.eval_real(
+                        shape, fargs, mode, term_mode, diff_var,
+                        use_workspace=use_workspace, **kwargs
+                    )
 
                 elif varr.dtype == nm.complex128:
-                    vals, status = self.eval_complex(shape, fargs, mode,
-                                                     term_mode,
-                                                     diff_var, **kwargs)
+                    vals, status = self.eval_complex(
+                        shape, fargs, mode, term_mode, diff_var,
+                        use_workspace=use_workspace, **kwargs
+                    )
 
                 else:
                     raise ValueError('unsupported term dtype! (%s)'
@@ -1491,6 +1552,21 @@ class Term(Struct):
 
         return out
 
+    def get_matrix_sign(self, svar):
+        """
+        Get the factor of the term matrix w.r.t. the state variable `svar`,
+        that is 1 / dt for time derivatives of `svar` and 1 otherwise.
+        """
+        sign = 1.0
+        if self.arg_derivatives[svar.name]:
+            if not self.is_quasistatic or (self.step > 0):
+                sign *= 1.0 / self.dt
+
+            else:
+                sign = 0.0
+
+        return sign
+
     def assemble_to(self, asm_obj, val, iels, mode='vector', diff_var=None):
         """
         Assemble the results of term evaluation.
@@ -1556,13 +1632,7 @@ class Term(Struct):
                 and (val.dtype == nm.float64)):
                 val = val.astype(nm.complex128)
 
-            sign = 1.0
-            if self.arg_derivatives[svar.name]:
-                if not self.is_quasistatic or (self.step > 0):
-                    sign *= 1.0 / self.dt
-
-                else:
-                    sign = 0.0
+            sign = self.get_matrix_sign(svar)
 
             if not isinstance(val, tuple):
                 rdc = vvar.get_dof_conn(dc_type)
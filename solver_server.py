@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Run a server solving many (short) simulations given by problem description
+files.
+
+The server keeps the imported modules and the domains read from mesh files
+between the jobs, and runs each job in a forked worker process. The jobs are
+read as JSON objects, one per line, from the standard input or from a UNIX
+socket. The results are written as JSON objects, one per line, in the order of
+job completion. See :mod:`sfepy.applications.solver_server` for the job and
+result formats.
+
+Examples
+--------
+
+$ echo '{"id" : 1, "conf" : "examples/diffusion/poisson.py"}' \\
+  | ./solver_server.py -n 2
+
+$ ./solver_server.py --socket /tmp/sfepy.sock -n 4
+"""
+from __future__ import absolute_import
+from argparse import ArgumentParser, RawDescriptionHelpFormatter
+
+import sfepy
+from sfepy.base.base import output
+from sfepy.applications.solver_server import SolverServer
+
+helps = {
+    'socket' :
+    'serve jobs from the given UNIX socket instead of the standard input',
+    'n_workers' :
+    'the maximum number of concurrently running jobs [default: %(default)s]',
+    'max_domains' :
+    'the maximum number of cached domains [default: %(default)s]',
+    'log' :
+    'log all server messages to specified file'
+    ' (existing file will be overwritten!)',
+    'quiet' :
+    'do not print any server messages to screen',
+}
+
+def main():
+    parser = ArgumentParser(description=__doc__,
+                            formatter_class=RawDescriptionHelpFormatter)
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s ' + sfepy.__version__)
+    parser.add_argument('--socket', metavar='path',
+                        action='store', dest='socket',
+                        default=None, help=helps['socket'])
+    parser.add_argument('-n', '--n-workers', metavar='int', type=int,
+                        action='store', dest='n_workers',
+                        default=1, help=helps['n_workers'])
+    parser.add_argument('--max-domains', metavar='int', type=int,
+                        action='store', dest='max_domains',
+                        default=16, help=helps['max_domains'])
+    parser.add_argument('--log', metavar='file',
+                        action='store', dest='log',
+                        default=None, help=helps['log'])
+    parser.add_argument('-q', '--quiet',
+                        action='store_true', dest='quiet',
+                        default=False, help=helps['quiet'])
+    options = parser.parse_args()
+
+    output.set_output(filename=options.log,
+                      quiet=options.quiet,
+                      combined=options.log is not None)
+
+    server = SolverServer(n_workers=options.n_workers,
+                          max_domains=options.max_domains)
+    if options.socket is not None:
+        server.serve_socket(options.socket)
+
+    else:
+        server.serve_stdin()
+
+if __name__ == '__main__':
+    main()
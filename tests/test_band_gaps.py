@@ -0,0 +1,186 @@
+from __future__ import absolute_import
+import numpy as nm
+
+from sfepy.base.testing import TestCommon
+
+input_name = '../examples/phononic/band_gaps.py'
+
+def _compare_gaps(gaps0, gaps1, atol):
+    for gap0, gap1 in zip(gaps0, gaps1):
+        if isinstance(gap0, list):
+            if not _compare_gaps(gap0, gap1, atol):
+                return False
+
+        else:
+            for (flag0, f0, v0), (flag1, f1, v1) in zip(gap0, gap1):
+                if ((flag0 != flag1)
+                    or not nm.allclose([f0, v0], [f1, v1],
+                                       atol=atol, rtol=0.0)):
+                    return False
+
+    return True
+
+class Test(TestCommon):
+
+    @staticmethod
+    def from_conf(conf, options):
+        from sfepy.base.base import Struct
+        from sfepy.homogenization.coefs_phononic import AcousticMassTensor
+
+        nm.random.seed(12345)
+
+        n_eig = 12
+        freqs = nm.arange(1, n_eig + 1) + 0.5 * nm.random.rand(n_eig)
+
+        mass = AcousticMassTensor('M', None, {})
+        mass.eigs = freqs**2
+        mass.eigenmomenta = nm.random.rand(n_eig, 2) - 0.5
+        mass.dv_info = Struct(average_density=1.0, total_volume=1.0)
+
+        freq_info = Struct(name='freq_info', freq_range=freqs,
+                           freq_range_margins=nm.r_[0.5, freqs, n_eig + 1.0])
+
+        mtx_b = nm.array([[2.0, 0.5], [0.5, 1.0]])
+
+        return Test(conf=conf, options=options, mass=mass,
+                    freq_info=freq_info, mtx_b=mtx_b)
+
+    def get_options(self, **kwargs):
+        from sfepy.homogenization.coefs_phononic import BandGaps
+
+        bg = BandGaps('band_gaps', None, {'options' : kwargs})
+        return bg.app_options
+
+    def test_batch(self):
+        """
+        Test that the batched eigenvalue tracing gives the same band gaps as
+        the serial one.
+        """
+        from sfepy.homogenization.coefs_phononic import detect_band_gaps
+
+        ok = True
+        for mtx_b in [None, self.mtx_b]:
+            results = []
+            for batch in [False, True]:
+                opts = self.get_options(batch=batch)
+                results.append(detect_band_gaps(self.mass, self.freq_info,
+                                                opts, mtx_b=mtx_b))
+
+            (logs0, gaps0, kinds0), (logs1, gaps1, kinds1) = results
+
+            _ok = kinds0 == kinds1
+            self.report('mtx_b: %s, same kinds: %s' % (mtx_b is not None, _ok))
+            ok = ok and _ok
+
+            _ok = _compare_gaps(gaps0, gaps1, 1e-6)
+            self.report('same gaps:', _ok)
+            ok = ok and _ok
+
+            # The logs differ only in the frequencies found by find_zero().
+            _ok = all(nm.allclose(eigs0[[0, -1]], eigs1[[0, -1]],
+                                  atol=1e-12 * nm.abs(eigs0).max(), rtol=0.0)
+                      for eigs0, eigs1 in zip(logs0.eigs, logs1.eigs))
+            self.report('same logged eigenvalues:', _ok)
+            ok = ok and _ok
+
+        return ok
+
+    def test_parallel(self):
+        """
+        Test that the parallel detection in frequency intervals gives the same
+        results as the serial one.
+        """
+        import sfepy.base.multiproc as multi
+        from sfepy.homogenization.coefs_phononic import detect_band_gaps
+
+        if multi.get_multiproc()[1] != 'proc':
+            self.report('multiprocessing not available - parallel detection'
+                        ' falls back to serial!')
+
+        ok = True
+        for mtx_b in [None, self.mtx_b]:
+            results = []
+            for num_workers in [1, 3]:
+                opts = self.get_options(num_workers=num_workers)
+                results.append(detect_band_gaps(self.mass, self.freq_info,
+                                                opts, mtx_b=mtx_b))
+
+            (logs0, gaps0, kinds0), (logs1, gaps1, kinds1) = results
+
+            _ok = (kinds0 == kinds1) and _compare_gaps(gaps0, gaps1, 0.0)
+            self.report('mtx_b: %s, same gaps: %s' % (mtx_b is not None, _ok))
+            ok = ok and _ok
+
+            _ok = all(nm.array_equal(freqs0, freqs1) and
+                      nm.array_equal(eigs0, eigs1)
+                      for freqs0, freqs1, eigs0, eigs1
+                      in zip(logs0.freqs, logs1.freqs, logs0.eigs, logs1.eigs))
+            self.report('same logs:', _ok)
+            ok = ok and _ok
+
+        return ok
+
+    def test_directions(self):
+        """
+        Test that the dispersion analysis for several incident wave directions
+        gives the same results as separate runs for each direction, both
+        with the serial and the parallel computation of the directions.
+        """
+        import sfepy.base.multiproc as multi
+        import os.path as op
+        from sfepy.base.base import Struct
+        from sfepy.base.conf import ProblemConf, get_standard_keywords
+        from sfepy.homogenization.band_gaps_app import AcousticBandGapsApp
+
+        required, other = get_standard_keywords()
+        required.remove('equations')
+
+        options = Struct(output_filename_trunk=None, detect_band_gaps=False,
+                         analyze_dispersion=True, phase_velocity=False,
+                         plot=False)
+
+        if multi.get_multiproc()[1] != 'proc':
+            self.report('multiprocessing not available - parallel computation'
+                        ' falls back to serial!')
+
+        def compute(iw_dir, num_workers=1):
+            conf = ProblemConf.from_file(op.join(op.dirname(__file__),
+                                                 input_name),
+                                         required, other)
+            conf.options['incident_wave_dir'] = iw_dir
+            conf.options['num_workers'] = num_workers
+            conf.options['output_dir'] = op.join(self.options.out_dir,
+                                                 'band_gaps')
+            conf.coefs['dispersion']['options']['freq_step'] = 0.01
+
+            app = AcousticBandGapsApp(conf, options, 'phonon:')
+            return app()
+
+        iw_dirs = [[1.0, 1.0], [1.0, 0.0], [0.0, 1.0]]
+        all_coefs = [compute(iw_dirs, num_workers) for num_workers in [1, 2]]
+
+        ok = True
+        for idir, iw_dir in enumerate(iw_dirs):
+            coefs0 = compute(iw_dir)
+
+            for num_workers, coefs in zip([1, 2], all_coefs):
+                bg0 = coefs0.dispersion
+                bg1 = getattr(coefs, 'dispersion_%d' % idir)
+                _ok = ((bg0.kinds == bg1.kinds)
+                       and _compare_gaps(bg0.gaps, bg1.gaps, 0.0)
+                       and all(nm.array_equal(eigs0, eigs1)
+                               for eigs0, eigs1 in zip(bg0.logs.eigs,
+                                                       bg1.logs.eigs)))
+                self.report('direction %s, %d worker(s): same dispersion: %s'
+                            % (iw_dir, num_workers, _ok))
+                ok = ok and _ok
+
+                pas0 = coefs0.polarization_angles
+                pas1 = getattr(coefs, 'polarization_angles_%d' % idir)
+                _ok = all(nm.array_equal(pa0, pa1)
+                          for pa0, pa1 in zip(pas0, pas1))
+                self.report('direction %s, %d worker(s): same polarization'
+                            ' angles: %s' % (iw_dir, num_workers, _ok))
+                ok = ok and _ok
+
+        return ok
@@ -85,6 +85,10 @@ solvers = {
         'tol' : 1e-10,
         'which' : 'sr',
     }),
+    'evp6' : ('eig.scipy_slicing', {
+        'interval' : (0.0, 0.25),
+        'max_eigs_per_slice' : 2,
+    }),
 }
 
 eigs_expected = [nm.array([0.04904454, 0.12170685, 0.12170685,
@@ -164,3 +168,64 @@ class Test(TestCommon):
                         % (row[1], row[0], row[2], row[3]))
 
         return ok
+
+    def test_spectrum_slicing(self):
+        import scipy.linalg as sla
+        from sfepy.base.base import Struct
+
+        interval = (0.5, 1.5)
+        eigs0 = sla.eigh(self.mtx.toarray(), eigvals_only=True)
+        eigs0 = eigs0[(eigs0 >= interval[0]) & (eigs0 < interval[1])]
+
+        ok = True
+        for num_workers in [1, 2]:
+            conf = Struct(name='slicing', kind='eig.scipy_slicing',
+                          interval=interval, max_eigs_per_slice=8,
+                          num_workers=num_workers)
+            eig_solver = Solver.any_from_conf(conf)
+            status = {}
+            eigs, vecs = eig_solver(self.mtx, eigenvectors=True,
+                                    status=status)
+
+            res = nm.abs(self.mtx * vecs - vecs * eigs[None, :]).max()
+            _ok = ((len(eigs) == len(eigs0))
+                   and nm.allclose(eigs, eigs0, rtol=0.0, atol=1e-10)
+                   and (res < 1e-10))
+            self.report('workers: %d, slices: %d, eigenvalues: %d == %d,'
+                        ' max. residual: %.2e: %s'
+                        % (num_workers, status['n_slice'], len(eigs),
+                           len(eigs0), res, _ok))
+            ok = ok and _ok
+
+        return ok
+
+    def test_spectrum_slicing_singular(self):
+        """
+        Test the spectrum slicing with shifts equal to eigenvalues.
+        """
+        import scipy.sparse as sps
+        from sfepy.base.base import Struct
+        from sfepy.solvers.eigen import factorize_shifted
+
+        mtx = sps.diags(nm.arange(1.0, 51.0)).tocsr()
+
+        lu, shift, n_neg = factorize_shifted(mtx, None, 10.0)
+        ok = (shift < 10.0) and (n_neg == 9)
+        self.report('shift: %.16e, eigenvalues < shift: %d: %s'
+                    % (shift, n_neg, ok))
+
+        # The bisection shifts are the eigenvalues 5, 25, 15, 10, 20, ...
+        conf = Struct(name='slicing', kind='eig.scipy_slicing',
+                      interval=(5.0, 25.0), max_eigs_per_slice=4)
+        eig_solver = Solver.any_from_conf(conf)
+        status = {}
+        eigs = eig_solver(mtx, eigenvectors=False, status=status)
+
+        _ok = ((len(eigs) == 20)
+               and nm.allclose(eigs, nm.arange(5.0, 25.0), rtol=0.0,
+                               atol=1e-10))
+        self.report('slices: %d, eigenvalues: %s: %s'
+                    % (status['n_slice'], eigs, _ok))
+        ok = ok and _ok
+
+        return ok
@@ -184,6 +184,59 @@ class Test( TestCommon ):
 
         return True
 
+    def test_material_dependencies(self):
+        from sfepy.discrete import Material
+
+        problem = self.problem
+        problem.set_equations(self.conf.equations)
+
+        calls = []
+        def get_pars(ts, coors, mode=None, **kwargs):
+            if mode == 'qp':
+                calls.append(ts.step)
+                val = nm.tile(ts.step + 1.0, (coors.shape[0], 1, 1))
+                return {'a' : val, 'b' : val}
+
+        mat = Material('mf3', function=get_pars, depends_on=('time',))
+
+        ts = problem.get_default_ts(n_step=3, step=0)
+        mat.time_update(ts, problem.equations, mode='normal', problem=problem)
+        n_call = len(calls)
+        self.report('number of calls in step 0:', n_call)
+
+        mat.time_update(ts, problem.equations, mode='normal', problem=problem)
+        _ok = len(calls) == n_call
+        self.report('data reused:', _ok)
+        ok = _ok
+
+        ts.set_step(1)
+        mat.time_update(ts, problem.equations, mode='normal', problem=problem)
+        _ok = len(calls) == 2 * n_call
+        self.report('data recomputed for new time step:', _ok)
+        ok = ok and _ok
+
+        key = mat.get_keys(region_name='Omega')[0]
+        _ok = nm.all(mat.get_data(key, 'a') == 2.0)
+        self.report('correct data:', _ok)
+        ok = ok and _ok
+
+        mat.depends_on = None
+        mat.time_update(ts, problem.equations, mode='normal', problem=problem)
+        _ok = len(calls) == 3 * n_call
+        self.report('data recomputed without dependencies:', _ok)
+        ok = ok and _ok
+
+        coors_digests = {}
+        mat.time_update(ts, problem.equations, mode='force', problem=problem,
+                        coors_digests=coors_digests)
+        digests = set(val[0] for val in mat.qps_cache.values())
+        _ok = ((len(coors_digests) == 1)
+               and (digests == set(coors_digests.values())))
+        self.report('mesh coordinates digest computed once:', _ok)
+        ok = ok and _ok
+
+        return ok
+
     def test_ebc_functions(self):
         import os.path as op
         problem = self.problem
@@ -2,12 +2,16 @@ from __future__ import absolute_import
 import time
 import os.path as op
 import numpy as nm
+import numpy.linalg as nla
 
 from sfepy.base.testing import TestCommon
 
 def fix_u_fun(ts, coors, bc=None, problem=None, extra_arg=None):
     return nm.zeros_like(coors)
 
+def shift_u_fun(ts, coors, bc=None, problem=None):
+    return nm.full(coors.shape[0], 0.1 * ts.time)
+
 class Test(TestCommon):
 
     @staticmethod
@@ -203,3 +207,352 @@ class Test(TestCommon):
         ok = ok and _ok
 
         return ok
+
+    def test_mappings_cache(self):
+        from sfepy.base.disk_cache import DiskCache
+        from sfepy.discrete import Integral
+
+        dirname = op.join(self.options.out_dir, 'test_mappings_cache')
+        cache = DiskCache(dirname)
+        cache.clear()
+
+        field = self.field
+        integral = Integral('i', order=3)
+
+        field.domain.create_surface_group(self.gamma1)
+        field.setup_surface_data(self.gamma1)
+
+        field.set_mappings_cache(cache)
+        field.clear_mappings()
+
+        ok = True
+        for region, integration in [(self.omega, 'volume'),
+                                    (self.gamma1, 'surface')]:
+            geo0, _ = field.get_mapping(region, integral, integration)
+            n_entry = len(cache.get_entries())
+
+            field.clear_mappings()
+            geo, _ = field.get_mapping(region, integral, integration)
+            field.clear_mappings()
+
+            _ok = len(cache.get_entries()) == n_entry
+            self.report('%s mapping cached: %s' % (integration, _ok))
+            ok = ok and _ok
+
+            for name in ['bf', 'bfg', 'det', 'volume', 'normal']:
+                val0 = getattr(geo0, name)
+                val = getattr(geo, name)
+                if val0 is None:
+                    _ok = val is None
+
+                else:
+                    _ok = nm.array_equal(val0, val)
+
+                self.report('%s %s: %s' % (integration, name, _ok))
+                ok = ok and _ok
+
+            _ok = geo.qp is geo0.qp
+            self.report('%s qp: %s' % (integration, _ok))
+            ok = ok and _ok
+
+        cache.max_size = 0
+        cache.evict()
+        _ok = len(cache.get_entries()) == 0
+        self.report('evicted:', _ok)
+        ok = ok and _ok
+
+        field.set_mappings_cache(None)
+
+        return ok
+
+    def test_renumbering(self):
+        from sfepy.discrete.fem import FEDomain, Field
+        from sfepy.discrete import (FieldVariable, Material, Problem,
+                                    Equation, Equations, Integral)
+        from sfepy.discrete.conditions import Conditions, EssentialBC
+        from sfepy.terms import Term
+        from sfepy.solvers.ls import ScipyDirect
+        from sfepy.solvers.nls import Newton
+        from sfepy.mechanics.matcoefs import stiffness_from_lame
+
+        def solve(field, gamma1, gamma2):
+            omega = field.region
+            u = FieldVariable('u', 'unknown', field)
+            v = FieldVariable('v', 'test', field, primary_var_name='u')
+
+            m = Material('m', D=stiffness_from_lame(self.dim, 1.0, 1.0))
+            f = Material('f', val=[[0.02], [0.01]])
+
+            integral = Integral('i', order=3)
+            t1 = Term.new('dw_lin_elastic(m.D, v, u)',
+                          integral, omega, m=m, v=v, u=u)
+            t2 = Term.new('dw_volume_lvf(f.val, v)', integral, omega,
+                          f=f, v=v)
+            eqs = Equations([Equation('balance', t1 + t2)])
+
+            pb = Problem('elasticity', equations=eqs)
+            pb.set_bcs(ebcs=Conditions([
+                EssentialBC('fix_u', gamma1, {'u.all' : 0.0}),
+                EssentialBC('shift_u', gamma2, {'u.0' : 0.1}),
+            ]))
+            pb.set_solver(Newton({}, lin_solver=ScipyDirect({})))
+            state = pb.solve()
+
+            mtx = pb.mtx_a.tocoo()
+            bandwidth = nm.abs(mtx.row - mtx.col).max()
+
+            return state(), bandwidth
+
+        field = self.field
+        ok = True
+
+        vec0, bw0 = solve(field, self.gamma1, self.gamma2)
+        bws = {}
+        for order in ['rcm', 'hilbert', 'morton']:
+            field.set_dof_order(order)
+            vec, bw = solve(field, self.gamma1, self.gamma2)
+            field.set_dof_order(None)
+            bws[order] = bw
+
+            _ok = nm.allclose(vec, vec0, rtol=0, atol=1e-12)
+            self.report('DOF order %s: same solution: %s, bandwidth: %d -> %d'
+                        % (order, _ok, bw0, bw))
+            ok = ok and _ok
+
+        _ok = bws['rcm'] < bw0
+        if not _ok:
+            self.report('RCM did not reduce bandwidth!')
+        ok = ok and _ok
+
+        # Renumbered mesh.
+        mesh0 = field.domain.mesh
+        mesh, vperm, cperms = mesh0.create_renumbered('hilbert',
+                                                      ret_perms=True)
+        domain = FEDomain('domain', mesh)
+        omega = domain.create_region('Omega', 'all')
+        gamma1 = domain.create_region('Gamma1', self.gamma1.definition,
+                                      'facet')
+        gamma2 = domain.create_region('Gamma2', self.gamma2.definition,
+                                      'facet')
+        field2 = Field.from_args('fu', nm.float64, 'vector', omega,
+                                 approx_order=2)
+        vec, bw = solve(field2, gamma1, gamma2)
+
+        n_dim = self.dim
+        nv = mesh.n_nod
+        _ok = nm.allclose(vec.reshape((-1, n_dim))[:nv],
+                          vec0.reshape((-1, n_dim))[vperm], rtol=0,
+                          atol=1e-12)
+        self.report('renumbered mesh: same vertex solution:', _ok)
+        ok = ok and _ok
+
+        return ok
+
+    def test_near_null_space(self):
+        from sfepy.discrete import (FieldVariable, Material, Problem,
+                                    Equation, Equations, Integral)
+        from sfepy.terms import Term
+        from sfepy.mechanics.matcoefs import stiffness_from_lame
+        from sfepy.solvers.ls import get_near_null_space, get_dof_blocks
+
+        u = FieldVariable('u', 'unknown', self.field)
+        v = FieldVariable('v', 'test', self.field, primary_var_name='u')
+
+        m = Material('m', D=stiffness_from_lame(self.dim, 1.0, 1.0))
+
+        integral = Integral('i', order=3)
+
+        ok = True
+        for order in [None, 'rcm']:
+            self.field.set_dof_order(order)
+
+            t1 = Term.new('dw_lin_elastic(m.D, v, u)',
+                          integral, self.omega, m=m, v=v, u=u)
+            eqs = Equations([Equation('balance', t1)])
+
+            pb = Problem('elasticity', equations=eqs)
+            pb.time_update()
+            pb.update_materials()
+
+            variables = pb.equations.variables
+            asm_obj = pb.equations.create_matrix_graph()
+            mtx = pb.equations.evaluate(mode='weak', dw_mode='matrix',
+                                        asm_obj=asm_obj)
+
+            modes = get_near_null_space(variables, mtx.shape[0])
+            res = nm.abs(mtx * modes).max() / abs(mtx).max()
+            _ok = (modes.shape[1] == 3) and (res < 1e-12)
+            self.report('DOF order: %s, rigid body modes: %d,'
+                        ' max. |K B| / max. |K|: %.2e'
+                        % (order, modes.shape[1], res))
+            ok = ok and _ok
+
+            # The rows of DOFs of a single node have the same sparsity
+            # pattern.
+            blocks = get_dof_blocks(variables, mtx.shape[0])
+            ii = nm.argsort(blocks, kind='stable')
+            _ok = (nm.bincount(blocks) == self.dim).all()
+            mtx = mtx.tocsr()
+            for ib in range(0, len(ii), self.dim):
+                rows = ii[ib:ib + self.dim]
+                cols = [mtx.indices[mtx.indptr[ir]:mtx.indptr[ir + 1]]
+                        for ir in rows]
+                _ok = _ok and all(nm.array_equal(nm.sort(cols[0]),
+                                                 nm.sort(col))
+                                  for col in cols[1:])
+            self.report('DOF order: %s, DOF blocks: %s' % (order, _ok))
+            ok = ok and _ok
+
+        self.field.set_dof_order(None)
+
+        return ok
+
+    def test_time_extrapolation(self):
+        from sfepy.base.base import IndexedStruct
+        from sfepy.discrete import (FieldVariable, Material, Problem, Function,
+                                    Equation, Equations, Integral)
+        from sfepy.discrete.conditions import Conditions, EssentialBC
+        from sfepy.terms import Term
+        from sfepy.solvers.ls import ScipyIterative
+        from sfepy.solvers.nls import Newton
+        from sfepy.solvers.ts_solvers import SimpleTimeSteppingSolver
+        from sfepy.mechanics.matcoefs import stiffness_from_lame
+
+        u = FieldVariable('u', 'unknown', self.field)
+        v = FieldVariable('v', 'test', self.field, primary_var_name='u')
+
+        m = Material('m', D=stiffness_from_lame(self.dim, 1.0, 1.0))
+        f = Material('f', val=[[0.02], [0.01]])
+
+        fix_u = EssentialBC('fix_u', self.gamma1, {'u.all' : 0.0})
+        shift_u = EssentialBC('shift_u', self.gamma2,
+                              {'u.0' : Function('shift_u_fun', shift_u_fun)})
+
+        integral = Integral('i', order=3)
+        t1 = Term.new('dw_lin_elastic(m.D, v, u)',
+                      integral, self.omega, m=m, v=v, u=u)
+        t2 = Term.new('dw_volume_lvf(f.val, v)', integral, self.omega, f=f, v=v)
+        eqs = Equations([Equation('balance', t1 + t2)])
+
+        ok = True
+        results = {}
+        for extrapolate, lin_x0 in [(0, 'x'), (1, 'zero'), (2, 'dx')]:
+            ls = ScipyIterative({'method' : 'cg', 'i_max' : 1000,
+                                 'eps_a' : 1e-14, 'eps_r' : 1e-12})
+            nls_status = IndexedStruct()
+            nls = Newton({'i_max' : 2, 'eps_a' : 1e-8, 'lin_x0' : lin_x0},
+                         lin_solver=ls, status=nls_status)
+            tss = SimpleTimeSteppingSolver({'t0' : 0.0, 't1' : 1.0,
+                                            'n_step' : 6, 'quasistatic' : True,
+                                            'extrapolate' : extrapolate},
+                                           nls=nls, verbose=False)
+
+            pb = Problem('elasticity', equations=eqs)
+            pb.set_bcs(ebcs=Conditions([fix_u, shift_u]))
+            pb.set_solver(tss)
+
+            n_iters = []
+            def step_hook(pb, ts, state):
+                n_iters.append(nls_status.n_iter)
+
+            state = pb.solve(step_hook=step_hook, save_results=False)
+
+            results[extrapolate] = state()
+            self.report('extrapolate: %d, lin_x0: %s, Newton iterations: %s'
+                        % (extrapolate, lin_x0, n_iters))
+            _ok = nls_status.condition == 0
+            if extrapolate:
+                # The solution is linear in time -> exact predictions.
+                _ok = _ok and (max(n_iters[extrapolate + 1:]) == 0)
+            ok = ok and _ok
+
+        for key in [1, 2]:
+            _ok = nm.allclose(results[key], results[0], rtol=0, atol=1e-10)
+            self.report('extrapolate: %d, same solution: %s' % (key, _ok))
+            ok = ok and _ok
+
+        return ok
+
+    def test_matrix_free(self):
+        from sfepy.base.base import IndexedStruct
+        from sfepy.discrete import (FieldVariable, Material, Problem,
+                                    Equation, Equations, Integral)
+        from sfepy.discrete.conditions import Conditions, EssentialBC
+        from sfepy.discrete.evaluate import MatrixFreeOperator
+        from sfepy.terms import Term
+        from sfepy.solvers.ls import ScipyDirect, ScipyIterative
+        from sfepy.solvers.nls import Newton
+        from sfepy.mechanics.matcoefs import stiffness_from_lame
+
+        u = FieldVariable('u', 'unknown', self.field)
+        v = FieldVariable('v', 'test', self.field, primary_var_name='u')
+
+        m = Material('m', D=stiffness_from_lame(self.dim, 1.0, 1.0))
+        f = Material('f', val=[[0.02], [0.01]])
+
+        fix_u = EssentialBC('fix_u', self.gamma1, {'u.all' : 0.0})
+        shift_u = EssentialBC('shift_u', self.gamma2, {'u.0' : 0.1})
+
+        integral = Integral('i', order=3)
+        t1 = Term.new('dw_lin_elastic(m.D, v, u)',
+                      integral, self.omega, m=m, v=v, u=u)
+        t2 = Term.new('dw_volume_lvf(f.val, v)', integral, self.omega, f=f, v=v)
+        eqs = Equations([Equation('balance', t1 + t2)])
+
+        nm.random.seed(0)
+
+        ok = True
+        states = {}
+        for mode in [None, 'linear', 'nonlinear']:
+            if mode is None:
+                ls = ScipyDirect({})
+
+            else:
+                ls = ScipyIterative({'method' : 'cg', 'precond' : 'jacobi',
+                                     'i_max' : 1000, 'eps_a' : 1e-14,
+                                     'eps_r' : 1e-10 if mode == 'linear'
+                                     else 1e-6})
+
+            # The finite difference action accuracy limits the attainable
+            # residual norm in the 'nonlinear' mode.
+            nls_status = IndexedStruct()
+            nls = Newton({'i_max' : 3,
+                          'eps_a' : 1e-5 if mode == 'nonlinear' else 1e-8},
+                         lin_solver=ls, status=nls_status)
+
+            pb = Problem('elasticity', equations=eqs)
+            pb.conf.options['matrix_free'] = mode
+            pb.set_bcs(ebcs=Conditions([fix_u, shift_u]))
+            pb.set_solver(nls)
+
+            states[mode] = pb.solve(save_results=False)()
+            _ok = nls_status.condition == 0
+            self.report('matrix-free mode: %s, converged: %s, matrix: %s'
+                        % (mode, _ok, pb.mtx_a is not None))
+            ok = ok and _ok
+
+            if mode is None:
+                pb.time_update()
+                pb.update_materials()
+                vec = pb.get_initial_state().get_vec(pb.active_only)
+                vec = vec + nm.random.rand(len(vec))
+                mtx = pb.get_evaluator().eval_tangent_matrix(vec)
+
+            else:
+                op = pb.get_evaluator().eval_tangent_matrix(vec)
+                _ok = isinstance(op, MatrixFreeOperator)
+                xx = nm.random.rand(op.shape[1])
+                err = nla.norm(op * xx - mtx * xx) / nla.norm(mtx * xx)
+                derr = (nla.norm(op.diagonal() - mtx.diagonal())
+                        / nla.norm(mtx.diagonal()))
+                self.report('action error: %.2e, diagonal error: %.2e'
+                            % (err, derr))
+                _ok = _ok and (err < 1e-6) and (derr < 1e-12)
+                ok = ok and _ok
+
+        for mode, atol in [('linear', 1e-8), ('nonlinear', 1e-5)]:
+            _ok = nm.allclose(states[mode], states[None], rtol=0, atol=atol)
+            self.report('%s matrix-free solution ok: %s' % (mode, _ok))
+            ok = ok and _ok
+
+        return ok
@@ -0,0 +1,42 @@
+from __future__ import absolute_import
+import sys
+import subprocess
+
+from sfepy.base.testing import TestCommon
+
+# Optional or heavy modules that should be imported only when used.
+lazy_modules = ['tables', 'meshio', 'matplotlib', 'sympy', 'pyamg',
+                'petsc4py', 'slepc4py', 'mpi4py', 'scipy.optimize',
+                'scipy.spatial']
+
+check_code = """
+import sys, time
+timer = time.time()
+import sfepy.discrete
+import sfepy.discrete.fem
+import sfepy.applications
+import sfepy.solvers
+print(time.time() - timer)
+print('imported: ' + ' '.join(name for name in %s if name in sys.modules))
+""" % lazy_modules
+
+class Test(TestCommon):
+
+    @staticmethod
+    def from_conf(conf, options):
+        return Test(conf=conf, options=options)
+
+    def test_lazy_imports(self):
+        """
+        Check that importing the basic SfePy modules does not import the
+        optional backends, and report the import time.
+        """
+        out = subprocess.check_output([sys.executable, '-c', check_code])
+        lines = out.decode('utf-8').strip().split('\n')
+
+        self.report('import time: %.2f [s]' % float(lines[-2]))
+
+        imported = lines[-1].split()[1:]
+        self.report('eagerly imported optional modules:', imported)
+
+        return len(imported) == 0
@@ -20,7 +20,7 @@ class Test( TestCommon ):
     def test_sparse_matrix_hdf5( self ):
         from sfepy.base.ioutils import write_sparse_matrix_hdf5, read_sparse_matrix_hdf5
         from sfepy.base.ioutils import pt
-        if pt is None:
+        if not pt.is_available():
             self.report( 'skipped (no pytables)' )
             return True
         filename = op.join( self.options.out_dir, 'mtx.h5' )
@@ -51,7 +51,7 @@ class Test( TestCommon ):
     def test_recursive_dict_hdf5( self ):
         from sfepy.base.ioutils import write_dict_hdf5, read_dict_hdf5
         from sfepy.base.ioutils import pt
-        if pt is None:
+        if not pt.is_available():
             self.report( 'skipped (no pytables)' )
             return True
         filename = op.join( self.options.out_dir, 'dict.h5' )
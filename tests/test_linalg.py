@@ -84,3 +84,26 @@ class Test(TestCommon):
         ok = nm.allclose([a1, a2], [1, 1], rtol=0, atol=1e-15)
 
         return ok
+
+    def test_space_filling_order(self):
+        import numpy as nm
+        from sfepy.linalg import get_space_filling_order
+
+        ok = True
+        for dim in [2, 3]:
+            n = 8
+            grid = nm.mgrid[(slice(0, n),) * dim].reshape((dim, -1)).T
+            coors = nm.random.permutation(grid).astype(nm.float64)
+
+            for kind in ['hilbert', 'morton']:
+                perm = get_space_filling_order(coors, kind=kind)
+                _ok = (nm.sort(perm) == nm.arange(n**dim)).all()
+                if kind == 'hilbert':
+                    # Consecutive points of the Hilbert curve are neighbours.
+                    steps = nm.abs(nm.diff(coors[perm], axis=0)).sum(axis=1)
+                    _ok = _ok and (steps == 1).all()
+
+                self.report('%dD %s order: %s' % (dim, kind, _ok))
+                ok = ok and _ok
+
+        return ok
@@ -142,6 +142,36 @@ solvers = {
               'eps_a'   : 1e-12,
               'eps_r'   : 1e-12,}
     ),
+    'i23' : ('ls.scipy_iterative',
+             {'method' : 'cg',
+              'precond' : 'jacobi',
+              'i_max'   : 1000,
+              'eps_a'   : 1e-12,
+              'eps_r'   : 1e-12,}
+    ),
+    'i24' : ('ls.scipy_iterative',
+             {'method' : 'cg',
+              'precond' : 'block_jacobi',
+              'i_max'   : 1000,
+              'eps_a'   : 1e-12,
+              'eps_r'   : 1e-12,}
+    ),
+    'i25' : ('ls.scipy_iterative',
+             {'method' : 'bicgstab',
+              'precond' : 'ilu',
+              'precond_kwargs' : {'drop_tol' : 1e-3},
+              'i_max'   : 1000,
+              'eps_a'   : 1e-12,
+              'eps_r'   : 1e-12,}
+    ),
+    'i26' : ('ls.scipy_iterative',
+             {'method' : 'gmres',
+              'precond' : 'field_split',
+              'sub_precond' : 'ilu',
+              'i_max'   : 1000,
+              'eps_a'   : 1e-12,
+              'eps_r'   : 1e-12,}
+    ),
 
     'newton' : ('nls.newton', {
         'i_max'      : 1,
@@ -303,3 +333,242 @@ class Test(TestCommon):
             self.report('sol0 == 2 * sol2:', _ok); ok = ok and _ok
 
         return ok
+
+    def test_precond_reuse(self):
+        import numpy as nm
+        from sfepy.solvers import Solver
+        from sfepy.solvers.ls import (create_block_jacobi_precond,
+                                      create_jacobi_precond)
+        from sfepy.discrete.state import State
+
+        self.problem.init_solvers(ls_conf=self.problem.solver_confs['d00'])
+        nls = self.problem.get_nls()
+
+        state0 = State(self.problem.equations.variables)
+        state0.apply_ebc()
+        vec0 = state0.get_reduced()
+
+        self.problem.update_materials()
+
+        rhs = nls.fun(vec0)
+        mtx = nls.fun_grad(vec0)
+
+        ok = True
+
+        pc1 = create_jacobi_precond(mtx)
+        pc2 = create_block_jacobi_precond(mtx, nm.arange(mtx.shape[0]))
+        _ok = abs(pc1 - pc2).max() < 1e-14
+        self.report('block Jacobi with unit blocks == Jacobi:', _ok)
+        ok = ok and _ok
+
+        pc = create_block_jacobi_precond(mtx, nm.arange(mtx.shape[0]) // 2)
+        dmtx = mtx.toarray()
+        bmtx = dmtx[:2, :2]
+        _ok = nm.allclose(pc[:2, :2].toarray(), nm.linalg.inv(bmtx),
+                          rtol=1e-12, atol=0)
+        self.report('block Jacobi block inverse:', _ok)
+        ok = ok and _ok
+
+        sol0 = self.problem.solver_confs['d00']
+        sol0 = Solver.any_from_conf(sol0)(rhs, mtx=mtx)
+
+        conf = self.problem.solver_confs['i25'].copy()
+        conf.precond_rebuild = 2
+        ls = Solver.any_from_conf(conf, context=self.problem)
+
+        pcs = []
+        for ii in range(4):
+            sol = ls(rhs, mtx=mtx)
+            pcs.append(ls.precond)
+
+            _ok = nm.allclose(sol, sol0, rtol=0, atol=1e-8)
+            self.report('solve %d: solution ok: %s' % (ii, _ok))
+            ok = ok and _ok
+
+        _ok = ((pcs[0] is pcs[1]) and (pcs[1] is not pcs[2])
+               and (pcs[2] is pcs[3]))
+        self.report('preconditioner rebuilt every two solves:', _ok)
+        ok = ok and _ok
+
+        conf = self.problem.solver_confs['i23'].copy()
+        conf.precond_rebuild = 0
+        conf.precond_iter_factor = 5.0
+        ls = Solver.any_from_conf(conf, context=self.problem)
+
+        # The first solve starts at the solution -> almost no iterations.
+        status = {}
+        ls(rhs, x0=sol0, mtx=mtx, status=status)
+        n_iter0 = status['n_iter']
+        pc0 = ls.precond
+        ls(rhs, mtx=mtx, status=status)
+        n_iter1 = status['n_iter']
+        _ok = ls.precond is pc0
+        self.report('iterations: %d, %d; preconditioner reused: %s'
+                    % (n_iter0, n_iter1, _ok))
+        ok = ok and _ok
+
+        ls(rhs, mtx=mtx)
+        _ok = ls.precond is not pc0
+        self.report('preconditioner rebuilt after iteration count growth:',
+                    _ok)
+        ok = ok and _ok
+
+        return ok
+
+    def test_amg_reuse(self):
+        import numpy as nm
+        from sfepy.solvers import Solver
+        from sfepy.discrete.state import State
+
+        self.problem.init_solvers(ls_conf=self.problem.solver_confs['d00'])
+        nls = self.problem.get_nls()
+
+        state0 = State(self.problem.equations.variables)
+        state0.apply_ebc()
+        vec0 = state0.get_reduced()
+
+        self.problem.update_materials()
+
+        rhs = nls.fun(vec0)
+        mtx = nls.fun_grad(vec0)
+
+        ok = True
+        for name in ['i00', 'i01']:
+            solver_conf = self.problem.solver_confs[name].copy()
+            solver_conf.reuse_hierarchy = True
+            solver_conf.rebuild_every = 2
+            self.report(name, solver_conf.method)
+            try:
+                ls = Solver.any_from_conf(solver_conf)
+
+            except:
+                self.report('skipped!')
+                continue
+
+            sol0 = ls(rhs, mtx=mtx)
+            prolongators = [lev.P for lev in ls.mg.levels[:-1]]
+
+            sols = []
+            for ii in range(3):
+                sols.append(ls(rhs, mtx=(2 + ii) * mtx))
+
+                _ok = nm.allclose(sols[-1], sol0 / (2 + ii), atol=1e-10,
+                                  rtol=0.0)
+                self.report('solution %d ok:' % ii, _ok); ok = ok and _ok
+
+                kept = all(lev.P is P
+                           for lev, P in zip(ls.mg.levels, prolongators))
+                _ok = kept == (ii < 2)
+                self.report('numeric-only setups: %d, hierarchy kept: %s'
+                            % (ls.n_resetup, kept))
+                ok = ok and _ok
+
+            # Without reuse_hierarchy, an unchanged matrix never triggers a
+            # new setup.
+            ls = Solver.any_from_conf(self.problem.solver_confs[name])
+            ls(rhs, mtx=mtx)
+            mg0 = ls.mg
+            for ii in range(3):
+                ls(nm.random.rand(*rhs.shape), mtx=mtx)
+
+            _ok = (ls.mg is mg0) and not ls.mg_expired
+            self.report('default: MG solver kept:', _ok)
+            ok = ok and _ok
+
+        return ok
+
+    def test_multiple_rhs(self):
+        import numpy as nm
+        from sfepy.solvers import Solver
+        from sfepy.discrete.state import State
+
+        self.problem.init_solvers(ls_conf=self.problem.solver_confs['d00'])
+        nls = self.problem.get_nls()
+
+        state0 = State(self.problem.equations.variables)
+        state0.apply_ebc()
+        vec0 = state0.get_reduced()
+
+        self.problem.update_materials()
+
+        rhs = nls.fun(vec0)
+        mtx = nls.fun_grad(vec0)
+
+        nm.random.seed(0)
+        rhs2 = nm.c_[rhs, 2.0 * rhs, nm.random.rand(rhs.shape[0]) - 0.5,
+                     rhs + 1e-3 * (nm.random.rand(rhs.shape[0]) - 0.5)]
+
+        ok = True
+        for name in ['d00', 'd02', 'i12', 'i23']:
+            solver_conf = self.problem.solver_confs[name]
+            self.report(name, solver_conf.kind)
+            try:
+                ls = Solver.any_from_conf(solver_conf, context=self.problem)
+
+            except:
+                self.report('skipped!')
+                continue
+
+            sols = nm.array([ls(rhs2[:, ii], mtx=mtx)
+                             for ii in range(rhs2.shape[1])]).T
+
+            status = {}
+            sol = ls(rhs2, mtx=mtx, status=status)
+            _ok = ((sol.shape == rhs2.shape)
+                   and nm.allclose(sol, sols, rtol=0, atol=1e-8))
+            self.report('block solution ok: %s, iterations: %s'
+                        % (_ok, status.get('n_iter')))
+            ok = ok and _ok
+
+        return ok
+
+    def test_krylov_recycling(self):
+        import numpy as nm
+        import scipy.sparse as sps
+        from sfepy.solvers import Solver
+        from sfepy.discrete.state import State
+
+        self.problem.init_solvers(ls_conf=self.problem.solver_confs['d00'])
+        nls = self.problem.get_nls()
+
+        state0 = State(self.problem.equations.variables)
+        state0.apply_ebc()
+        vec0 = state0.get_reduced()
+
+        self.problem.update_materials()
+
+        rhs = nls.fun(vec0)
+        mtx = nls.fun_grad(vec0)
+        dmtx = sps.diags(mtx.diagonal())
+
+        ok = True
+        for name in ['i20', 'i21']:
+            n_iters = []
+            for recycle in [0, 10]:
+                solver_conf = self.problem.solver_confs[name].copy()
+                solver_conf.recycle = recycle
+                ls = Solver.any_from_conf(solver_conf, context=self.problem)
+
+                n_iter = 0
+                for ii in range(4):
+                    mtx_i = mtx + (1e-3 * ii) * dmtx
+                    rhs_i = (1.0 + 0.1 * ii) * rhs
+                    status = {}
+                    sol = ls(rhs_i, mtx=mtx_i, status=status)
+                    n_iter += status['n_iter']
+
+                    res = nm.linalg.norm(mtx_i * sol - rhs_i)
+                    _ok = res < 1e-10 * nm.linalg.norm(rhs_i)
+                    if not _ok:
+                        self.report('%s recycle %d solve %d: residual %e'
+                                    % (name, recycle, ii, res))
+                    ok = ok and _ok
+
+                n_iters.append(n_iter)
+
+            _ok = n_iters[1] < n_iters[0]
+            self.report('%s iterations without/with recycling: %d, %d'
+                        % (name, n_iters[0], n_iters[1]))
+            ok = ok and _ok
+
+        return ok
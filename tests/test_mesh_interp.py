@@ -369,3 +369,177 @@ class Test(TestCommon):
             ok = ok and _ok
 
         return ok
+
+    def test_interp_operator(self):
+        from sfepy import data_dir
+        from sfepy.discrete.fem import Mesh
+        from sfepy.discrete import Variables
+        from sfepy.discrete.fem import FEDomain, Field
+
+        mesh = Mesh.from_file(data_dir + '/meshes/3d/block.mesh')
+        datas = gen_datas({'tp' : mesh})
+
+        d = FEDomain('d', mesh)
+        d.create_region('Omega', 'all')
+
+        field = Field.from_args('f', nm.float64, (3, 1), d.regions['Omega'],
+                                approx_order=2)
+        vv = Variables.from_conf(transform_variables(variables),
+                                 {field.name : field})
+        u = vv['u']
+        u.set_from_mesh_vertices(datas['vector_tp'])
+
+        bbox = d.get_mesh_bounding_box()
+        t = nm.expand_dims(nm.linspace(0, 1, 50), 1)
+        coors = nm.expand_dims(bbox[1] - bbox[0], 0) * t + bbox[0]
+
+        ok = True
+        for mode in ['val', 'grad']:
+            iop = u.create_interp_operator(coors, mode=mode)
+            vals0 = u.evaluate_at(coors, mode=mode)
+            vals1 = iop(u())
+
+            _ok = nm.allclose(vals0, vals1, rtol=0.0, atol=1e-12)
+            self.report('interpolation operator, mode %s: %s' % (mode, _ok))
+
+            ok = ok and _ok
+
+        return ok
+
+    def test_probe_steps(self):
+        from sfepy import data_dir
+        from sfepy.discrete.fem import Mesh
+        from sfepy.discrete import Variables
+        from sfepy.discrete.fem import FEDomain, Field
+        from sfepy.discrete.probes import (LineProbe, probe_steps,
+                                           write_steps_results,
+                                           read_steps_results)
+
+        mesh = Mesh.from_file(data_dir + '/meshes/3d/block.mesh')
+        datas = gen_datas({'tp' : mesh})
+
+        d = FEDomain('d', mesh)
+        d.create_region('Omega', 'all')
+
+        field = Field.from_args('f', nm.float64, (3, 1), d.regions['Omega'],
+                                approx_order=1)
+        vv = Variables.from_conf(transform_variables(variables),
+                                 {field.name : field})
+        u = vv['u']
+
+        bbox = d.get_mesh_bounding_box()
+        probe = LineProbe(bbox[0], bbox[1], 20)
+
+        steps = [0, 1, 2]
+        def gen_step_data():
+            for step in steps:
+                yield step, 0.1 * step, {'u' : (step + 1) * datas['vector_tp']}
+
+        results = probe_steps([probe], {'u' : u}, gen_step_data())
+
+        filename = op.join(self.options.out_dir, 'test_probe_steps.npz')
+        write_steps_results(filename, [probe], results, labels=['line'])
+        results2 = read_steps_results(filename)
+
+        ok = True
+        for step in steps:
+            u.set_from_mesh_vertices((step + 1) * datas['vector_tp'])
+            pars, vals = probe(u)
+
+            _ok = (nm.allclose(results[0].pars, pars)
+                   and nm.allclose(results[0].vals['u'][step], vals,
+                                   equal_nan=True)
+                   and nm.allclose(results2[0].vals['u'][step], vals,
+                                   equal_nan=True))
+            self.report('probe step %d: %s' % (step, _ok))
+
+            ok = ok and _ok
+
+        _ok = (results2[0].label == 'line')
+        self.report('label:', _ok)
+
+        return ok and _ok
+
+    def test_probe_steps_output(self):
+        """
+        Test probing of output data of P2 fields on the whole domain and on a
+        subdomain.
+        """
+        from sfepy import data_dir
+        from sfepy.base.base import Struct
+        from sfepy.discrete.fem import Mesh
+        from sfepy.discrete import Variables
+        from sfepy.discrete.fem import FEDomain, Field
+        from sfepy.discrete.probes import (LineProbe, probe_steps,
+                                           get_dofs_from_output)
+
+        mesh = Mesh.from_file(data_dir + '/meshes/3d/block.mesh')
+
+        d = FEDomain('d', mesh)
+        d.create_region('Omega', 'all')
+        d.create_region('Sub', 'vertices in (x < 0.0)', 'cell')
+
+        # Linear data are exactly represented by the P2 fields.
+        mtx = nm.array([[1.0, 0.5, 0.0], [0.0, 2.0, 1.0], [-1.0, 0.0, 3.0]])
+        fun = lambda coors: nm.dot(coors, mtx) + 1.0
+
+        bbox = d.get_mesh_bounding_box()
+        probe = LineProbe(bbox[0], bbox[1], 20)
+
+        steps = [0, 1]
+
+        ok = True
+        uvars = {}
+        for region_name in ['Omega', 'Sub']:
+            field = Field.from_args('f', nm.float64, (3, 1),
+                                    d.regions[region_name], approx_order=2)
+            vv = Variables.from_conf(transform_variables(variables),
+                                     {field.name : field})
+            u = uvars[region_name] = vv['u']
+
+            def gen_step_data():
+                for step in steps:
+                    out = {'u' : Struct(mode='vertex',
+                                        data=(step + 1) * fun(mesh.coors))}
+                    yield step, step, get_dofs_from_output(out, {'u' : u})
+
+            results = probe_steps([probe], {'u' : u}, gen_step_data())
+
+            for step in steps:
+                u.set_data((step + 1) * fun(field.coors))
+                pars, vals = probe(u)
+
+                ii = nm.isfinite(vals[:, 0])
+                _ok = ((ii.sum() > 0)
+                       and nm.allclose(results[0].vals['u'][step][ii],
+                                       vals[ii], rtol=0.0, atol=1e-12))
+                self.report('%s: probe step %d: %s'
+                            % (region_name, step, _ok))
+                ok = ok and _ok
+
+        out = {'u' : Struct(mode='cell', data=nm.ones((mesh.n_el, 1, 3, 1)))}
+        try:
+            get_dofs_from_output(out, {'u' : u})
+
+        except ValueError:
+            _ok = True
+
+        else:
+            _ok = False
+
+        self.report('cell data rejected:', _ok)
+        ok = ok and _ok
+
+        try:
+            probe_steps([probe], uvars, [])
+
+        except ValueError:
+            _ok = True
+
+        else:
+            _ok = False
+
+        self.report('different regions rejected:', _ok)
+        ok = ok and _ok
+
+        return ok
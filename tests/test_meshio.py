@@ -56,7 +56,7 @@ class Test(TestCommon):
     """Write test names explicitely to impose a given order of evaluation."""
     tests = ['test_read_meshes', 'test_compare_same_meshes',
              'test_read_dimension', 'test_write_read_meshes',
-             'test_hdf5_meshio']
+             'test_hdf5_direct_read', 'test_hdf5_meshio']
 
     @staticmethod
     def from_conf(conf, options):
@@ -237,6 +237,66 @@ class Test(TestCommon):
 
         return sum(oks) == len(oks)
 
+    def test_hdf5_direct_read(self):
+        """
+        Test reading HDF5 meshes directly into the mesh buffers.
+        """
+        import os.path as op
+        import numpy as nm
+        import tables as pt
+        from sfepy.base.ioutils import HDF5ArrayReader
+        from sfepy.discrete.fem import Mesh
+
+        conf_dir = op.dirname(__file__)
+        mesh0 = Mesh.from_file(data_dir
+                               + '/meshes/various_formats/abaqus_quad_tri.inp',
+                               prefix_dir=conf_dir)
+        mesh0.cmesh.cell_groups[:] = \
+            nm.random.randint(1, 10, size=mesh0.cmesh.n_el)
+
+        filename = op.join(self.options.out_dir, 'test_mesh_direct.h5')
+        mesh0.write(filename, io='auto')
+        mesh1 = Mesh.from_file(filename)
+
+        oks = self._compare_meshes(mesh0, mesh1)
+        for desc in mesh0.descs:
+            ok = nm.all(mesh0.get_conn(desc) == mesh1.get_conn(desc))
+            if not ok:
+                self.report('connectivity %s failed!' % desc)
+            oks.append(ok)
+
+        ok = not nm.may_share_memory(mesh0.coors, mesh1.coors)
+        oks.append(ok)
+
+        # The caller's data are not modified through the mesh.
+        desc = mesh0.descs[0]
+        conn, cells = mesh0.get_conn(desc, ret_cells=True)
+        for coors in [mesh0.coors.copy(), mesh0.coors.astype(nm.float32),
+                      mesh0.coors.tolist()]:
+            coors0 = nm.array(coors)
+            mat_ids = mesh0.cmesh.cell_groups[cells]
+            mesh2 = Mesh.from_data('aux', coors, None, [conn], [mat_ids],
+                                   [desc])
+            mesh2.cmesh.cell_groups[:] = -1
+            mesh2.cmesh.coors[:] = 0.0
+            ok = (nm.all(mat_ids == mesh0.cmesh.cell_groups[cells])
+                  and nm.all(nm.asarray(coors) == coors0))
+            if not ok:
+                self.report('caller data modified! (%s)' % type(coors))
+            oks.append(ok)
+
+        with pt.open_file(filename, mode='r') as fd:
+            conn = fd.root.mesh.group0.conn
+            reader = HDF5ArrayReader(conn, chunk_size=2)
+            for dtype in [conn.dtype, nm.uint32, nm.int64, nm.float64]:
+                out = reader.read(out=nm.empty(conn.shape, dtype=dtype))
+                ok = nm.all(out == conn.read())
+                self.report('reading %s into %s:' % (conn.dtype, out.dtype),
+                            ok)
+                oks.append(ok)
+
+        return sum(oks) == len(oks)
+
     def test_hdf5_meshio(self):
         try:
             from igakit import igalib
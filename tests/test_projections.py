@@ -183,3 +183,68 @@ class Test(TestCommon):
         ok = ok and _ok
 
         return ok
+
+    def test_projector(self):
+        from sfepy.discrete import FieldVariable, Integral
+        from sfepy.discrete.projections import (Projector, get_projector,
+                                                make_l2_projection_data,
+                                                make_h1_projection_data)
+
+        ok = True
+
+        field = self.field
+        u = FieldVariable('u', 'parameter', field,
+                          primary_var_name='(set-to-None)')
+        coors = field.get_coor()
+        u.set_data(nm.sin(2.0 * nm.pi * coors[:,0] * coors[:,1]))
+
+        order = 2 * field.approx_order
+        integral = Integral('i', order=order)
+        gfield = Field.from_args('gu', nm.float64, 2, field.region,
+                                 approx_order=field.approx_order)
+        gu = FieldVariable('gu', 'parameter', gfield,
+                           primary_var_name='(set-to-None)')
+        gu_qp = u.evaluate(mode='grad', integral=integral)
+
+        projector = get_projector(field, order=order)
+        _ok = get_projector(field, order=order) is projector
+        self.report('projector cached:', _ok)
+        ok = ok and _ok
+
+        projector(gu, gu_qp[..., 0])
+
+        component = FieldVariable('component', 'parameter', field,
+                                  primary_var_name='(set-to-None)')
+        for ic in range(2):
+            make_l2_projection_data(component, gu_qp[..., ic, :].copy(),
+                                    order=order)
+            _ok = self.compare_vectors(gu()[ic::2], component(),
+                                       label1='projector',
+                                       label2='make_l2_projection_data')
+            ok = ok and _ok
+
+        # The projections of a function from the field space are exact.
+        u_qp = u.evaluate(integral=integral)
+        make_l2_projection_data(component, u_qp, order=order)
+        _ok = self.compare_vectors(component(), u(),
+                                   label1='L2 projection', label2='exact')
+        ok = ok and _ok
+
+        def eval_data(ts, coors, mode, kind, **kwargs):
+            val = u_qp if kind == 'val' else gu_qp
+            return val.reshape((coors.shape[0],) + val.shape[2:])
+
+        make_h1_projection_data(component, eval_data)
+        _ok = self.compare_vectors(component(), u(),
+                                   label1='H1 projection', label2='exact')
+        ok = ok and _ok
+
+        # The lumped projection is exact for constant data.
+        lprojector = Projector(field, order=order, lumped=True)
+        val_qp = nm.full_like(u.evaluate(integral=integral), 3.0)
+        _ok = self.compare_vectors(lprojector.project(val_qp),
+                                   nm.full((field.n_nod, 1), 3.0),
+                                   label1='lumped', label2='exact')
+        ok = ok and _ok
+
+        return ok
@@ -136,3 +136,80 @@ class Test(TestCommon):
             ok = ok and _ok
 
         return ok
+
+    def test_potential_cells(self):
+        from sfepy.discrete.fem import Mesh
+
+        mesh = Mesh.from_file('meshes/3d/special/cross3d.mesh',
+                              prefix_dir=sfepy.data_dir)
+        cmesh = mesh.cmesh
+
+        bbox = mesh.get_bounding_box()
+        coors = nm.random.rand(100, 3) * (1.2 * (bbox[1] - bbox[0])) \
+                + bbox[0] - 0.1 * (bbox[1] - bbox[0])
+
+        grid = gi.create_cell_grid(cmesh)
+        pcells, offsets = gi.get_potential_cells(coors, cmesh, grid=grid,
+                                                 extrapolate=False)
+
+        # Brute force check.
+        inside = nm.all((coors[:, None] >= grid.box_min[None, :])
+                        & (coors[:, None] <= grid.box_max[None, :]), axis=2)
+        ok = True
+        for ip in range(coors.shape[0]):
+            _ok = nm.array_equal(pcells[offsets[ip]:offsets[ip+1]],
+                                 nm.where(inside[ip])[0])
+            if not _ok:
+                self.report('wrong potential cells of point %d!' % ip)
+            ok = ok and _ok
+
+        pcells, offsets = gi.get_potential_cells(coors, cmesh, grid=grid,
+                                                 extrapolate=True)
+        _ok = nm.all(nm.diff(offsets) > 0)
+        self.report('all points have potential cells:', _ok)
+
+        return ok and _ok
+
+    def test_potential_cells_graded(self):
+        from sfepy.discrete.fem import Mesh
+        from sfepy.mesh.mesh_generators import gen_block_mesh
+
+        mesh0 = gen_block_mesh([1, 1], [41, 41], [0.5, 0.5], verbose=False)
+        coors = mesh0.coors**10
+        conn = mesh0.get_conn('2_4')
+        mesh = Mesh.from_data('graded', coors, None, [conn],
+                              [nm.zeros(len(conn), dtype=nm.int32)], ['2_4'])
+        cmesh = mesh.cmesh
+
+        coors = nm.random.rand(200, 2)**3
+
+        ok = True
+        for max_cell_bins in [None, 1]:
+            grid = gi.create_cell_grid(cmesh, max_cell_bins=max_cell_bins)
+            nbc = (nm.diff(grid.bin_offsets) > 0).sum()
+            self.report('max. cell bins: %s, large cells: %d, cells in bins:'
+                        ' %d in %d bins'
+                        % (max_cell_bins, len(grid.large_cells),
+                           len(grid.bin_cells), nbc))
+
+            cap = 16 if max_cell_bins is None else max_cell_bins
+            _ok = ((len(grid.large_cells) > 0)
+                   and (nm.bincount(grid.bin_cells).max() <= cap))
+            self.report('bins per cell limited:', _ok)
+            ok = ok and _ok
+
+            pcells, offsets = gi.get_potential_cells(coors, cmesh, grid=grid,
+                                                     extrapolate=False)
+
+            # Brute force check.
+            inside = nm.all((coors[:, None] >= grid.box_min[None, :])
+                            & (coors[:, None] <= grid.box_max[None, :]),
+                            axis=2)
+            for ip in range(coors.shape[0]):
+                _ok = nm.array_equal(pcells[offsets[ip]:offsets[ip+1]],
+                                     nm.where(inside[ip])[0])
+                if not _ok:
+                    self.report('wrong potential cells of point %d!' % ip)
+                ok = ok and _ok
+
+        return ok
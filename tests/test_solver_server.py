@@ -0,0 +1,106 @@
+from __future__ import absolute_import
+import os
+import os.path as op
+import json
+
+from sfepy.base.testing import TestCommon
+
+conf_name = '../examples/diffusion/poisson_short_syntax.py'
+
+class Test(TestCommon):
+
+    @staticmethod
+    def from_conf(conf, options):
+        return Test(conf=conf, options=options)
+
+    def test_two_jobs(self):
+        """
+        Test that two jobs with the same problem description and output file
+        name trunk run through the server return their own output files.
+        """
+        from sfepy.applications.solver_server import SolverServer
+
+        conf = op.join(op.dirname(__file__), conf_name)
+        output_dir = op.join(self.options.out_dir, 'solver_server')
+
+        jobs = [{'id' : 'vtk', 'conf' : conf, 'output_dir' : output_dir,
+                 'output_filename_trunk' : 'poisson',
+                 'options' : {'output_format' : 'vtk'}},
+                {'id' : 'h5', 'conf' : conf, 'output_dir' : output_dir,
+                 'output_filename_trunk' : 'poisson',
+                 'options' : {'output_format' : 'h5'}}]
+
+        rfd, wfd = os.pipe()
+        with os.fdopen(wfd, 'w') as fd:
+            for job in jobs:
+                fd.write(json.dumps(job) + '\n')
+
+        results = []
+        server = SolverServer(n_workers=2)
+        server.serve(rfd, results.append)
+        os.close(rfd)
+
+        results = dict((result['id'], result) for result in results)
+
+        ok = sorted(results.keys()) == ['h5', 'vtk']
+        self.report('all jobs finished:', ok)
+        if not ok:
+            return False
+
+        for key, result in sorted(results.items()):
+            _ok = result['status'] == 'ok'
+            self.report('%s: status: %s' % (key, result['status']))
+            if not _ok:
+                self.report(result['error'])
+                ok = False
+                continue
+
+            filenames = result['output_filenames']
+            self.report('%s: output files: %s' % (key, filenames))
+
+            _ok = ((len(filenames) == 1)
+                   and (filenames[0] == op.join(result['output_dir'],
+                                                'poisson.' + key))
+                   and op.isfile(filenames[0]))
+            self.report('%s: correct output files: %s' % (key, _ok))
+            ok = ok and _ok
+
+        _ok = results['vtk']['output_dir'] != results['h5']['output_dir']
+        self.report('separate job output directories:', _ok)
+        ok = ok and _ok
+
+        return ok
+
+    def test_mesh_renumbering(self):
+        """
+        Test that the cached domains respect the mesh_renumbering option.
+        """
+        import numpy as nm
+        from sfepy.applications.solver_server import SolverServer
+        from sfepy.discrete.fem import Mesh
+
+        conf = op.join(op.dirname(__file__), conf_name)
+
+        server = SolverServer()
+        ok = True
+        for order in [None, 'hilbert', None]:
+            pconf = server.load_conf({'conf' : conf,
+                                      'options' : {'mesh_renumbering'
+                                                   : order}})
+            domain = server.get_domain(pconf)
+
+            mesh = Mesh.from_file(pconf.filename_mesh,
+                                  prefix_dir=op.dirname(conf))
+            if order is not None:
+                mesh = mesh.create_renumbered(order)
+
+            _ok = nm.array_equal(domain.mesh.coors, mesh.coors)
+            self.report('%s: domain mesh renumbered correctly: %s'
+                        % (order, _ok))
+            ok = ok and _ok
+
+        _ok = len(server.domains) == 2
+        self.report('cached domains: %d' % len(server.domains))
+        ok = ok and _ok
+
+        return ok
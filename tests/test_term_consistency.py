@@ -273,3 +273,118 @@ class Test(TestCommon):
             self.report('failed')
 
         return ok
+
+    def test_term_buffers(self):
+        """
+        Test that the reuse of term output buffers does not change the results
+        of real and complex evaluations in the weak mode.
+        """
+        from sfepy.base.goptions import goptions
+        from sfepy.discrete import (FieldVariable, Material, Integral,
+                                    Equation, Equations, Problem)
+        from sfepy.discrete.fem import Field
+        from sfepy.terms import Term
+
+        field = self.problem.fields['scalar_field']
+        omega = field.region
+        cfield = Field.from_args('complex_field', nm.complex128, 1, omega,
+                                 approx_order=1)
+
+        integral = Integral('i', order=2)
+        m = Material('m', K=nm.array([[3.0, 0.1], [0.3, 1.0]]))
+
+        reuse_term_buffers = goptions['reuse_term_buffers']
+
+        ok = True
+        for fld in [field, cfield]:
+            u = FieldVariable('u', 'unknown', fld)
+            v = FieldVariable('v', 'test', fld, primary_var_name='u')
+
+            t1 = Term.new('dw_diffusion(m.K, v, u)', integral, omega,
+                          m=m, v=v, u=u)
+            t2 = Term.new('dw_laplace(v, u)', integral, omega, v=v, u=u)
+            eqs = Equations([Equation('eq', t1 + t2)])
+
+            pb = Problem('test', equations=eqs)
+            pb.time_update()
+            pb.update_materials()
+
+            vec = nm.arange(u.n_dof, dtype=nm.float64)
+            if u.dtype == nm.complex128:
+                vec = vec + 1j * vec[::-1]
+
+            vals = []
+            try:
+                for reuse in [False, True, True]:
+                    goptions['reuse_term_buffers'] = reuse
+
+                    rvec = pb.equations.eval_residuals(vec)
+                    mtx = pb.mtx_a.copy()
+                    mtx.data[:] = 0.0
+                    mtx = pb.equations.eval_tangent_matrices(vec, mtx)
+                    vals.append((rvec, mtx))
+
+            finally:
+                goptions['reuse_term_buffers'] = reuse_term_buffers
+
+            rvec0, mtx0 = vals[0]
+            _ok = nm.abs(rvec0).max() > 0.0
+            for ii, (rvec, mtx) in enumerate(vals[1:]):
+                _ok = (_ok and nm.array_equal(rvec0, rvec)
+                       and (abs(mtx0 - mtx).max() == 0.0))
+                self.report('%s, reused buffers %d: same results: %s'
+                            % (u.dtype.__name__, ii, _ok))
+                ok = ok and _ok
+
+        return ok
+
+    def test_term_buffers_held(self):
+        """
+        Test that a term evaluation result held by the caller is not
+        overwritten by the next evaluation.
+        """
+        from sfepy.discrete import FieldVariable, Integral
+        from sfepy.terms import Term
+
+        problem = self.problem
+
+        field = problem.fields['scalar_field']
+        integral = Integral('i', order=2)
+
+        u = FieldVariable('u', 'unknown', field)
+        v = FieldVariable('v', 'test', field, primary_var_name='u')
+
+        vec = nm.arange(u.n_dof, dtype=nm.float64)
+        u.set_data(vec)
+
+        term = Term.new('dw_laplace(v, u)', integral, field.region, v=v, u=u)
+        term.setup()
+
+        ok = True
+        for mode in ['weak', 'eval']:
+            if mode == 'weak':
+                val0 = term.evaluate(mode=mode)[0]
+
+            else:
+                term = Term.new('ev_volume_integrate(u)', integral,
+                                field.region, u=u)
+                term.setup()
+                val0 = term.evaluate(mode=mode)
+
+            aux = val0.copy()
+
+            u.set_data(2.0 * vec)
+            val1 = term.evaluate(mode=mode)
+            if mode == 'weak':
+                val1 = val1[0]
+            u.set_data(vec)
+
+            _ok = (val1 is not val0) and nm.array_equal(val0, aux)
+            self.report('%s mode: held result unchanged: %s' % (mode, _ok))
+            ok = ok and _ok
+
+            _ok = nm.allclose(val1, 2.0 * aux, atol=0.0, rtol=1e-14)
+            self.report('%s mode: next result correct: %s' % (mode, _ok))
+            ok = ok and _ok
+
+        return ok